@@ -69,4 +69,35 @@ PERMITTED_SERVICES = [
 
 LATEST_TAPIS_ETL_PIPELINE_TEMPLATE_NAME = "tapis/etl-pipeline@v1beta"
 TAPIS_ETL_TEMPLATE_REPO_URL = "https://github.com/tapis-project/tapis-workflows-task-templates.git"
-TAPIS_ETL_TEMPLATE_REPO_BRANCH = "master"
\ No newline at end of file
+TAPIS_ETL_TEMPLATE_REPO_BRANCH = "master"
+# Template repositories are mirrored into the template cache dir and fetched at
+# most once every TEMPLATE_REPO_TTL seconds
+TEMPLATE_CACHE_DIR = os.environ.get("TEMPLATE_CACHE_DIR", None) or "/tmp/git/"
+TEMPLATE_REPO_TTL = int(os.environ.get("TEMPLATE_REPO_TTL", None) or 300)
+# The maximum number of bytes of a pipeline run's logs returned per request
+PIPELINE_RUN_LOGS_MAX_LIMIT = int(os.environ.get("PIPELINE_RUN_LOGS_MAX_LIMIT", None) or 1048576)
+
+# Messages are published to the broker over a pool of at most BROKER_POOL_SIZE
+# persistent connections. A publish that fails because its connection was lost
+# is retried on a new connection BROKER_PUBLISH_RETRIES times
+BROKER_POOL_SIZE = int(os.environ.get("BROKER_POOL_SIZE", None) or 4)
+BROKER_POOL_TIMEOUT = 10 # Max wait in seconds for a connection of the pool
+BROKER_PUBLISH_RETRIES = int(os.environ.get("BROKER_PUBLISH_RETRIES", None) or 2)
+BROKER_HEARTBEAT = 60
+
+# The claims of validated Tapis tokens are cached until the token expires, for
+# at most TOKEN_CACHE_TTL seconds
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get("TOKEN_CACHE_MAX_SIZE", None) or 10000)
+TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", None) or 300)
+
+# Groups, group memberships and the tenants of base urls are cached by each
+# api process for at most GROUP_CACHE_TTL seconds. Changes made through another
+# process are seen once the cached entries expire
+GROUP_CACHE_MAX_SIZE = int(os.environ.get("GROUP_CACHE_MAX_SIZE", None) or 10000)
+GROUP_CACHE_TTL = int(os.environ.get("GROUP_CACHE_TTL", None) or 30)
+TENANT_CACHE_TTL = int(os.environ.get("TENANT_CACHE_TTL", None) or 300)
+
+# Runs, task executions and pipelines are listed a page at a time. Clients
+# request up to LIST_MAX_LIMIT rows per page with the 'limit' query param
+LIST_DEFAULT_LIMIT = int(os.environ.get("LIST_DEFAULT_LIMIT", None) or 100)
+LIST_MAX_LIMIT = int(os.environ.get("LIST_MAX_LIMIT", None) or 1000)
@@ -1,4 +1,7 @@
 from backend.errors.base import APIBaseException
 
 class InvalidExchangeError(APIBaseException):
-    pass
\ No newline at end of file
+    pass
+
+class PublishError(APIBaseException):
+    pass
@@ -0,0 +1,125 @@
+import json, base64, binascii
+
+from datetime import datetime
+from uuid import UUID
+
+from django.db.models import Q, F
+
+from backend.errors.api import BadRequestError
+from backend.conf.constants import LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT
+
+
+def parse_list(value):
+    return [item.strip() for item in value.split(",") if item.strip() != ""]
+
+def parse_datetime(value):
+    # NOTE fromisoformat does not accept the 'Z' suffix before python 3.11
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+class KeysetPaginator:
+    """Pages through the rows of a model newest first, ordered by the datetime
+    field 'order_field' and then the uuid. Rows whose order field is null come
+    last. Query params:
+        limit: the maximum number of rows to return
+        cursor: the 'next_cursor' of the metadata of the previous page
+        fields: comma separated fields to return. Defaults to every field of
+            the model except the 'deferred' ones, which are never loaded
+            unless requested. The 'excluded' fields are never listed
+    and a query param for each of the 'filters', which map a query param to the
+    field lookup it filters by and a function that parses its value. The order
+    field and the uuid are always returned"""
+    def __init__(self, model, order_field, deferred=[], excluded=[], filters={}):
+        self.order_field = order_field
+        self.fields = [
+            field.name for field in model._meta.concrete_fields
+            if field.name not in excluded
+        ]
+        self.default_fields = [field for field in self.fields if field not in deferred]
+        self.filters = filters
+
+    def paginate(self, params, queryset, *extra_fields):
+        """Returns a page of the queryset as a list of dicts and the page's
+        metadata. Raises BadRequestError if a query param is invalid"""
+        limit = self._limit(params)
+        fields = self._fields(params)
+
+        queryset = queryset.filter(**self._filters(params))
+        cursor = params.get("cursor", None)
+        if cursor:
+            queryset = queryset.filter(self._after(cursor))
+
+        # Fetch one extra row to know whether there is a next page. NOTE Nulls
+        # are last in a descending order in MySQL, so the rows are read in the
+        # order of the (..., order_field, uuid) index of the model
+        rows = list(
+            queryset.order_by(
+                F(self.order_field).desc(nulls_last=True),
+                "-uuid"
+            ).values(*fields, *extra_fields)[:limit+1]
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._cursor(rows[-1])
+
+        return (rows, {"limit": limit, "next_cursor": next_cursor})
+
+    def _limit(self, params):
+        try:
+            limit = int(params.get("limit", None) or LIST_DEFAULT_LIMIT)
+        except ValueError:
+            raise BadRequestError("Query param 'limit' must be an integer")
+
+        if limit < 1:
+            raise BadRequestError("Query param 'limit' must be greater than 0")
+
+        return min(limit, LIST_MAX_LIMIT)
+
+    def _fields(self, params):
+        fields = self.default_fields
+        if params.get("fields", None):
+            fields = parse_list(params.get("fields"))
+            unknown = [field for field in fields if field not in self.fields]
+            if len(unknown) > 0:
+                raise BadRequestError(f"Unknown field(s) {unknown}. Fields: {self.fields}")
+
+        # The cursor is built from the order field and the uuid of the last row
+        return list(dict.fromkeys([*fields, self.order_field, "uuid"]))
+
+    def _filters(self, params):
+        filters = {}
+        for (param, (lookup, parse)) in self.filters.items():
+            if not params.get(param, None):
+                continue
+            try:
+                filters[lookup] = parse(params.get(param))
+            except ValueError as e:
+                raise BadRequestError(f"Invalid value for query param '{param}': {e}")
+
+        return filters
+
+    def _cursor(self, row):
+        value = row[self.order_field]
+        return base64.urlsafe_b64encode(json.dumps([
+            value.isoformat() if value != None else None,
+            str(row["uuid"])
+        ]).encode("utf-8")).decode("utf-8")
+
+    def _after(self, cursor):
+        # Matches the rows that come after the row the cursor was built from
+        try:
+            (value, uuid) = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+            value = datetime.fromisoformat(value) if value != None else None
+            uuid = UUID(uuid)
+        except (ValueError, TypeError, binascii.Error):
+            raise BadRequestError("Query param 'cursor' is invalid")
+
+        if value == None:
+            return Q(**{f"{self.order_field}__isnull": True, "uuid__lt": uuid})
+
+        return (
+            Q(**{f"{self.order_field}__lt": value})
+            | Q(**{self.order_field: value, "uuid__lt": uuid})
+            | Q(**{f"{self.order_field}__isnull": True})
+        )
@@ -56,6 +56,7 @@ class PipelineDispatchRequestBuilder:
         request["pipeline"]["execution_profile"] = {
             "max_exec_time": request["pipeline"]["max_exec_time"],
             "duplicate_submission_policy": request["pipeline"]["duplicate_submission_policy"],
+            "max_parallel_tasks": request["pipeline"]["max_parallel_tasks"],
             "max_retries": request["pipeline"]["max_retries"],
             "invocation_mode": request["pipeline"]["invocation_mode"],
             "retry_policy": request["pipeline"]["retry_policy"]
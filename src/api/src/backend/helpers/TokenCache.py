@@ -0,0 +1,58 @@
+import time, hashlib
+
+from collections import OrderedDict
+from threading import Lock
+
+from backend.conf.constants import TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_TTL
+
+
+class TokenCache:
+    """A bounded cache of the claims of validated tokens. Tokens are keyed by
+    their sha256 so the tokens themselves are never kept in memory. The claims
+    of a token expire at the token's 'exp' claim or after 'ttl' seconds,
+    whichever comes first"""
+    def __init__(self, max_size=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL, clock=time.time):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._claims = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, token):
+        """Returns a copy of the claims of the token or None"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._claims.get(key, None)
+            if entry == None or entry[0] <= self._clock():
+                self._claims.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._claims.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def set(self, token, claims):
+        now = self._clock()
+        expires_at = now + self.ttl
+        exp = claims.get("exp", None)
+        if exp != None:
+            expires_at = min(expires_at, float(exp))
+
+        if expires_at <= now:
+            return
+
+        with self._lock:
+            self._claims[self._key(token)] = (expires_at, dict(claims))
+            self._claims.move_to_end(self._key(token))
+            while len(self._claims) > self.max_size:
+                self._claims.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._claims.clear()
+
+    def _key(self, token):
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
@@ -5,11 +5,19 @@ from tapisservice import errors
 from backend.utils import one_in
 from backend.errors.api import AuthenticationError
 from backend.services.TapisServiceAPIGateway import TapisServiceAPIGateway
-from backend.conf.constants import LOCAL_DEV_HOSTS
+from backend.helpers.TokenCache import TokenCache
+from backend.helpers.TTLCache import TTLCache
+from backend.conf.constants import LOCAL_DEV_HOSTS, TENANT_CACHE_TTL
 
 
+# NOTE A single service client is shared by every request
 service_client = TapisServiceAPIGateway().get_client()
 
+token_cache = TokenCache()
+
+# Tenant ids by base url
+tenant_id_cache = TTLCache(max_size=1000, ttl=TENANT_CACHE_TTL)
+
 def resolve_tenant_id(base_url):
     """
     Returns the tenant_id associated with the base url of a request.
@@ -18,14 +26,27 @@ def resolve_tenant_id(base_url):
         logging.debug("Resolving tenant id to 'dev' for local testing.")
         return "dev"
 
-    tenants = service_client.tenant_cache
-    tenant = tenants.get_tenant_config(url=base_url)
+    tenant_id = tenant_id_cache.get(base_url)
+    if tenant_id == None:
+        tenants = service_client.tenant_cache
+        tenant_id = tenants.get_tenant_config(url=base_url).tenant_id
+        tenant_id_cache.set(base_url, tenant_id)
+
+    return tenant_id
 
-    return tenant.tenant_id
+def validate_token(token):
+    """Returns the claims of the token. Raises an exception if the token is
+    invalid. The claims of valid tokens are cached until the token expires"""
+    claims = token_cache.get(token)
+    if claims == None:
+        claims = service_client.validate_token(token)
+        token_cache.set(token, claims)
+
+    return claims
 
 def resolve_tapis_v3_token(token, tenant_id):
     try:
-        claims = service_client.validate_token(token)
+        claims = validate_token(token)
     except errors.AuthenticationError as e:
         raise AuthenticationError(f"Tapis token validation failed; details: {e}")
     except Exception as e:
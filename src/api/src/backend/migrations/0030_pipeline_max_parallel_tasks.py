@@ -0,0 +1,19 @@
+# Generated by Django 4.1.2 on 2026-10-18 12:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0029_pipelinerun_description_pipelinerun_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipeline',
+            name='max_parallel_tasks',
+            field=models.IntegerField(null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
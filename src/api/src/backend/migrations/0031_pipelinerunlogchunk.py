@@ -0,0 +1,34 @@
+# Generated by Django 4.1.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0030_pipeline_max_parallel_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineRunLogChunk',
+            fields=[
+                ('offset', models.BigIntegerField()),
+                ('end', models.BigIntegerField()),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('pipeline_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_chunks', to='backend.pipelinerun')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pipelinerunlogchunk',
+            index=models.Index(fields=['pipeline_run', 'end'], name='backend_pip_pipelin_6b8e3f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='pipelinerunlogchunk',
+            constraint=models.UniqueConstraint(fields=('pipeline_run', 'offset'), name='pipelinerunlogchunk_pipeline_run_offset'),
+        ),
+    ]
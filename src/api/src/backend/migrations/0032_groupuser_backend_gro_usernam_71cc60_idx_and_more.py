@@ -0,0 +1,29 @@
+# Generated by Django 4.1.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0031_pipelinerunlogchunk'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='groupuser',
+            index=models.Index(fields=['username', 'group'], name='backend_gro_usernam_71cc60_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pipeline',
+            index=models.Index(fields=['group', 'created_at', 'uuid'], name='backend_pip_group_i_f9d0d5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pipelinerun',
+            index=models.Index(fields=['pipeline', 'started_at', 'uuid'], name='backend_pip_pipelin_64c804_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskexecution',
+            index=models.Index(fields=['pipeline_run', 'started_at', 'uuid'], name='backend_tas_pipelin_2d6661_idx'),
+        ),
+    ]
@@ -337,6 +337,12 @@ class GroupUser(models.Model):
     is_admin = models.BooleanField(default=False)
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4)
 
+    class Meta:
+        indexes = [
+            # Memberships are looked up by username, and by username and group
+            models.Index(fields=["username", "group"])
+        ]
+
 class Identity(models.Model):
     name = models.CharField(max_length=64)
     description = models.TextField(null=True)
@@ -368,6 +374,7 @@ class Pipeline(models.Model):
     )
     max_retries = models.IntegerField(default=DEFAULT_MAX_RETRIES)
     duplicate_submission_policy = models.CharField(max_length=32, choices=DUPLICATE_SUBMISSION_POLICIES, default=EnumDuplicateSubmissionPolicy.Terminate)
+    max_parallel_tasks = models.IntegerField(null=True, validators=[MinValueValidator(1)])
     owner = models.CharField(max_length=64)
     retry_policy = models.CharField(max_length=32, default=EnumRetryPolicy.ExponentialBackoff)
     updated_at = models.DateTimeField(auto_now=True)
@@ -382,6 +389,10 @@ class Pipeline(models.Model):
                 name="pipeline_id_group"
             )
         ]
+        indexes = [
+            # The keyset of the pipeline list
+            models.Index(fields=["group", "created_at", "uuid"])
+        ]
 
 class PipelineArchive(models.Model):
     pipeline = models.ForeignKey("backend.Pipeline", related_name="archives", on_delete=models.CASCADE)
@@ -406,6 +417,32 @@ class PipelineRun(models.Model):
     started_at = models.DateTimeField(null=True)
     uuid = models.UUIDField(primary_key=True)
 
+    class Meta:
+        indexes = [
+            # The keyset of the run list
+            models.Index(fields=["pipeline", "started_at", "uuid"])
+        ]
+
+class PipelineRunLogChunk(models.Model):
+    # The byte offsets of the chunk in the pipeline run's log file
+    offset = models.BigIntegerField()
+    end = models.BigIntegerField()
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    pipeline_run = models.ForeignKey("backend.PipelineRun", related_name="log_chunks", on_delete=models.CASCADE)
+    uuid = models.UUIDField(primary_key=True, default=uuid.uuid4)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["pipeline_run", "offset"],
+                name="pipelinerunlogchunk_pipeline_run_offset"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["pipeline_run", "end"])
+        ]
+
 class Task(models.Model):
     class Meta:
         constraints = [
@@ -522,4 +559,10 @@ class TaskExecution(models.Model):
     stderr = models.TextField(null=True)
     status = models.CharField(max_length=16, choices=TASK_EXECUTION_STATUSES, default=RUN_STATUS_PENDING)
     task = models.ForeignKey("backend.Task", related_name="task_executions", on_delete=models.CASCADE)
-    uuid = models.UUIDField(primary_key=True)
\ No newline at end of file
+    uuid = models.UUIDField(primary_key=True)
+
+    class Meta:
+        indexes = [
+            # The keyset of the task execution list
+            models.Index(fields=["pipeline_run", "started_at", "uuid"])
+        ]
\ No newline at end of file
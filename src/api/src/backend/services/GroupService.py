@@ -1,36 +1,129 @@
 from typing import Union
+from threading import local
+
+from django.db.models.signals import post_save, post_delete
 
 from backend.models import Group, GroupUser
+from backend.helpers.TTLCache import TTLCache
+from backend.conf.constants import GROUP_CACHE_MAX_SIZE, GROUP_CACHE_TTL
 
 
 class GroupService:
-    def user_in_group(self, username, group_id, tenant_id, is_admin: Union[bool, None]=None):
-        kwargs = {}
-        if is_admin is not None:
-            kwargs["is_admin"] = is_admin
+    """Group lookups are cached for the duration of a request and in a short
+    lived process cache. Only groups that exist and memberships of users that
+    belong to a group are cached, so a group or user that was just added is
+    never reported missing. The cached entries of a group or group user are
+    invalidated whenever it is saved or deleted"""
+    def __init__(self, max_size=GROUP_CACHE_MAX_SIZE, ttl=GROUP_CACHE_TTL):
+        # Groups by (tenant_id, group_id)
+        self._groups = TTLCache(max_size, ttl)
+        # Whether the user is an admin by (tenant_id, group_id, username)
+        self._memberships = TTLCache(max_size, ttl)
+        self._request = local()
+
+    def begin_request(self):
+        """Starts the request-scoped cache of the current thread"""
+        self._request.groups = {}
+        self._request.memberships = {}
+
+    def end_request(self):
+        self._request.groups = None
+        self._request.memberships = None
 
+    def user_in_group(self, username, group_id, tenant_id, is_admin: Union[bool, None]=None):
         # Get the group
         group = self.get(group_id, tenant_id)
-        
+
         # Group does not exist, return false
         if group == None: return False
 
-        # Get all the group user object for this user
-        return GroupUser.objects.filter(
-            username=username,
-            group=group,
-            **kwargs
-        ).exists()
+        # Whether the user is an admin of the group. None if the user does not
+        # belong to the group
+        key = (tenant_id, group_id, username)
+        user_is_admin = self._get_cached("memberships", self._memberships, key)
+        if user_is_admin == None:
+            group_user = GroupUser.objects.filter(
+                username=username,
+                group=group
+            ).only("is_admin").first()
+
+            user_is_admin = group_user.is_admin if group_user != None else None
+            if user_is_admin != None:
+                self._set_cached("memberships", self._memberships, key, user_is_admin)
+
+        if user_is_admin == None:
+            return False
+
+        return is_admin is None or user_is_admin == is_admin
 
     def user_owns_group(self, username, group_id, tenant_id):
-        return Group.objects.filter(
-            id=group_id,
-            owner=username,
-            tenant_id=tenant_id
-        ).exists()
+        group = self.get(group_id, tenant_id)
+
+        return group != None and group.owner == username
 
     def get(self, group_id, tenant_id):
-        return Group.objects.filter(
-            id=group_id, tenant_id=tenant_id).first()
+        key = (tenant_id, group_id)
+        group = self._get_cached("groups", self._groups, key)
+        if group == None:
+            group = Group.objects.filter(
+                id=group_id, tenant_id=tenant_id).first()
+            if group != None:
+                self._set_cached("groups", self._groups, key, group)
+
+        return group
+
+    def invalidate_group(self, group_id, tenant_id):
+        """Removes the group and the memberships of its users from the caches"""
+        self._groups.delete((tenant_id, group_id))
+        self._memberships.delete_where(lambda key: key[:2] == (tenant_id, group_id))
+        self._clear_request()
+
+    def invalidate_group_user(self, username, group_id, tenant_id):
+        self._memberships.delete((tenant_id, group_id, username))
+        self._clear_request()
+
+    def clear(self):
+        self._groups.clear()
+        self._memberships.clear()
+        self._clear_request()
+
+    def _get_cached(self, name, cache, key):
+        request_cache = getattr(self._request, name, None)
+        if request_cache != None and key in request_cache:
+            return request_cache[key]
+
+        value = cache.get(key)
+        if request_cache != None and value != None:
+            request_cache[key] = value
+
+        return value
+
+    def _set_cached(self, name, cache, key, value):
+        request_cache = getattr(self._request, name, None)
+        if request_cache != None:
+            request_cache[key] = value
+
+        cache.set(key, value)
+
+    def _clear_request(self):
+        if getattr(self._request, "groups", None) != None:
+            self.begin_request()
+
+service = GroupService()
+
+def _on_group_change(sender, instance, **_):
+    service.invalidate_group(instance.id, instance.tenant_id)
+
+def _on_group_user_change(sender, instance, **_):
+    # NOTE The group may already be deleted when its users are deleted
+    try:
+        group = instance.group
+    except Group.DoesNotExist:
+        return
+
+    service.invalidate_group_user(instance.username, group.id, group.tenant_id)
 
-service = GroupService()
\ No newline at end of file
+post_save.connect(_on_group_change, sender=Group, dispatch_uid="group_service_group_saved")
+post_delete.connect(_on_group_change, sender=Group, dispatch_uid="group_service_group_deleted")
+post_save.connect(_on_group_user_change, sender=GroupUser, dispatch_uid="group_service_group_user_saved")
+post_delete.connect(_on_group_user_change, sender=GroupUser, dispatch_uid="group_service_group_user_deleted")
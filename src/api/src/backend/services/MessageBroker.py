@@ -1,10 +1,21 @@
-import os
+import os, logging
+
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+from threading import BoundedSemaphore
 
 import pika
 
 from pika.exchange_type import ExchangeType
+from pika.exceptions import AMQPError
 
-from backend.errors.message_broker import InvalidExchangeError
+from backend.errors.message_broker import InvalidExchangeError, PublishError
+from backend.conf.constants import (
+    BROKER_POOL_SIZE,
+    BROKER_POOL_TIMEOUT,
+    BROKER_PUBLISH_RETRIES,
+    BROKER_HEARTBEAT
+)
 
 
 EXCHANGES = [
@@ -12,44 +23,152 @@ EXCHANGES = [
     "tasks",
 ]
 
+class PooledChannel:
+    """A connection to the broker and its channel in confirm mode. Exchanges
+    are declared once per channel"""
+    def __init__(self, connection):
+        self.connection = connection
+        self.channel = connection.channel()
+        # Publishes block until the broker has confirmed the message
+        self.channel.confirm_delivery()
+        self.exchanges = set()
+
+    def is_open(self):
+        if not self.connection.is_open or not self.channel.is_open:
+            return False
+
+        # Services the heartbeats missed while the connection was idle in the
+        # pool. Raises if the broker has closed the connection
+        try:
+            self.connection.process_data_events(time_limit=0)
+        except AMQPError:
+            return False
+
+        return True
+
+    def publish(self, exchange, message, message_id=None):
+        if exchange not in self.exchanges:
+            self.channel.exchange_declare(exchange, exchange_type=ExchangeType.fanout)
+            self.exchanges.add(exchange)
+
+        self.channel.basic_publish(
+            exchange=exchange,
+            routing_key="",
+            body=message,
+            properties=pika.BasicProperties(message_id=message_id)
+        )
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
 class MessageBroker:
-    def __init__(self):
+    """Publishes messages to the broker over a pool of persistent connections.
+
+    Each connection is used by one thread at a time. Connections are opened as
+    needed, up to 'pool_size', and kept open between publishes. A connection
+    that was closed is replaced, and the messages that were not confirmed are
+    published again on the new connection.
+
+    Delivery is at least once. A message that reached the broker before its
+    connection was lost is published again, so consumers must drop the copies
+    of a message by its message id.
+    """
+    def __init__(
+        self,
+        pool_size=BROKER_POOL_SIZE,
+        pool_timeout=BROKER_POOL_TIMEOUT,
+        retries=BROKER_PUBLISH_RETRIES,
+        connect=None
+    ):
         self.user = os.environ["BROKER_USER"]
         self.password = os.environ["BROKER_PASSWORD"]
         self.url = os.environ["BROKER_URL"]
         self.port = os.environ["BROKER_PORT"]
-        self.channel = None
 
         self.connection_parameters = pika.ConnectionParameters(
             self.url,
             self.port,
             "/",
-            pika.PlainCredentials(self.user, self.password)
+            pika.PlainCredentials(self.user, self.password),
+            heartbeat=BROKER_HEARTBEAT
         )
 
-
-    def _open_connection(self):
-        # Initialize connection to the message queue
-        self.connection = pika.BlockingConnection(self.connection_parameters)
-
-        # Create a channel and declare an exchange
-        self.channel = self.connection.channel()
-
-    def _close_connection(self):
-        self.connection.close()
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.retries = retries
+        self._connect = connect or pika.BlockingConnection
+        self._idle = LifoQueue()
+        self._slots = BoundedSemaphore(pool_size)
 
     def _validate_exchange(self, exchange):
         # Normalize the exchange name
         if exchange not in EXCHANGES:
             raise InvalidExchangeError(f"Exchange {exchange} is not a valid option. Exchanges: {EXCHANGES}")
 
-    def publish(self, exchange, message):
+    def publish(self, exchange, message, message_id=None):
+        self.publish_many(exchange, [message], message_ids=[message_id])
+
+    def publish_many(self, exchange, messages, message_ids=None):
+        """Publishes a batch of messages in order over a single connection of
+        the pool. 'message_ids' are the ids of the messages, which are the same
+        for every copy of a message that is published"""
         self._validate_exchange(exchange)
-        self._open_connection()
-        self.channel.exchange_declare(exchange, exchange_type=ExchangeType.fanout)
 
-        # Publish message to the message queue and close the connection
-        self.channel.basic_publish(exchange=exchange, routing_key="", body=message)
-        self._close_connection()
+        pending = list(zip(messages, message_ids or [None]*len(messages)))
+        attempts = 0
+        while len(pending) > 0:
+            try:
+                with self._channel() as channel:
+                    while len(pending) > 0:
+                        channel.publish(exchange, *pending[0])
+                        pending.pop(0)
+            except AMQPError as e:
+                attempts += 1
+                if attempts > self.retries:
+                    raise PublishError(f"Failed to publish {len(pending)} message(s) to exchange '{exchange}': {e.__class__.__name__} {e}")
+
+                logging.warning(f"Publish to exchange '{exchange}' failed. Retrying on a new connection: {e.__class__.__name__} {e}")
+
+    def close(self):
+        """Closes the idle connections of the pool"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                return
+
+    @contextmanager
+    def _channel(self):
+        # Checks out a channel of the pool. The channel is discarded if it
+        # fails, otherwise it is returned to the pool
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise PublishError(f"Timed out waiting for a connection to the message broker. Pool size: {self.pool_size}")
+
+        channel = None
+        try:
+            channel = self._checkout()
+            yield channel
+            self._idle.put(channel)
+        except Exception as e:
+            if channel != None:
+                channel.close()
+            raise e
+        finally:
+            self._slots.release()
+
+    def _checkout(self):
+        while True:
+            try:
+                channel = self._idle.get_nowait()
+            except Empty:
+                return PooledChannel(self._connect(self.connection_parameters))
+
+            if channel.is_open():
+                return channel
+
+            channel.close()
 
-service = MessageBroker()
\ No newline at end of file
+service = MessageBroker()
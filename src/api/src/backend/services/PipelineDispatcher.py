@@ -51,12 +51,15 @@ class PipelineDispatcher:
             raise ServerError(message=str(e))
 
         try:
+            # The engine drops the copies of a submission by its message id,
+            # the uuid of the pipeline run
             broker.publish(
                 "workflows",
-                json.dumps(service_request, default=self._uuid_convert)
+                json.dumps(service_request, default=self._uuid_convert),
+                message_id=str(pipeline_run.uuid)
             )
         except Exception as e: # TODO use exact exception
-            message = f"Failed publish the service request to the message broker: {e.__cause__}"
+            message = f"Failed publish the service request to the message broker: {e}"
             logging.error(message)
             raise ServerError(message=message)
         
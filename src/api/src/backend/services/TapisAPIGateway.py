@@ -41,6 +41,13 @@ class TapisAPIGateway:
         return self.tenant_id
 
     def get_client(self):
+        # The client of a jwt-authenticated user is only created when needed
+        if self.client == None and "jwt" in self.credentials:
+            self.client = Tapis(
+                base_url=self.base_url,
+                jwt=self.credentials["jwt"]
+            )
+
         return self.client
 
     def _password(self, credentials):
@@ -62,11 +69,7 @@ class TapisAPIGateway:
 
     def _jwt(self, credentials):
         try:
-            self.client = Tapis(
-                base_url=self.base_url,
-                jwt=credentials["jwt"]
-            )
-
+            self.credentials = {"jwt": credentials["jwt"]}
             self.username = resolve_tapis_v3_token(
                 credentials["jwt"],
                 self.tenant_id
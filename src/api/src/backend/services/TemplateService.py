@@ -0,0 +1,96 @@
+import io, os, copy, json, time, fcntl, shutil, hashlib
+
+from threading import Lock
+
+import git
+
+from backend.views.http.requests import Uses
+from backend.conf.constants import TEMPLATE_CACHE_DIR, TEMPLATE_REPO_TTL
+
+
+class TemplateService:
+    """Reads templates from bare mirrors of the template repositories. A mirror
+    is fetched at most once every 'ttl' seconds, and templates are parsed once
+    per commit of the template repository"""
+    def __init__(self, cache_dir=TEMPLATE_CACHE_DIR, ttl=TEMPLATE_REPO_TTL):
+        self._cache_dir = cache_dir
+        self.ttl = ttl
+        self._lock = Lock()
+        # The sha of the commit each template was read from and the template
+        self._templates = {}
+
+    def get(self, uses: Uses) -> dict:
+        """Returns a copy of the template of the uses"""
+        key = (uses.source.url, uses.source.branch, uses.name, uses.path)
+        with self._lock:
+            mirror_dir = self._mirror(uses.source.url)
+            sha = self._git(
+                mirror_dir,
+                "rev-parse",
+                f"{uses.source.branch or 'HEAD'}^{{commit}}"
+            ).decode().strip()
+
+            (cached_sha, template) = self._templates.get(key, (None, None))
+            if cached_sha != sha:
+                template = self._read_template(mirror_dir, sha, uses)
+                self._templates[key] = (sha, template)
+
+        return copy.deepcopy(template)
+
+    def _read_template(self, mirror_dir, sha, uses: Uses):
+        path_to_template = uses.path
+        if uses.name != None:
+            owe_config = json.loads(self._read_file(mirror_dir, sha, "owe-config.json"))
+            template_ref = owe_config.get(uses.name, None)
+            if template_ref == None or template_ref.get("path", None) == None:
+                raise Exception(f"Template reference for key '{uses.name}' not found in the config file")
+
+            path_to_template = template_ref.get("path")
+
+        return json.loads(
+            self._read_file(mirror_dir, sha, os.path.normpath(path_to_template))
+        )
+
+    def _read_file(self, mirror_dir, sha, path):
+        try:
+            return self._git(mirror_dir, "show", f"{sha}:{path}")
+        except git.exc.GitCommandError:
+            raise Exception(f"File '{path}' not found in the template repository")
+
+    def _mirror(self, url):
+        # Returns the directory of the url's mirror once it is fresh. The lock
+        # file keeps the processes of the api from fetching at the same time
+        os.makedirs(self._cache_dir, exist_ok=True)
+        mirror_dir = os.path.join(
+            self._cache_dir,
+            hashlib.sha256(url.encode("utf-8")).hexdigest() + ".git"
+        )
+        fetched_at_file = os.path.join(mirror_dir, "owe-fetched-at")
+        with open(mirror_dir + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if not os.path.exists(fetched_at_file):
+                    shutil.rmtree(mirror_dir, ignore_errors=True)
+                    git.cmd.Git().execute(["git", "clone", "--mirror", "--quiet", url, mirror_dir])
+                elif time.time() - os.path.getmtime(fetched_at_file) >= self.ttl:
+                    self._git(mirror_dir, "fetch", "--prune", "--quiet")
+                else:
+                    return mirror_dir
+
+                with open(fetched_at_file, "w"):
+                    pass
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        return mirror_dir
+
+    def _git(self, mirror_dir, *args):
+        output = io.BytesIO()
+        git.cmd.Git().execute(
+            ["git", f"--git-dir={mirror_dir}", *args],
+            output_stream=output
+        )
+
+        return output.getvalue()
+
+service = TemplateService()
@@ -16,10 +16,13 @@ from backend.views.AddPipelineArchive import AddPipelineArchive
 from backend.views.RemovePipelineArchive import RemovePipelineArchive
 from backend.views.ListPipelineArchives import ListPipelineArchives
 from backend.views.PipelineRuns import PipelineRuns
+from backend.views.PipelineRunLogs import PipelineRunLogs
 from backend.views.TaskExecutions import TaskExecutions
 from backend.views.UpdatePipelineRunStatus import UpdatePipelineRunStatus
 from backend.views.UpdateTaskExecutionStatus import UpdateTaskExecutionStatus
 from backend.views.CreateTaskExecution import CreateTaskExecution
+from backend.views.CreateTaskExecutions import CreateTaskExecutions
+from backend.views.UpdateTaskExecutionStatuses import UpdateTaskExecutionStatuses
 from backend.views.ETLPipelines import ETLPipelines
 
 
@@ -66,11 +69,14 @@ urlpatterns = [
     # Pipeline Runs
     path("groups/<str:group_id>/pipelines/<str:pipeline_id>/runs", PipelineRuns.as_view(), name="pipelineRuns"),
     path("groups/<str:group_id>/pipelines/<str:pipeline_id>/runs/<str:pipeline_run_uuid>", PipelineRuns.as_view(), name="pipelineRun"),
+    path("groups/<str:group_id>/pipelines/<str:pipeline_id>/runs/<str:pipeline_run_uuid>/logs", PipelineRunLogs.as_view(), name="pipelineRunLogs"),
     
     # NOTE The route below must come before the route below it as it matches
     # the more general pattern layed out in the latter route
     # Task Executions
     path("executor/runs/<str:pipeline_run_uuid>/executions", CreateTaskExecution.as_view(), name="createTaskExecution"),
+    path("executor/runs/<str:pipeline_run_uuid>/executions/bulk", CreateTaskExecutions.as_view(), name="createTaskExecutions"),
+    path("executor/runs/<str:pipeline_run_uuid>/executions/statuses", UpdateTaskExecutionStatuses.as_view(), name="updateTaskExecutionStatuses"),
     
     # Pipeline Runs cont.
     path("executor/runs/<str:pipeline_run_uuid>/<str:status>", UpdatePipelineRunStatus.as_view(), name="updatePipelineRunStatus"),
@@ -66,6 +66,7 @@ class CIPipelines(RestrictedAPIView):
                 max_retries=body.execution_profile.max_retries,
                 retry_policy=body.execution_profile.retry_policy,
                 duplicate_submission_policy=body.execution_profile.duplicate_submission_policy,
+                max_parallel_tasks=body.execution_profile.max_parallel_tasks,
                 env=body.dict()["env"],
                 params=body.dict()["params"]
             )
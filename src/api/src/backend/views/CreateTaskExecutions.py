@@ -0,0 +1,70 @@
+from django.db import DatabaseError, IntegrityError, OperationalError, transaction
+from django.utils import timezone
+
+from backend.views.RestrictedAPIView import RestrictedAPIView
+from backend.views.http.requests import ReqCreateTaskExecutions
+from backend.views.http.responses import BaseResponse
+from backend.views.http.responses.errors import (
+    ServerError,
+    BadRequest
+)
+from backend.models import Task, PipelineRun, TaskExecution
+from backend.utils import executor_request_is_valid
+
+
+class CreateTaskExecutions(RestrictedAPIView):
+    def post(self, request, pipeline_run_uuid, *_,  **__):
+        if not executor_request_is_valid(request):
+            return BadRequest(message=f"X-WORKFLOW-EXECUTOR-TOKEN header is invalid")
+
+        prepared_request = self.prepare(ReqCreateTaskExecutions)
+
+        if not prepared_request.is_valid:
+            return prepared_request.failure_view
+
+        body = prepared_request.body
+
+        try:
+            # Get the pipeline run these task executions belong to
+            run = PipelineRun.objects.select_related("pipeline").filter(uuid=pipeline_run_uuid).first()
+            if run == None: return BadRequest(message=f"Pipeline run with uuid {pipeline_run_uuid} not found")
+
+            # Get all of the tasks in a single query
+            task_ids = set([execution.task_id for execution in body.executions])
+            tasks = {
+                task.id: task for task in Task.objects.filter(
+                    pipeline=run.pipeline,
+                    id__in=task_ids
+                )
+            }
+            missing_task_ids = task_ids - set(tasks.keys())
+            if len(missing_task_ids) > 0:
+                return BadRequest(message=f"Tasks with ids {sorted(missing_task_ids)} not found")
+
+            # Create the task executions
+            now = timezone.now()
+            with transaction.atomic():
+                # NOTE Conflicts are ignored so that the executor can safely
+                # resend a batch it did not receive a response for
+                TaskExecution.objects.bulk_create(
+                    [
+                        TaskExecution(
+                            task=tasks[execution.task_id],
+                            pipeline_run=run,
+                            started_at=now,
+                            last_modified=now,
+                            uuid=execution.uuid
+                        )
+                        for execution in body.executions
+                    ],
+                    ignore_conflicts=True
+                )
+
+        except (DatabaseError, IntegrityError, OperationalError) as e:
+            return ServerError(message=f"There was an error creating the Task Executions: {e.__cause__}")
+
+        return BaseResponse(
+            status=201,
+            message="created",
+            result=[execution.uuid for execution in body.executions]
+        )
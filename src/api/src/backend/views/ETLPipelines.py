@@ -1,5 +1,3 @@
-import os, json
-
 import git
 
 from pydantic import ValidationError
@@ -30,6 +28,7 @@ from backend.models import (
 )
 from backend.services.TaskService import service as task_service
 from backend.services.GroupService import service as group_service
+from backend.services.TemplateService import service as template_service
 from backend.errors.api import BadRequestError, ServerError
 from backend.helpers import resource_url_builder
 from backend.conf.constants import (
@@ -78,34 +77,12 @@ class ETLPipelines(RestrictedAPIView):
         if PipelineModel.objects.filter(id=body.id, group=group).exists():
             return Conflict(f"A Pipeline already exists with the id '{body.id}'")
         
-        # Clone the git repository that contains the pipeline and task definitions that will be used
-        tapis_owe_templates_dir = "/tmp/git/tapis-workflows-task-templates"
-        cloned = os.path.exists(tapis_owe_templates_dir)
-        if not cloned:
-            try:
-                git.Repo.clone_from(
-                    uses.source.url,
-                    tapis_owe_templates_dir
-                )
-            except Exception as e:
-                return ServerErrorResp(f"Error cloning the Tapis OWE Template repository: {str(e)}")
-            
-        # A local tapis owe templates repo exists, update it with a git pull
-        git.cmd.Git(tapis_owe_templates_dir).pull()
-        
+        # Fetch the pipeline template from the git repository that contains the
+        # pipeline and task definitions that will be used
         try:
-            # Open the owe-config.json file
-            with open(os.path.join(tapis_owe_templates_dir, "owe-config.json")) as file:
-                owe_config = json.loads(file.read())
-
-            # Open the etl pipeline schema.json
-            with open(
-                os.path.join(
-                    tapis_owe_templates_dir,
-                    owe_config.get(LATEST_TAPIS_ETL_PIPELINE_TEMPLATE_NAME).get("path")
-                )
-            ) as file:
-                pipeline_template = json.loads(file.read())
+            pipeline_template = template_service.get(uses)
+        except git.exc.GitCommandError as e:
+            return ServerErrorResp(f"Error fetching the Tapis OWE Template repository: {str(e)}")
         except Exception as e:
             return UnprocessableEntity(f"Configuration Error (owe-config.json): {str(e)}")
 
@@ -0,0 +1,143 @@
+from django.db import DatabaseError, IntegrityError, OperationalError
+
+from backend.views.RestrictedAPIView import RestrictedAPIView
+from backend.views.http.responses.BaseResponse import BaseResponse
+from backend.views.http.responses.errors import (
+    ServerError,
+    Forbidden,
+    NotFound,
+    BadRequest
+)
+from backend.services.GroupService import service as group_service
+from backend.models import PipelineRun, PipelineRunLogChunk, Pipeline
+from backend.conf.constants import PIPELINE_RUN_LOGS_MAX_LIMIT
+
+
+class PipelineRunLogs(RestrictedAPIView):
+    """Returns a range of a pipeline run's logs. Query params (all in bytes):
+        offset: the offset of the first byte to return. Defaults to 0
+        limit: the maximum number of bytes to return
+        tail: return the last 'tail' bytes instead. Overrides offset
+    Pass the returned 'next_offset' as the offset of the next request to follow
+    the logs of a run that is still running"""
+    def get(self, request, group_id, pipeline_id, pipeline_run_uuid, *_,  **__):
+        try:
+            (offset, limit, tail) = [
+                int(request.GET[param]) if param in request.GET else None
+                for param in ["offset", "limit", "tail"]
+            ]
+        except ValueError:
+            return BadRequest(message="Query params 'offset', 'limit', and 'tail' must be integers")
+
+        if any([param != None and param < 0 for param in [offset, limit, tail]]):
+            return BadRequest(message="Query params 'offset', 'limit', and 'tail' must not be negative")
+
+        limit = min(limit if limit != None else PIPELINE_RUN_LOGS_MAX_LIMIT, PIPELINE_RUN_LOGS_MAX_LIMIT)
+
+        try:
+            # Get the group
+            group = group_service.get(group_id, request.tenant_id)
+            if group == None:
+                return NotFound(f"No group found with id '{group_id}'")
+
+            # Check that the user belongs to the group
+            if not group_service.user_in_group(request.username, group_id, request.tenant_id):
+                return Forbidden(message="You do not have access to this group")
+
+            # Get the pipline
+            pipeline = Pipeline.objects.filter(
+                group=group,
+                id=pipeline_id
+            ).first()
+
+            # Return if BadRequest if no pipeline found
+            if pipeline == None:
+                return BadRequest(f"Pipline '{pipeline_id}' does not exist")
+
+            run = PipelineRun.objects.filter(
+                pipeline=pipeline,
+                uuid=pipeline_run_uuid
+            ).first()
+
+            if run == None:
+                return BadRequest(f"PiplineRun with uuid '{pipeline_run_uuid}' does not exist")
+
+            chunks = PipelineRunLogChunk.objects.filter(pipeline_run=run)
+            last_chunk = chunks.order_by("-end").only("end").first()
+
+            # Runs that shipped their logs whole store them on the run itself
+            if last_chunk == None:
+                logs = (run.logs or "").encode("utf-8")
+                size = len(logs)
+                start = self._start(offset, tail, size)
+                return self._response(logs[start:start+limit], start, size)
+
+            size = last_chunk.end
+            start = self._start(offset, tail, size)
+            end = min(start + limit, size)
+
+            # Only the chunks that overlap the requested range are fetched. The
+            # logs returned stop short at a gap between chunks (i.e. a chunk that
+            # was never shipped) and resume at the next chunk on the next request
+            logs = b""
+            position = None
+            for chunk in chunks.filter(end__gt=start, offset__lt=end).order_by("offset"):
+                if position == None:
+                    start = position = max(start, chunk.offset)
+                if chunk.offset > position:
+                    break
+
+                content = chunk.content.encode("utf-8")[position-chunk.offset:]
+                logs += content
+                position += len(content)
+
+            return self._response(logs[:max(0, end-start)], start, size)
+
+        # TODO catch the specific error thrown by the group service
+        except (DatabaseError, IntegrityError, OperationalError) as e:
+            return ServerError(message=e.__cause__)
+        except Exception as e:
+            return ServerError(message=e)
+
+    def _start(self, offset, tail, size):
+        if tail != None:
+            return max(0, size - tail)
+
+        return min(offset or 0, size)
+
+    def _complete_characters(self, logs, start):
+        # Trims the range to the utf-8 characters it contains whole. The bytes
+        # of a character that starts before the range are skipped, and those of
+        # a character that ends after it are left to the next range
+        skipped = 0
+        while skipped < min(3, len(logs)) and logs[skipped] & 0xC0 == 0x80:
+            skipped += 1
+        logs = logs[skipped:]
+
+        for i in range(1, min(4, len(logs)) + 1):
+            byte = logs[-i]
+            # A continuation byte
+            if byte & 0xC0 == 0x80:
+                continue
+            # The first byte of a character and the length of the character
+            if byte >= 0xC0:
+                length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+                if length > i:
+                    logs = logs[:-i]
+            break
+
+        return (logs, start + skipped)
+
+    def _response(self, logs, start, size):
+        (logs, start) = self._complete_characters(logs, start)
+        return BaseResponse(
+            status=200,
+            success=True,
+            message="success",
+            result={
+                "logs": logs.decode("utf-8", errors="replace"),
+                "offset": start,
+                "next_offset": start + len(logs),
+                "size": size
+            }
+        )
@@ -11,10 +11,28 @@ from backend.views.http.responses.errors import (
     BadRequest
 )
 from backend.services.GroupService import service as group_service
-from backend.models import PipelineRun, Pipeline
+from backend.models import PipelineRun, PipelineRunLogChunk, Pipeline
+from backend.helpers.KeysetPaginator import KeysetPaginator, parse_list, parse_datetime
+from backend.errors.api import BadRequestError
+
+
+paginator = KeysetPaginator(
+    PipelineRun,
+    "started_at",
+    # NOTE The logs of a run are returned by the run and logs endpoints only
+    excluded=["logs"],
+    filters={
+        "status": ("status__in", parse_list),
+        "started_after": ("started_at__gte", parse_datetime),
+        "started_before": ("started_at__lt", parse_datetime)
+    }
+)
 
 
 class PipelineRuns(RestrictedAPIView):
+    """Runs are listed newest first a page at a time. See KeysetPaginator for
+    the query params. The logs of a run are not listed. They are returned with
+    the run, and a range of them by the PipelineRunLogs endpoint"""
     def get(self, request, group_id, pipeline_id, pipeline_run_uuid=None, *_,  **__):
         try:
             # Get the group
@@ -37,7 +55,7 @@ class PipelineRuns(RestrictedAPIView):
                 return BadRequest(f"Pipline '{pipeline_id}' does not exist")
 
             if pipeline_run_uuid == None:
-                return self.list(pipeline)
+                return self.list(request, pipeline)
 
             run = PipelineRun.objects.filter(
                 pipeline=pipeline,
@@ -47,8 +65,11 @@ class PipelineRuns(RestrictedAPIView):
             if run == None:
                 return BadRequest(f"PiplineRun with uuid '{pipeline_run_uuid}' does not exist")
 
+            logs = self._logs(run)
+
             # Format the started at and last_modified
             run = model_to_dict(run)
+            run["logs"] = logs
             
             run["started_at"] = run["started_at"].strftime("%Y-%m-%d %H:%M:%S") if run["started_at"] else None
             run["last_modified"] = run["last_modified"].strftime("%Y-%m-%d %H:%M:%S") if run["last_modified"] else None
@@ -67,26 +88,47 @@ class PipelineRuns(RestrictedAPIView):
             return ServerError(message=e)
 
 
-    def list(self, pipeline):
-        runs = []
+    def _logs(self, run):
+        # Runs that ship their logs incrementally store them as chunks. The
+        # logs stop short at a gap between chunks (i.e. a chunk that was never
+        # shipped). Runs that shipped their logs whole store them on the run
+        logs = []
+        position = 0
+        chunks = PipelineRunLogChunk.objects.filter(
+            pipeline_run=run).only("offset", "end", "content").order_by("offset")
+        for chunk in chunks:
+            if chunk.offset != position:
+                break
+
+            logs.append(chunk.content)
+            position = chunk.end
+
+        if position == 0:
+            return run.logs
+
+        return "".join(logs)
+
+    def list(self, request, pipeline):
         try:
-            run_models = PipelineRun.objects.filter(pipeline=pipeline)
-            for run_model in run_models:
-                run = model_to_dict(run_model)
-                
+            (runs, metadata) = paginator.paginate(
+                request.GET,
+                PipelineRun.objects.filter(pipeline=pipeline)
+            )
+            for run in runs:
                 run["started_at"] = run["started_at"].strftime("%Y-%m-%d %H:%M:%S") if run["started_at"] else None
-                run["last_modified"] = run["last_modified"].strftime("%Y-%m-%d %H:%M:%S")  if run["last_modified"] else None
-                runs.append(run)
+                if "last_modified" in run:
+                    run["last_modified"] = run["last_modified"].strftime("%Y-%m-%d %H:%M:%S")  if run["last_modified"] else None
 
             return BaseResponse(
                 status=200,
                 success=True,
                 message="success",
-                result=runs
+                result=runs,
+                metadata=metadata
             )
+        except BadRequestError as e:
+            return BadRequest(message=e.message)
         except (DatabaseError, IntegrityError, OperationalError) as e:
             return ServerError(message=e.__cause__)
         except Exception as e:
             return ServerError(message=e)
-
-        
\ No newline at end of file
@@ -11,7 +11,6 @@ from backend.views.http.responses.errors import (
     Forbidden,
     ServerError as ServerErrorResp
 )
-from backend.views.http.responses.models import ModelListResponse
 from backend.views.http.responses import BaseResponse, ResourceURLResponse
 from backend.views.http.requests import Pipeline, ImageBuildTask
 from backend.views.http.cicd import CIPipeline
@@ -25,6 +24,7 @@ from backend.services.TaskService import service as task_service
 from backend.services.GroupService import service as group_service
 from backend.errors.api import BadRequestError, ServerError
 from backend.helpers import resource_url_builder
+from backend.helpers.KeysetPaginator import KeysetPaginator, parse_datetime
 
 
 PIPELINE_TYPE_CI = "ci"
@@ -36,6 +36,16 @@ PIPELINE_TYPE_MAPPING = {
     PIPELINE_TYPE_WORKFLOW: "build_workflow_pipeline"
 }
 
+# Pipelines are listed newest first a page at a time
+paginator = KeysetPaginator(
+    PipelineModel,
+    "created_at",
+    filters={
+        "created_after": ("created_at__gte", parse_datetime),
+        "created_before": ("created_at__lt", parse_datetime)
+    }
+)
+
 class Pipelines(RestrictedAPIView):
     def get(self, request, group_id, pipeline_id=None):
         # Get the group
@@ -50,7 +60,7 @@ class Pipelines(RestrictedAPIView):
         # Get a list of all pipelines that belong to the user's groups
         # if no id is provided
         if pipeline_id == None:
-            return self.list(group)
+            return self.list(request, group)
 
         # Get the pipeline by the id provided in the path params
         pipeline = PipelineModel.objects.filter(
@@ -71,9 +81,16 @@ class Pipelines(RestrictedAPIView):
         
         return BaseResponse(result=result)
 
-    def list(self, group):
-        pipelines = PipelineModel.objects.filter(group=group)
-        return ModelListResponse(pipelines)
+    def list(self, request, group):
+        try:
+            (pipelines, metadata) = paginator.paginate(
+                request.GET,
+                PipelineModel.objects.filter(group=group)
+            )
+        except BadRequestError as e:
+            return BadRequest(message=e.message)
+
+        return BaseResponse(result=pipelines, metadata=metadata)
 
     def post(self, request, group_id, *_, **__):
         """Pipeline requests with type 'ci' are supported in order to make the 
@@ -127,6 +144,7 @@ class Pipelines(RestrictedAPIView):
                 max_retries=body.execution_profile.max_retries,
                 retry_policy=body.execution_profile.retry_policy,
                 duplicate_submission_policy=body.execution_profile.duplicate_submission_policy,
+                max_parallel_tasks=body.execution_profile.max_parallel_tasks,
                 env=body.dict()["env"],
                 params=body.dict()["params"]
             )
@@ -1,4 +1,4 @@
-import json
+import json, time, logging
 
 from pydantic import ValidationError
 from tapisservice import errors
@@ -10,7 +10,8 @@ from backend.views.http.responses.errors import MethodNotAllowed, UnsupportedMed
 from backend.views.http.responses import NoContentResponse
 from backend.views.http.requests import PreparedRequest
 from backend.services.TapisAPIGateway import TapisAPIGateway
-from backend.services.TapisServiceAPIGateway import TapisServiceAPIGateway
+from backend.helpers.tapis import validate_token
+from backend.services.GroupService import service as group_service
 from backend.utils import one_in
 from backend.conf.constants import (
     TAPIS_TOKEN_HEADER,
@@ -27,6 +28,28 @@ class RestrictedAPIView(View):
     # All methods on the RestrictedAPIView do not require a CSRF token
     @csrf_exempt
     def dispatch(self, request, *args, **kwargs):
+        # The durations of the phases of the request in milliseconds. Returned
+        # in the Server-Timing header of the response
+        request.timings = {}
+        started_at = time.perf_counter()
+
+        # Groups and memberships looked up more than once during the request
+        # are only fetched once
+        group_service.begin_request()
+        try:
+            response = self._dispatch(request, *args, **kwargs)
+        finally:
+            group_service.end_request()
+
+        request.timings["total"] = (time.perf_counter() - started_at) * 1000
+        response["Server-Timing"] = ", ".join(
+            [f"{phase};dur={round(duration, 2)}" for phase, duration in request.timings.items()]
+        )
+        logging.debug(f"{request.method} {request.path} {response['Server-Timing']}")
+
+        return response
+
+    def _dispatch(self, request, *args, **kwargs):
         # Restrict to a set of http methods
         if request.method not in PERMITTED_HTTP_METHODS:
             return MethodNotAllowed()
@@ -70,24 +93,27 @@ class RestrictedAPIView(View):
             return BadRequest(message=f"Missing header: {TAPIS_TOKEN_HEADER}")
 
         # Initialize the tapis API Gateway based on the tenant provided
+        phase_started_at = time.perf_counter()
         self.tapis_api_gateway = TapisAPIGateway(request.base_url)
         
         # Set the tenant_id on the request
         request.tenant_id = self.tapis_api_gateway.tenant_id
+        request.timings["tenant"] = (time.perf_counter() - phase_started_at) * 1000
 
         # Authenticate the user and get the account
+        phase_started_at = time.perf_counter()
         jwt = request.META[DJANGO_TAPIS_TOKEN_HEADER]
         request.authenticated = self.tapis_api_gateway.authenticate(
             {"jwt": jwt},
             auth_method="jwt"
         )
 
-        # Try to authenticate as a service
+        # Try to authenticate as a service. The claims of the token were cached
+        # when validated as a user token
         service_username = None
         if not request.authenticated:
             try:
-                service_client = TapisServiceAPIGateway(jwt=jwt).get_client()
-                claims = service_client.validate_token(jwt)
+                claims = validate_token(jwt)
             except errors.AuthenticationError as e:
                 return Unauthorized(f"Unable to validate the Tapis token; details: {e}")
             except Exception as e:
@@ -103,8 +129,14 @@ class RestrictedAPIView(View):
         if request.username == None:
             return Unauthorized(f"Authentication Error")
 
+        request.timings["auth"] = (time.perf_counter() - phase_started_at) * 1000
+
         ### Auth end ###
-        return super(RestrictedAPIView, self).dispatch(request, *args, **kwargs)
+        phase_started_at = time.perf_counter()
+        response = super(RestrictedAPIView, self).dispatch(request, *args, **kwargs)
+        request.timings["view"] = (time.perf_counter() - phase_started_at) * 1000
+
+        return response
 
     # Takes a pydantic base model and tries to validate it.
     # If it fails, a BadRequest Response is returned with the error message
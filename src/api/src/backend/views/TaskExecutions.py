@@ -14,9 +14,26 @@ from backend.views.http.responses.errors import (
 )
 from backend.services.GroupService import service as group_service
 from backend.models import Pipeline, PipelineRun, TaskExecution, Task
+from backend.helpers.KeysetPaginator import KeysetPaginator, parse_list, parse_datetime
+from backend.errors.api import BadRequestError
+
+
+paginator = KeysetPaginator(
+    TaskExecution,
+    "started_at",
+    deferred=["stdout", "stderr"],
+    filters={
+        "status": ("status__in", parse_list),
+        "started_after": ("started_at__gte", parse_datetime),
+        "started_before": ("started_at__lt", parse_datetime)
+    }
+)
 
 
 class TaskExecutions(RestrictedAPIView):
+    """Task executions are listed newest first a page at a time. See
+    KeysetPaginator for the query params. The stdout and stderr of an execution
+    are only listed if requested with the 'fields' query param"""
     def get(self, request, group_id, pipeline_id, pipeline_run_uuid, task_execution_uuid=None, *_,  **__):
         try:
             # Get the group
@@ -48,11 +65,12 @@ class TaskExecutions(RestrictedAPIView):
                 return BadRequest(f"PiplineRun with uuid '{pipeline_run_uuid}' does not exist")
 
             if task_execution_uuid == None:
-                return self.list(run)
+                return self.list(request, run)
 
             execution_model = TaskExecution.objects.filter(
+                pipeline_run=run,
                 uuid=task_execution_uuid
-            ).first()
+            ).select_related("task").first()
 
             if execution_model == None:
                 return NotFound()
@@ -75,25 +93,27 @@ class TaskExecutions(RestrictedAPIView):
         except Exception as e:
             return ServerError(message=e)
 
-    def list(self, run):
+    def list(self, request, run):
         try:
-            execution_models = TaskExecution.objects.filter(pipeline_run=run).prefetch_related("task")
-            executions = []
-            for execution_model in execution_models:
-                # Convert the model to a dict and set the task id
-                task_id = execution_model.task.id
-                execution = model_to_dict(execution_model)
-                execution["task_id"] = task_id
-
-                executions.append(execution)
+            # The id of each execution's task is selected with a join
+            (executions, metadata) = paginator.paginate(
+                request.GET,
+                TaskExecution.objects.filter(pipeline_run=run),
+                "task__id"
+            )
+            for execution in executions:
+                execution["task_id"] = execution.pop("task__id")
 
             return BaseResponse(
                 status=200,
                 success=True,
                 message="success",
-                result=executions
+                result=executions,
+                metadata=metadata
             )
+        except BadRequestError as e:
+            return BadRequest(message=e.message)
         except (DatabaseError, IntegrityError, OperationalError) as e:
             return ServerError(message=e.__cause__)
         except Exception as e:
-            return ServerError(message=e)
\ No newline at end of file
+            return ServerError(message=e)
@@ -1,4 +1,4 @@
-from django.db import DatabaseError, IntegrityError, OperationalError
+from django.db import DatabaseError, IntegrityError, OperationalError, transaction
 from django.utils import timezone
 
 from backend.views.RestrictedAPIView import RestrictedAPIView
@@ -8,7 +8,7 @@ from backend.views.http.responses.errors import (
     ServerError,
     BadRequest
 )
-from backend.models import PipelineRun
+from backend.models import PipelineRun, PipelineRunLogChunk
 from backend.utils import executor_request_is_valid
 
 
@@ -27,15 +27,42 @@ class UpdatePipelineRunStatus(RestrictedAPIView):
         body = prepared_request.body
 
         try:
-            PipelineRun.objects.filter(
-                uuid=pipeline_run_uuid).update(
-                    status=status,
-                    last_modified=timezone.now(),
-                    logs=body.logs
-                )
+            if body.logs_offset == None:
+                PipelineRun.objects.filter(
+                    uuid=pipeline_run_uuid).update(
+                        status=status,
+                        last_modified=timezone.now(),
+                        logs=body.logs
+                    )
+            else:
+                with transaction.atomic():
+                    PipelineRun.objects.filter(
+                        uuid=pipeline_run_uuid).update(
+                            status=status,
+                            last_modified=timezone.now()
+                        )
+                    self.append_logs(pipeline_run_uuid, body.logs, body.logs_offset)
         except (DatabaseError, IntegrityError, OperationalError) as e:
             return ServerError(f"Server Error: {e.__cause__}")
         except Exception as e:
             return ServerError(f"Server Error: {e}")
         
-        return BaseResponse(result="Pipeline Run updated")
\ No newline at end of file
+        return BaseResponse(result="Pipeline Run updated")
+
+    def append_logs(self, pipeline_run_uuid, logs, offset):
+        if logs == None or len(logs) == 0:
+            return
+
+        # NOTE Conflicts are ignored so that a chunk that is resent by the
+        # executor is not stored twice
+        PipelineRunLogChunk.objects.bulk_create(
+            [
+                PipelineRunLogChunk(
+                    pipeline_run_id=pipeline_run_uuid,
+                    offset=offset,
+                    end=offset + len(logs.encode("utf-8")),
+                    content=logs
+                )
+            ],
+            ignore_conflicts=True
+        )
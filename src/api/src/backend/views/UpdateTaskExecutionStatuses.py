@@ -0,0 +1,73 @@
+from uuid import UUID
+
+from django.db import DatabaseError, IntegrityError, OperationalError, transaction
+from django.utils import timezone
+
+from backend.views.RestrictedAPIView import RestrictedAPIView
+from backend.views.http.requests import ReqPatchTaskExecutions
+from backend.views.http.responses import BaseResponse
+from backend.views.http.responses.errors import (
+    BadRequest,
+    ServerError
+)
+from backend.models import TaskExecution, TASK_EXECUTION_STATUSES
+from backend.utils import executor_request_is_valid
+
+
+class UpdateTaskExecutionStatuses(RestrictedAPIView):
+    def patch(self, request, pipeline_run_uuid, *_,  **__):
+        if not executor_request_is_valid(request):
+            return BadRequest(message=f"X-WORKFLOW-EXECUTOR-TOKEN header is invalid")
+
+        prepared_request = self.prepare(ReqPatchTaskExecutions)
+
+        # Return the failure view instance if validation failed
+        if not prepared_request.is_valid:
+            return prepared_request.failure_view
+
+        # Get the JSON encoded body from the validation result
+        body = prepared_request.body
+
+        statuses = [status for (status, _) in TASK_EXECUTION_STATUSES]
+        invalid_statuses = set([
+            execution.status for execution in body.executions
+            if execution.status not in statuses
+        ])
+        if len(invalid_statuses) > 0:
+            return BadRequest(message=f"Invalid Task Execution statuses {sorted(invalid_statuses)}. Must be one of {statuses}")
+
+        # Only the last status transition of a task execution in the request
+        # is applied
+        try:
+            updates = {UUID(execution.uuid): execution for execution in body.executions}
+        except ValueError as e:
+            return BadRequest(message=f"Invalid Task Execution uuid: {e}")
+
+        try:
+            with transaction.atomic():
+                task_executions = list(
+                    TaskExecution.objects.select_for_update().filter(
+                        pipeline_run__uuid=pipeline_run_uuid,
+                        uuid__in=updates.keys()
+                    )
+                )
+
+                now = timezone.now()
+                for task_execution in task_executions:
+                    update = updates[task_execution.uuid]
+                    task_execution.status = update.status
+                    task_execution.last_modified = now
+                    task_execution.last_message = update.last_message
+                    task_execution.stdout = update.stdout
+                    task_execution.stderr = update.stderr
+
+                TaskExecution.objects.bulk_update(
+                    task_executions,
+                    ["status", "last_modified", "last_message", "stdout", "stderr"]
+                )
+        except (DatabaseError, IntegrityError, OperationalError) as e:
+            return ServerError(f"Server Error: {e.__cause__}")
+        except Exception as e:
+            return ServerError(f"Server Error: {e}")
+
+        return BaseResponse(result=f"{len(task_executions)} TaskExecution statuses updated")
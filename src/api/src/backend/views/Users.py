@@ -94,12 +94,16 @@ class Users(RestrictedAPIView):
         group_user = GroupUser.objects.filter(
             group=group,
             username=username
-        ).first().update(
-            username=username,
-            group=group,
-            is_admin=body.is_admin
-        )
-        
+        ).first()
+
+        if group_user == None:
+            return NotFound(f"User not found with username '{username}' in group '{group_id}'")
+
+        # NOTE Saving the instance (rather than updating the queryset)
+        # invalidates the user's cached membership
+        group_user.is_admin = body.is_admin
+        group_user.save()
+
         return ResourceURLResponse(
             url=resource_url_builder(request.url, group_user.username))
 
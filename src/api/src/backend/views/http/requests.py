@@ -501,6 +501,7 @@ class BaseExecutionProfile(BaseModel):
 
 class PipelineExecutionProfile(BaseExecutionProfile):
     duplicate_submission_policy: str = EnumDuplicateSubmissionPolicy.Terminate
+    max_parallel_tasks: int = None # No limit other than the engine's task runner
 
 class TaskExecutionProfile(BaseExecutionProfile):
     flavor: EnumTaskFlavor = EnumTaskFlavor.C1_MED
@@ -798,6 +799,15 @@ class ReqPatchTaskExecution(BaseModel):
     stdout: str = None
     stderr: str = None
 
+class ReqCreateTaskExecutions(BaseModel):
+    executions: conlist(TaskExecution, min_items=1)
+
+class TaskExecutionStatus(ReqPatchTaskExecution):
+    status: str
+
+class ReqPatchTaskExecutions(BaseModel):
+    executions: conlist(TaskExecutionStatus, min_items=1)
+
 class PipelineRun(BaseModel):
     last_modified: str = None
     status: str = None
@@ -808,6 +818,9 @@ class ReqPatchPipelineRun(BaseModel):
     status: str = None
     uuid: str
     logs: str = None
+    # When set, 'logs' is appended to the pipeline run's logs as the chunk
+    # starting at this byte offset rather than replacing them
+    logs_offset: int = Field(None, ge=0)
 
 class WorkflowSubmissionRequestMeta(BaseModel):
     idempotency_key: Union[str, List[str]]
@@ -0,0 +1,107 @@
+import os, time, unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+# The settings the api reads from the environment
+for key in [
+    "WORKFLOWS_SERVICE_ACCOUNT",
+    "WORKFLOWS_SERVICE_PASSWORD",
+    "TAPIS_DEV_URL",
+    "TAPIS_SERVICE_SITE_ID",
+    "TAPIS_SERVICE_TENANT_ID",
+    "WORKFLOWS_SERVICE_URL",
+    "LOG_LEVEL",
+    "BROKER_USER",
+    "BROKER_PASSWORD",
+    "BROKER_URL",
+    "BROKER_PORT"
+]:
+    os.environ.setdefault(key, "test")
+os.environ["BROKER_PORT"] = "5672"
+
+import pika
+
+from pika.exchange_type import ExchangeType
+
+from backend.services.MessageBroker import MessageBroker
+from backend.errors.message_broker import InvalidExchangeError, PublishError
+from tests.fixtures.amqp import FakeBroker
+
+
+class TestMessageBroker(unittest.TestCase):
+    def setUp(self):
+        self.broker = FakeBroker()
+        self.publisher = MessageBroker(pool_size=2, pool_timeout=1, connect=self.broker.connect)
+
+    def testConnectionReused(self):
+        for i in range(10):
+            self.publisher.publish("workflows", str(i))
+
+        self.assertEqual(len(self.broker.connections), 1)
+        self.assertEqual(self.broker.declares, 1)
+        self.assertEqual([body for (_, body) in self.broker.messages], [str(i) for i in range(10)])
+
+    def testPoolBounded(self):
+        self.broker.confirm_delay = 0.01
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: self.publisher.publish("workflows", str(i)), range(40)))
+
+        self.assertEqual(len(self.broker.messages), 40)
+        self.assertLessEqual(len(self.broker.connections), 2)
+
+    def testReconnect(self):
+        self.publisher.publish("workflows", "0")
+        self.broker.drop_connections()
+        self.publisher.publish_many("workflows", ["1", "2"])
+
+        self.assertEqual([body for (_, body) in self.broker.messages], ["0", "1", "2"])
+        self.assertEqual(len(self.broker.open_connections()), 1)
+
+    def testUnconfirmedMessageRepublishedWithItsId(self):
+        self.broker.lost_confirms = 1
+        self.publisher.publish_many("workflows", ["0", "1"], message_ids=["a", "b"])
+
+        # The first message reached the broker before its connection was lost.
+        # Its copy has the same message id so consumers can drop it
+        self.assertEqual([body for (_, body) in self.broker.messages], ["0", "0", "1"])
+        self.assertEqual(self.broker.message_ids, ["a", "a", "b"])
+
+    def testRetriesExhausted(self):
+        def refuse(parameters):
+            raise pika.exceptions.AMQPConnectionError("refused")
+        publisher = MessageBroker(retries=1, connect=refuse)
+
+        with self.assertRaises(PublishError):
+            publisher.publish("workflows", "0")
+
+    def testInvalidExchange(self):
+        with self.assertRaises(InvalidExchangeError):
+            self.publisher.publish("invalid", "0")
+
+    def testLatency(self):
+        """Compares the latency of publishing with the pool to publishing over
+        a new connection per message"""
+        self.broker.handshake_delay = 0.005
+
+        def publish_with_new_connection(message):
+            connection = self.broker.connect(self.publisher.connection_parameters)
+            channel = connection.channel()
+            channel.exchange_declare("workflows", exchange_type=ExchangeType.fanout)
+            channel.basic_publish(exchange="workflows", routing_key="", body=message)
+            connection.close()
+
+        def latency(publish):
+            start = time.perf_counter()
+            for i in range(20):
+                publish(str(i))
+            return (time.perf_counter() - start) / 20
+
+        unpooled = latency(publish_with_new_connection)
+        pooled = latency(lambda message: self.publisher.publish("workflows", message))
+
+        # Only the first publish with the pool pays for the handshake
+        self.assertLess(pooled, unpooled / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import json, uuid, unittest
+
+from tests.fixtures.db import setup_django, setup_test_database, teardown_test_database
+
+setup_django()
+
+from django.test import TestCase, RequestFactory
+
+from backend.models import Group, GroupUser, Pipeline, PipelineRun
+from backend.services.GroupService import service as group_service
+from backend.views.PipelineRunLogs import PipelineRunLogs
+from backend.views.PipelineRuns import PipelineRuns
+from backend.views.UpdatePipelineRunStatus import UpdatePipelineRunStatus
+from backend.conf.constants import WORKFLOW_EXECUTOR_ACCESS_TOKEN
+
+
+def setUpModule():
+    setup_test_database()
+
+def tearDownModule():
+    teardown_test_database()
+
+class TestPipelineRunLogs(TestCase):
+    """The executor appends the logs of a run in chunks that are read back in
+    byte ranges"""
+    def setUp(self):
+        group_service.clear()
+        group = Group.objects.create(id="group", owner="alice", tenant_id="tacc")
+        GroupUser.objects.create(group=group, username="alice", is_admin=True)
+        pipeline = Pipeline.objects.create(id="pipeline", group=group, owner="alice")
+        self.run = PipelineRun.objects.create(uuid=uuid.uuid4(), pipeline=pipeline)
+        self.shipped = 0
+
+    def append(self, logs, offset=None):
+        # Ships the logs as the executor does, at the offset following the
+        # logs already shipped unless given
+        if offset == None:
+            offset = self.shipped
+            self.shipped += len(logs.encode("utf-8"))
+
+        body = {"logs": logs, "logs_offset": offset}
+        request = RequestFactory().patch(
+            "/",
+            json.dumps(body),
+            content_type="application/json",
+            HTTP_X_WORKFLOW_EXECUTOR_TOKEN=WORKFLOW_EXECUTOR_ACCESS_TOKEN
+        )
+        view = UpdatePipelineRunStatus()
+        view.request_body = body
+        response = view.patch(request, pipeline_run_uuid=str(self.run.uuid), status="active")
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def request(self, params={}):
+        request = RequestFactory().get("/", params)
+        request.username = "alice"
+        request.tenant_id = "tacc"
+
+        return request
+
+    def logs(self, **params):
+        response = PipelineRunLogs().get(
+            self.request(params),
+            group_id="group",
+            pipeline_id="pipeline",
+            pipeline_run_uuid=str(self.run.uuid)
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+        return response.result
+
+    def follow(self, limit):
+        # Reads the logs one range at a time
+        logs = ""
+        offset = 0
+        while True:
+            result = self.logs(offset=offset, limit=limit)
+            if result["next_offset"] == offset:
+                return logs
+            logs += result["logs"]
+            offset = result["next_offset"]
+
+    def testOffsetAndLimit(self):
+        self.append("line 1\n")
+        self.append("line 2\n")
+
+        result = self.logs(offset=3, limit=7)
+        self.assertEqual(result["logs"], "e 1\nlin")
+        self.assertEqual(result["offset"], 3)
+        self.assertEqual(result["next_offset"], 10)
+        self.assertEqual(result["size"], 14)
+
+    def testTail(self):
+        self.append("line 1\n")
+        self.append("line 2\n")
+
+        result = self.logs(tail=4)
+        self.assertEqual(result["logs"], "e 2\n")
+        self.assertEqual(result["offset"], 10)
+
+        # The whole logs if the tail is longer than the logs
+        self.assertEqual(self.logs(tail=100)["logs"], "line 1\nline 2\n")
+
+    def testFollowAcrossAppends(self):
+        self.append("line 1\n")
+        result = self.logs()
+        self.assertEqual(result["logs"], "line 1\n")
+
+        # The next range starts where the previous one ended
+        self.append("line 2\n")
+        result = self.logs(offset=result["next_offset"])
+        self.assertEqual(result["logs"], "line 2\n")
+        self.assertEqual(result["next_offset"], 14)
+
+    def testResentChunkIgnored(self):
+        self.append("line 1\n")
+        self.append("line 1\n", offset=0)
+
+        self.assertEqual(self.logs()["logs"], "line 1\n")
+
+    def testMultiByteCharactersNeverSplit(self):
+        logs = "é€😀\n" * 5
+        self.append(logs)
+
+        # Every limit splits some character. None of them is lost
+        for limit in range(4, 9):
+            self.assertEqual(self.follow(limit), logs)
+
+        # A range that starts within a character starts at the next one
+        result = self.logs(tail=len("😀\n".encode("utf-8")) + 1)
+        self.assertEqual(result["logs"], "😀\n")
+
+    def testRunLogsAssembledFromChunks(self):
+        self.append("line 1\n")
+        self.append("line 2\n")
+        # A chunk after one that was never shipped
+        self.append("line 4\n", offset=21)
+
+        response = PipelineRuns().get(
+            self.request(),
+            group_id="group",
+            pipeline_id="pipeline",
+            pipeline_run_uuid=str(self.run.uuid)
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.result["logs"], "line 1\nline 2\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
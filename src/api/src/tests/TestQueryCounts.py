@@ -0,0 +1,196 @@
+import uuid, unittest
+
+from datetime import timedelta
+
+from tests.fixtures.db import setup_django, setup_test_database, teardown_test_database
+
+setup_django()
+
+from django.test import TestCase, RequestFactory
+from django.utils import timezone
+
+from backend.models import (
+    Group,
+    GroupUser,
+    Pipeline,
+    PipelineRun,
+    PipelineRunLogChunk,
+    Task,
+    TaskExecution
+)
+from backend.services.GroupService import service as group_service
+from backend.views.Groups import Groups
+from backend.views.Pipelines import Pipelines
+from backend.views.PipelineRuns import PipelineRuns
+from backend.views.TaskExecutions import TaskExecutions
+
+
+def setUpModule():
+    setup_test_database()
+
+def tearDownModule():
+    teardown_test_database()
+
+class TestQueryCounts(TestCase):
+    """Asserts the number of queries each view issues. The number of queries of
+    a list must not grow with the number of rows listed"""
+    def setUp(self):
+        group_service.clear()
+        self.group = Group.objects.create(id="group", owner="alice", tenant_id="tacc")
+        GroupUser.objects.create(group=self.group, username="alice", is_admin=True)
+        self.pipeline = Pipeline.objects.create(id="pipeline", group=self.group, owner="alice")
+        self.task = Task.objects.create(id="task", pipeline=self.pipeline, type="function")
+        self.run = self.create_runs(1)[0]
+        self.execution = self.create_executions(1)[0]
+        group_service.clear()
+
+    def create_runs(self, count):
+        now = timezone.now()
+        return [
+            PipelineRun.objects.create(
+                uuid=uuid.uuid4(),
+                pipeline=self.pipeline,
+                started_at=now - timedelta(minutes=i),
+                logs="x"*1024
+            )
+            for i in range(count)
+        ]
+
+    def create_executions(self, count):
+        now = timezone.now()
+        return [
+            TaskExecution.objects.create(
+                uuid=uuid.uuid4(),
+                pipeline_run=self.run,
+                task=self.task,
+                started_at=now - timedelta(minutes=i),
+                stdout="x"*1024
+            )
+            for i in range(count)
+        ]
+
+    def request(self, params={}):
+        request = RequestFactory().get("/", params)
+        request.username = "alice"
+        request.tenant_id = "tacc"
+
+        return request
+
+    def get(self, view, params={}, **kwargs):
+        response = view().get(self.request(params), group_id="group", **kwargs)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        return response
+
+    def testListPipelines(self):
+        for i in range(10):
+            Pipeline.objects.create(id=f"pipeline{i}", group=self.group, owner="alice")
+
+        # The group, the membership and the pipelines
+        with self.assertNumQueries(3):
+            response = self.get(Pipelines)
+        self.assertEqual(len(response.result), 11)
+
+    def testGetPipeline(self):
+        # The group, the membership, the pipeline and its tasks
+        with self.assertNumQueries(4):
+            self.get(Pipelines, pipeline_id="pipeline")
+
+    def testListPipelineRuns(self):
+        self.create_runs(10)
+
+        # The group, the membership, the pipeline and the runs
+        with self.assertNumQueries(4):
+            response = self.get(PipelineRuns, pipeline_id="pipeline")
+        self.assertEqual(len(response.result), 11)
+        self.assertNotIn("logs", response.result[0])
+
+        # The logs of a run are never listed
+        response = PipelineRuns().get(
+            self.request({"fields": "uuid,logs"}),
+            group_id="group",
+            pipeline_id="pipeline"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def testPaginatePipelineRuns(self):
+        self.create_runs(10)
+
+        uuids = []
+        params = {"limit": 4}
+        while True:
+            response = self.get(PipelineRuns, params, pipeline_id="pipeline")
+            uuids += [run["uuid"] for run in response.result]
+            if response.metadata["next_cursor"] == None:
+                break
+            params["cursor"] = response.metadata["next_cursor"]
+
+        self.assertEqual(len(uuids), 11)
+        self.assertEqual(len(set(uuids)), 11)
+
+    def testGetPipelineRun(self):
+        # The group, the membership, the pipeline, the run and its log chunks
+        with self.assertNumQueries(5):
+            response = self.get(PipelineRuns, pipeline_id="pipeline", pipeline_run_uuid=str(self.run.uuid))
+        # Runs without log chunks return the logs stored on the run
+        self.assertEqual(response.result["logs"], "x"*1024)
+
+    def testGetPipelineRunLogChunks(self):
+        for (offset, content) in [(0, "line 1\n"), (7, "line 2\n"), (21, "line 4\n")]:
+            PipelineRunLogChunk.objects.create(
+                pipeline_run=self.run,
+                offset=offset,
+                end=offset + len(content),
+                content=content
+            )
+
+        response = self.get(PipelineRuns, pipeline_id="pipeline", pipeline_run_uuid=str(self.run.uuid))
+
+        # The logs stop at the gap left by a chunk that was never shipped
+        self.assertEqual(response.result["logs"], "line 1\nline 2\n")
+
+    def testListTaskExecutions(self):
+        self.create_executions(10)
+
+        # The group, the membership, the pipeline, the run and the executions
+        # with the ids of their tasks
+        with self.assertNumQueries(5):
+            response = self.get(
+                TaskExecutions,
+                {"fields": "uuid,status,stdout"},
+                pipeline_id="pipeline",
+                pipeline_run_uuid=str(self.run.uuid)
+            )
+        self.assertEqual(len(response.result), 11)
+        self.assertEqual(response.result[0]["task_id"], "task")
+        self.assertEqual(len(response.result[0]["stdout"]), 1024)
+
+    def testGetTaskExecution(self):
+        with self.assertNumQueries(5):
+            self.get(
+                TaskExecutions,
+                pipeline_id="pipeline",
+                pipeline_run_uuid=str(self.run.uuid),
+                task_execution_uuid=str(self.execution.uuid)
+            )
+
+    def testListGroups(self):
+        for i in range(10):
+            group = Group.objects.create(id=f"group{i}", owner="alice", tenant_id="tacc")
+            GroupUser.objects.create(group=group, username="alice")
+
+        # The memberships and their groups
+        with self.assertNumQueries(2):
+            response = Groups().list(self.request())
+        self.assertEqual(len(response.result), 11)
+
+    def testGroupLookupsCached(self):
+        self.get(Pipelines)
+
+        # Only the pipelines are queried
+        with self.assertNumQueries(1):
+            self.get(Pipelines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from backend.helpers.TTLCache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000
+
+    def __call__(self):
+        return self.now
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = TTLCache(max_size=2, ttl=30, clock=self.clock)
+
+    def testExpires(self):
+        self.cache.set("group", True)
+        self.clock.now += 29
+        self.assertEqual(self.cache.get("group"), True)
+        self.clock.now += 1
+        self.assertEqual(self.cache.get("group"), None)
+
+    def testFalseValuesCached(self):
+        self.cache.set("membership", False)
+        self.assertEqual(self.cache.get("membership", default=None), False)
+
+    def testLeastRecentlyUsedEvicted(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("c"), 3)
+
+    def testDeleteWhere(self):
+        cache = TTLCache(max_size=10, ttl=30, clock=self.clock)
+        cache.set(("tenant", "group", "alice"), True)
+        cache.set(("tenant", "group", "bob"), False)
+        cache.set(("tenant", "other", "alice"), True)
+
+        cache.delete_where(lambda key: key[:2] == ("tenant", "group"))
+
+        self.assertEqual(cache.get(("tenant", "group", "alice")), None)
+        self.assertEqual(cache.get(("tenant", "group", "bob")), None)
+        self.assertEqual(cache.get(("tenant", "other", "alice")), True)
+
+    def testDisabled(self):
+        cache = TTLCache(max_size=10, ttl=0, clock=self.clock)
+        cache.set("group", True)
+        self.assertEqual(cache.get("group"), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import json, uuid, unittest
+
+from tests.fixtures.db import setup_django, setup_test_database, teardown_test_database
+
+setup_django()
+
+from django.test import TestCase, RequestFactory
+
+from backend.models import Group, Pipeline, PipelineRun, Task, TaskExecution
+from backend.views.CreateTaskExecutions import CreateTaskExecutions
+from backend.views.UpdateTaskExecutionStatuses import UpdateTaskExecutionStatuses
+from backend.conf.constants import WORKFLOW_EXECUTOR_ACCESS_TOKEN
+
+
+def setUpModule():
+    setup_test_database()
+
+def tearDownModule():
+    teardown_test_database()
+
+class TestTaskExecutionBatches(TestCase):
+    """The task executions of a run are created and updated by the executor
+    in batches of one request each"""
+    def setUp(self):
+        group = Group.objects.create(id="group", owner="alice", tenant_id="tacc")
+        self.pipeline = Pipeline.objects.create(id="pipeline", group=group, owner="alice")
+        for task_id in ["task1", "task2"]:
+            Task.objects.create(id=task_id, pipeline=self.pipeline, type="function")
+        self.run = PipelineRun.objects.create(uuid=uuid.uuid4(), pipeline=self.pipeline)
+
+    def call(self, view_cls, method, body):
+        request = getattr(RequestFactory(), method)(
+            "/",
+            json.dumps(body),
+            content_type="application/json",
+            HTTP_X_WORKFLOW_EXECUTOR_TOKEN=WORKFLOW_EXECUTOR_ACCESS_TOKEN
+        )
+        view = view_cls()
+        view.request_body = body
+
+        return getattr(view, method)(request, pipeline_run_uuid=str(self.run.uuid))
+
+    def create(self, executions):
+        return self.call(CreateTaskExecutions, "post", {"executions": executions})
+
+    def update(self, executions):
+        return self.call(UpdateTaskExecutionStatuses, "patch", {"executions": executions})
+
+    def executions(self, count=2):
+        return [
+            {"task_id": f"task{i % 2 + 1}", "uuid": str(uuid.uuid4())}
+            for i in range(count)
+        ]
+
+    def testCreate(self):
+        executions = self.executions()
+        response = self.create(executions)
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(
+            set([str(execution.uuid) for execution in TaskExecution.objects.all()]),
+            set([execution["uuid"] for execution in executions])
+        )
+
+    def testResentBatchIgnored(self):
+        executions = self.executions()
+        self.create(executions[:1])
+
+        # The executor resends a batch it did not get a response for
+        response = self.create(executions)
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(TaskExecution.objects.count(), 2)
+
+    def testCreateUnknownTask(self):
+        response = self.create([{"task_id": "missing", "uuid": str(uuid.uuid4())}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(TaskExecution.objects.count(), 0)
+
+    def testCreateQueryCount(self):
+        # The run, the tasks and a single insert in a savepoint whatever the
+        # size of the batch
+        with self.assertNumQueries(5):
+            response = self.create(self.executions(20))
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def testUpdate(self):
+        executions = self.executions()
+        self.create(executions)
+
+        response = self.update([
+            {"uuid": execution["uuid"], "status": "completed", "stdout": "out"}
+            for execution in executions
+        ])
+
+        self.assertEqual(response.status_code, 200, response.content)
+        for execution in TaskExecution.objects.all():
+            self.assertEqual(execution.status, "completed")
+            self.assertEqual(execution.stdout, "out")
+
+    def testInvalidStatusRejected(self):
+        executions = self.executions()
+        self.create(executions)
+
+        response = self.update([
+            {"uuid": executions[0]["uuid"], "status": "completed"},
+            {"uuid": executions[1]["uuid"], "status": "invalid"}
+        ])
+
+        # None of the batch is applied
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(TaskExecution.objects.filter(status="completed").count(), 0)
+
+    def testLastUpdateWins(self):
+        executions = self.executions(1)
+        self.create(executions)
+
+        response = self.update([
+            {"uuid": executions[0]["uuid"], "status": status}
+            for status in ["staging", "active", "completed"]
+        ])
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(TaskExecution.objects.get().status, "completed")
+
+    def testUpdateQueryCount(self):
+        executions = self.executions(20)
+        self.create(executions)
+
+        # The executions and a single update in a savepoint whatever the size
+        # of the batch
+        with self.assertNumQueries(4):
+            response = self.update([
+                {"uuid": execution["uuid"], "status": "active"}
+                for execution in executions
+            ])
+        self.assertEqual(response.status_code, 200, response.content)
+
+
+if __name__ == "__main__":
+    unittest.main()
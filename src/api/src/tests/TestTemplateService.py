@@ -0,0 +1,97 @@
+import os, time, json, unittest, tempfile
+
+# The settings the api reads from the environment
+for key in [
+    "WORKFLOWS_SERVICE_ACCOUNT",
+    "WORKFLOWS_SERVICE_PASSWORD",
+    "TAPIS_DEV_URL",
+    "TAPIS_SERVICE_SITE_ID",
+    "TAPIS_SERVICE_TENANT_ID",
+    "WORKFLOWS_SERVICE_URL",
+    "LOG_LEVEL"
+]:
+    os.environ.setdefault(key, "test")
+
+from unittest.mock import patch
+
+from backend.services.TemplateService import TemplateService
+from backend.views.http.requests import Uses
+from tests.fixtures.git import init_repo, commit, run_git
+
+
+class TestTemplateService(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.repo_dir = os.path.join(self.dir.name, "repo")
+        self.cache_dir = os.path.join(self.dir.name, "cache")
+        self.url = init_repo(self.repo_dir)
+        self.commit_template({"version": 1})
+        self.service = TemplateService(cache_dir=self.cache_dir, ttl=3600)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def commit_template(self, template):
+        return commit(self.repo_dir, {
+            "owe-config.json": json.dumps({"etl": {"path": "templates/etl.json"}}),
+            "templates/etl.json": json.dumps(template)
+        })
+
+    def uses(self, **kwargs):
+        return Uses(source={"url": self.url, "branch": "main"}, **kwargs)
+
+    def expire(self):
+        # Ages the mirrors past the ttl
+        for name in os.listdir(self.cache_dir):
+            fetched_at_file = os.path.join(self.cache_dir, name, "owe-fetched-at")
+            if os.path.exists(fetched_at_file):
+                past = time.time() - self.service.ttl
+                os.utime(fetched_at_file, (past, past))
+
+    def testFetch(self):
+        self.assertEqual(self.service.get(self.uses(name="etl")), {"version": 1})
+        self.assertEqual(self.service.get(self.uses(path="templates/etl.json")), {"version": 1})
+
+        # A bare mirror of the repository
+        (mirror,) = [name for name in os.listdir(self.cache_dir) if name.endswith(".git")]
+        self.assertEqual(
+            run_git(os.path.join(self.cache_dir, mirror), "rev-parse", "--is-bare-repository"),
+            "true"
+        )
+
+    def testCachedWithinTtl(self):
+        self.service.get(self.uses(name="etl"))
+        self.commit_template({"version": 2})
+
+        # Neither fetched nor parsed again
+        with patch.object(self.service, "_read_template", wraps=self.service._read_template) as read:
+            self.assertEqual(self.service.get(self.uses(name="etl")), {"version": 1})
+        self.assertEqual(read.call_count, 0)
+
+    def testRefetchedAfterTtl(self):
+        self.service.get(self.uses(name="etl"))
+        self.commit_template({"version": 2})
+        self.expire()
+
+        self.assertEqual(self.service.get(self.uses(name="etl")), {"version": 2})
+
+    def testParsedOncePerCommit(self):
+        self.service.get(self.uses(name="etl"))
+        self.expire()
+
+        # The mirror is fetched again but the commit has not changed
+        with patch.object(self.service, "_read_template", wraps=self.service._read_template) as read:
+            self.service.get(self.uses(name="etl"))
+        self.assertEqual(read.call_count, 0)
+
+    def testReturnsCopies(self):
+        self.service.get(self.uses(name="etl"))["version"] = 3
+        self.assertEqual(self.service.get(self.uses(name="etl")), {"version": 1})
+
+    def testMissingTemplate(self):
+        with self.assertRaises(Exception):
+            self.service.get(self.uses(name="missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os, unittest
+
+# The settings the api reads from the environment
+for key in [
+    "WORKFLOWS_SERVICE_ACCOUNT",
+    "WORKFLOWS_SERVICE_PASSWORD",
+    "TAPIS_DEV_URL",
+    "TAPIS_SERVICE_SITE_ID",
+    "TAPIS_SERVICE_TENANT_ID",
+    "WORKFLOWS_SERVICE_URL",
+    "LOG_LEVEL"
+]:
+    os.environ.setdefault(key, "test")
+
+from backend.helpers.TokenCache import TokenCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000
+
+    def __call__(self):
+        return self.now
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = TokenCache(max_size=2, ttl=60, clock=self.clock)
+
+    def testExpiresAtExp(self):
+        self.cache.set("token", {"tapis/username": "user", "exp": 1030})
+
+        self.assertEqual(self.cache.get("token")["tapis/username"], "user")
+        self.clock.now = 1030
+        self.assertEqual(self.cache.get("token"), None)
+
+    def testExpiresAfterTTL(self):
+        self.cache.set("token", {"exp": 5000})
+        self.clock.now = 1059
+        self.assertNotEqual(self.cache.get("token"), None)
+        self.clock.now = 1060
+        self.assertEqual(self.cache.get("token"), None)
+
+    def testExpiredTokenNotCached(self):
+        self.cache.set("token", {"exp": 999})
+        self.assertEqual(self.cache.get("token"), None)
+
+    def testBounded(self):
+        self.cache.set("a", {})
+        self.cache.set("b", {})
+        self.cache.get("a")
+        self.cache.set("c", {})
+
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get("a"), {})
+        self.assertEqual(self.cache.get("c"), {})
+
+    def testTokensNotKept(self):
+        self.cache.set("secret-token", {})
+        self.assertNotIn("secret-token", self.cache._claims)
+
+    def testClaimsCopied(self):
+        self.cache.set("token", {"tapis/username": "user"})
+        self.cache.get("token")["tapis/username"] = "other"
+        self.assertEqual(self.cache.get("token")["tapis/username"], "user")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import time
+
+from threading import Lock
+
+from pika.exceptions import StreamLostError
+
+
+class FakeBroker:
+    """An in-process stand-in for the message broker. Opening a connection
+    takes 'handshake_delay' seconds and confirming a message takes
+    'confirm_delay' seconds. The connection of each of the next 'lost_confirms'
+    published messages is lost after the broker received the message but
+    before it was confirmed"""
+    def __init__(self, handshake_delay=0, confirm_delay=0):
+        self.handshake_delay = handshake_delay
+        self.confirm_delay = confirm_delay
+        self.connections = []
+        self.messages = []
+        self.message_ids = []
+        self.lost_confirms = 0
+        self.declares = 0
+        self.lock = Lock()
+
+    def connect(self, parameters):
+        time.sleep(self.handshake_delay)
+        connection = FakeConnection(self)
+        with self.lock:
+            self.connections.append(connection)
+        return connection
+
+    def drop_connections(self):
+        """Closes every connection as if the broker restarted"""
+        for connection in self.connections:
+            connection.dropped = True
+
+    def open_connections(self):
+        return [connection for connection in self.connections if connection.is_open]
+
+class FakeConnection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.is_open = True
+        # A dropped connection looks open until it is used
+        self.dropped = False
+
+    def channel(self):
+        return FakeChannel(self)
+
+    def process_data_events(self, time_limit=None):
+        self._check()
+
+    def close(self):
+        self.is_open = False
+
+    def _check(self):
+        if self.dropped:
+            self.is_open = False
+            raise StreamLostError("Stream connection lost")
+
+class FakeChannel:
+    def __init__(self, connection):
+        self.connection = connection
+        self.broker = connection.broker
+        self.confirming = False
+
+    @property
+    def is_open(self):
+        return self.connection.is_open
+
+    def confirm_delivery(self):
+        self.confirming = True
+
+    def exchange_declare(self, exchange, exchange_type=None):
+        self.connection._check()
+        with self.broker.lock:
+            self.broker.declares += 1
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.connection._check()
+        with self.broker.lock:
+            self.broker.messages.append((exchange, body))
+            self.broker.message_ids.append(properties.message_id if properties else None)
+            lost = self.broker.lost_confirms > 0
+            if lost:
+                self.broker.lost_confirms -= 1
+
+        if lost:
+            self.connection.dropped = True
+            self.connection._check()
+
+        if self.confirming:
+            time.sleep(self.broker.confirm_delay)
@@ -0,0 +1,32 @@
+import os, sys, types
+
+from unittest.mock import MagicMock
+
+
+def setup_django():
+    """Configures django with the test settings. Must be called before the
+    api's models and views are imported"""
+    os.environ["DJANGO_SETTINGS_MODULE"] = "tests.settings"
+
+    # The views authenticate requests with the Tapis service client, which is
+    # never used by the tests
+    gateway = types.ModuleType("backend.services.TapisServiceAPIGateway")
+    gateway.TapisServiceAPIGateway = MagicMock
+    sys.modules.setdefault("backend.services.TapisServiceAPIGateway", gateway)
+
+    import django
+    django.setup()
+
+def setup_test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+def teardown_test_database():
+    from django.db import connection
+    from django.test.utils import teardown_test_environment
+
+    connection.creation.destroy_test_db(":memory:", verbosity=0)
+    teardown_test_environment()
@@ -0,0 +1,30 @@
+import os, subprocess
+
+
+def run_git(cwd, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=owe", "-c", "user.email=owe@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True
+    ).stdout.decode().strip()
+
+def init_repo(repo_dir):
+    """Creates a git repository that can be cloned(also partially) by url and
+    returns the url"""
+    os.makedirs(repo_dir, exist_ok=True)
+    run_git(repo_dir, "init", "-q", "-b", "main")
+    run_git(repo_dir, "config", "uploadpack.allowFilter", "true")
+    return f"file://{repo_dir}"
+
+def commit(repo_dir, files):
+    """Writes the files to the repository, commits them and returns the sha
+    of the commit"""
+    for (path, contents) in files.items():
+        os.makedirs(os.path.dirname(os.path.join(repo_dir, path)), exist_ok=True)
+        with open(os.path.join(repo_dir, path), "w") as file:
+            file.write(contents)
+
+    run_git(repo_dir, "add", "-A")
+    run_git(repo_dir, "commit", "-q", "-m", "commit")
+    return run_git(repo_dir, "rev-parse", "HEAD")
@@ -1,3 +1,10 @@
 cd $(dirname $0)
 cd ../
-python3 -m unittest tests.testurls
\ No newline at end of file
+python3 -m unittest tests.testurls
+python3 -m unittest tests.TestMessageBroker
+python3 -m unittest tests.TestTokenCache
+python3 -m unittest tests.TestTTLCache
+python3 -m unittest tests.TestQueryCounts
+python3 -m unittest tests.TestTaskExecutionBatches
+python3 -m unittest tests.TestPipelineRunLogs
+python3 -m unittest tests.TestTemplateService
\ No newline at end of file
@@ -0,0 +1,35 @@
+# Settings of the tests that use the database. The api's models are migrated
+# into an in-memory SQLite database
+import os
+
+# The settings the api reads from the environment
+for (key, value) in {
+    "ENV": "LOCAL",
+    "DJANGO_SECRET_KEY": "test",
+    "LOG_LEVEL": "INFO",
+    "DB_NAME": "test",
+    "DB_HOST": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "WORKFLOWS_SERVICE_ACCOUNT": "test",
+    "WORKFLOWS_SERVICE_PASSWORD": "test",
+    "TAPIS_DEV_URL": "test",
+    "TAPIS_SERVICE_SITE_ID": "test",
+    "TAPIS_SERVICE_TENANT_ID": "test",
+    "WORKFLOWS_SERVICE_URL": "test",
+    "BROKER_USER": "test",
+    "BROKER_PASSWORD": "test",
+    "BROKER_URL": "test",
+    "BROKER_PORT": "5672"
+}.items():
+    os.environ.setdefault(key, value)
+
+from workflows.settings import *
+
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:"
+    }
+}
@@ -16,10 +16,25 @@ CONNECTION_RETRY_DELAY = 5
 
 INSUFFICIENT_WORKER_RETRY_DELAY = 10
 
-# STARTING_WORKERS = os.environ.get("MIN_WORKERS", None) or 2
-STARTING_WORKERS = 100
-# MAX_WORKERS = os.environ.get("MAX_WORKERS", None) or 10
-MAX_WORKERS = 200
+# Number of channels consuming the inbound queue. The prefetch count of the
+# channels is adjusted to the number of free workers
+INTAKE_CONSUMERS = int(os.environ.get("INTAKE_CONSUMERS", None) or 1)
+
+# Worker pool configs. Workers(workflow executors) are created on demand up to
+# MAX_WORKERS. MIN_WORKERS workers are always kept in the pool and STARTING_WORKERS
+# are created when the server starts. Idle workers above MIN_WORKERS are
+# discarded after WORKER_IDLE_TIMEOUT seconds
+MIN_WORKERS = int(os.environ.get("MIN_WORKERS", None) or 2)
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", None) or 200)
+STARTING_WORKERS = int(os.environ.get("STARTING_WORKERS", None) or MIN_WORKERS)
+WORKER_IDLE_TIMEOUT = int(os.environ.get("WORKER_IDLE_TIMEOUT", None) or 300)
+
+# Task runner configs. The task runner is the thread pool shared by all workflow
+# executors in which the tasks of every pipeline run are executed
+TASK_RUNNER_MAX_WORKERS = int(os.environ.get("TASK_RUNNER_MAX_WORKERS", None) or 500)
+# Number of tasks that may wait for a free thread before the server stops
+# accepting new workflow submissions
+TASK_RUNNER_MAX_QUEUED = int(os.environ.get("TASK_RUNNER_MAX_QUEUED", None) or 1000)
 
 # Exchanges
 INBOUND_EXCHANGE = "workflows"
@@ -63,17 +78,101 @@ except Exception:
 
 WORKFLOW_NFS_SERVER = os.environ.get("WORKFLOW_NFS_SERVER")
 
+# Labels added to every Kubernetes job created by the engine. The job watcher
+# watches all jobs matching the label selector with a single watch stream
+KUBERNETES_JOB_LABELS = {"owe-managed-by": "workflow-engine"}
+KUBERNETES_JOB_LABEL_SELECTOR = ",".join([f"{k}={v}" for k, v in KUBERNETES_JOB_LABELS.items()])
+
+# Git cache configs. Git repositories are mirrored once per url into the git
+# cache dir and only fetched again once the mirror is older than GIT_CACHE_TTL
+# seconds. Mirrors are shallow when GIT_CACHE_DEPTH is set and partial when
+# GIT_CACHE_FILTER is set(e.g. blob:none)
+GIT_CACHE_DIR = os.environ.get("GIT_CACHE_DIR", None) or f"{BASE_WORK_DIR}.git-cache/"
+GIT_CACHE_TTL = int(os.environ.get("GIT_CACHE_TTL", None) or 300)
+GIT_CACHE_DEPTH = int(os.environ.get("GIT_CACHE_DEPTH", None) or 0) or None
+GIT_CACHE_FILTER = os.environ.get("GIT_CACHE_FILTER", None) or None
+
+# The maximum number of parsed templates kept in memory
+TEMPLATE_CACHE_MAX_SIZE = int(os.environ.get("TEMPLATE_CACHE_MAX_SIZE", None) or 256)
+# The maximum number of pipelines kept in memory with their template applied
+RESOLVED_PIPELINE_CACHE_MAX_SIZE = int(os.environ.get("RESOLVED_PIPELINE_CACHE_MAX_SIZE", None) or 128)
+
+# Job watcher configs in seconds
+JOB_WATCHER_TIMEOUT = 300 # Max duration of a single watch stream before it is re-established
+JOB_WATCHER_RETRY_DELAY = 2
+
+# Archive configs. Task outputs are uploaded concurrently by a bounded pool of
+# threads. Directories are packed into a gzipped tarball before being uploaded.
+# A manifest of the checksums of the uploaded outputs is stored with the archive
+# so archiving a pipeline again skips the outputs that were already uploaded
+ARCHIVE_UPLOAD_WORKERS = int(os.environ.get("ARCHIVE_UPLOAD_WORKERS", None) or 8)
+ARCHIVE_MANIFEST_FILENAME = ".archive-manifest.json"
+ARCHIVE_CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+# S3 archives. Outputs larger than the threshold are uploaded in parts of the
+# chunk size, S3_MULTIPART_CONCURRENCY parts at a time
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+S3_MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+S3_MULTIPART_CONCURRENCY = int(os.environ.get("S3_MULTIPART_CONCURRENCY", None) or 4)
+
+# iRODS archives. Large outputs are transferred by IRODS_TRANSFER_THREADS threads
+IRODS_TRANSFER_THREADS = int(os.environ.get("IRODS_TRANSFER_THREADS", None) or 4)
+IRODS_DEFAULT_ZONE = "tempZone"
+
+# Pod log streaming configs. The logs of build jobs(kaniko, singularity) are
+# streamed to the task's stdout file while the job runs. Once the stdout file
+# reaches POD_LOG_MAX_BYTES it is rotated, keeping POD_LOG_BACKUP_COUNT rotated
+# files(.stdout.1, .stdout.2, ...) in the task's work dir, outside of its output
+# dir. With no backups, the logs are truncated
+POD_LOG_MAX_BYTES = int(os.environ.get("POD_LOG_MAX_BYTES", None) or 50 * 1024 * 1024)
+POD_LOG_BACKUP_COUNT = int(os.environ.get("POD_LOG_BACKUP_COUNT", None) or 1)
+POD_LOG_CHUNK_SIZE = 64 * 1024
+POD_LOG_RETRY_DELAY = 1 # Delay between attempts while the pod's container is starting
+POD_LOG_STREAM_TIMEOUT = 30 # Max wait for the stream to end after the job is done
+
+# Notification queue configs. Notifications sent by notification handlers are
+# queued and sent in batches by background threads
+NOTIFICATION_QUEUE_MAX_SIZE = int(os.environ.get("NOTIFICATION_QUEUE_MAX_SIZE", None) or 10000)
+NOTIFICATION_BATCH_SIZE = 50
+NOTIFICATION_WORKERS = int(os.environ.get("NOTIFICATION_WORKERS", None) or 4)
+NOTIFICATION_MAX_RETRIES = 5
+NOTIFICATION_RETRY_DELAY = 1 # Doubled after every failed attempt
+NOTIFICATION_MAX_RETRY_DELAY = 30
+
+# The maximum number of seconds a terminal pipeline event waits for the event
+# subscribers(notification handlers, archivers) to handle the pending events
+EVENT_EXCHANGE_FLUSH_TIMEOUT = int(os.environ.get("EVENT_EXCHANGE_FLUSH_TIMEOUT", None) or 600)
+
 # Polling intervals in seconds
 DEFAULT_POLLING_INTERVAL = 1
 MIN_POLLING_INTERVAL = 1
 MAX_POLLING_INTERVAL = 3600
 
+# Polling strategy used by task executors that poll long-running jobs. One of
+# fixed, exponential, max_exec_time, historical
+POLLING_STRATEGY = os.environ.get("POLLING_STRATEGY", None) or "exponential"
+POLLING_BACKOFF_FACTOR = 2
+POLLING_BACKOFF_JITTER = 0.1 # Randomizes each interval by up to +/- 10%
+POLLING_BACKOFF_MAX_INTERVAL = 60
+POLLING_EXEC_TIME_DIVISOR = 100 # max_exec_time strategy polls ~100 times over the max_exec_time
+POLLING_HISTORY_SIZE = 20 # Number of previous run durations kept per task
+
 # Duplicate submission policy enums
 DUPLICATE_SUBMISSION_POLICY_TERMINATE = "terminate"
 DUPLICATE_SUBMISSION_POLICY_ALLOW = "allow"
 DUPLICATE_SUBMISSION_POLICY_DENY = "deny"
 DUPLICATE_SUBMISSION_POLICY_DEFER = "defer"
 
+# When true, submissions deferred by the DEFER policy replace the submissions
+# already deferred for the same idempotency key so only the latest one runs
+COALESCE_DEFERRED_SUBMISSIONS = os.environ.get("COALESCE_DEFERRED_SUBMISSIONS", "false") == "true"
+
+# Submissions are delivered at least once. The API publishes each submission
+# with the uuid of its pipeline run as the message id and republishes it if
+# the broker did not confirm it. The message ids of the last STARTED_SUBMISSIONS_SIZE
+# started submissions are kept to drop the redelivered copies
+STARTED_SUBMISSIONS_SIZE = int(os.environ.get("STARTED_SUBMISSIONS_SIZE", None) or 10000)
+
 # Execution profile
 DEFAULT_MAX_EXEC_TIME = 60 * 60 * 24
 DEFAULT_INVOCATION_MODE = "async"
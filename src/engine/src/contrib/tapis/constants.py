@@ -18,5 +18,7 @@ TAPIS_SYSTEM_FILE_REF_EXTENSION = "TapisSystemFile.json"
 
 ARCHIVER_TYPE_TAPIS_SYSTEM = "system"
 
+# Minimum intervals between polls. The actual intervals are determined by
+# the engine's polling strategy
 TAPIS_JOB_POLLING_FREQUENCY = 2  # in seconds
 TAPIS_ACTOR_POLLING_FREQUENCY = 2  # in seconds
\ No newline at end of file
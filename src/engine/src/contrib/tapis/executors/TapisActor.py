@@ -7,7 +7,14 @@ from owe_python_sdk.TaskExecutor import TaskExecutor
 
 class TapisActor(TaskExecutor):
     def __init__(self, task, ctx, exchange, plugins=[]):
-        TaskExecutor.__init__(self, task, ctx, exchange, plugins)
+        TaskExecutor.__init__(
+            self,
+            task,
+            ctx,
+            exchange,
+            plugins,
+            min_polling_interval=TAPIS_ACTOR_POLLING_FREQUENCY
+        )
         self.executions = []
 
     def execute(self):
@@ -36,6 +43,7 @@ class TapisActor(TaskExecutor):
             # the execution of linked actors recursively.
             # NOTE Actors can have only a single child
             self._poll_executions_recursively(execution)
+            self.polling_strategy.complete()
 
             # Check for any failed executions and return failed task accordingly
             for execution in self.executions:
@@ -51,8 +59,8 @@ class TapisActor(TaskExecutor):
         # Poll until the execution reaches a terminal state
         execution_status = execution.status
         while execution_status not in ["COMPLETED", "ERROR"]:
-            # Sleep for the polling frequency time
-            time.sleep(TAPIS_ACTOR_POLLING_FREQUENCY)       
+            # Sleep for the polling interval
+            time.sleep(self.polling_strategy.next_interval())
 
             # Fetch the execution status
             execution = self._get_execution(execution.actor_id, execution.id)
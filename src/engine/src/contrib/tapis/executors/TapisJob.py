@@ -8,7 +8,14 @@ from owe_python_sdk.TaskExecutor import TaskExecutor
 
 class TapisJob(TaskExecutor):
     def __init__(self, task, ctx, exchange, plugins=[]):
-        TaskExecutor.__init__(self, task, ctx, exchange, plugins)
+        TaskExecutor.__init__(
+            self,
+            task,
+            ctx,
+            exchange,
+            plugins,
+            min_polling_interval=TAPIS_JOB_POLLING_FREQUENCY
+        )
 
     def execute(self):
         try:
@@ -64,14 +71,16 @@ class TapisJob(TaskExecutor):
             
             # Keep polling until the job is complete
             while job.status not in ["FINISHED", "CANCELLED", "FAILED"]:
-                # Wait the polling frequency time then try poll again
-                time.sleep(TAPIS_JOB_POLLING_FREQUENCY)
+                # Wait the polling interval then try poll again
+                time.sleep(self.polling_strategy.next_interval())
                 job = service_client.jobs.getJob(
                     jobUuid=job.uuid,
                     _x_tapis_tenant=self.ctx.args.get("tapis_tenant_id").value,
                     _x_tapis_user=self.ctx.args.get("tapis_pipeline_owner").value
                 )
 
+            self.polling_strategy.complete()
+
             # Job has completed successfully. Get the execSystemOutputDir from the job object
             # and generate a task output for each file in the directory 
             if job.status == "FINISHED":
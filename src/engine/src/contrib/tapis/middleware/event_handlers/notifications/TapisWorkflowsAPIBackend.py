@@ -1,7 +1,9 @@
 import os
-from threading import Thread
+
+from threading import Lock
 
 from contrib.tapis.helpers import TapisServiceAPIGateway
+from core.notifications import notification_queue
 
 from owe_python_sdk.events import Event, EventHandler
 from owe_python_sdk.events.types import (
@@ -40,6 +42,15 @@ class TapisWorkflowsAPIBackend(EventHandler):
         service_api_gateway = TapisServiceAPIGateway()
         self.service_client = service_api_gateway.get_client()
 
+        # The batch operations and the incremental logs(logs_offset) were added
+        # to the spec of the Workflows API together. Clients built from an older
+        # spec(e.g. tapipy 1.6.0) fall back to the per-item operations and ship
+        # the whole log file with every status
+        self._batch_operations = hasattr(
+            self.service_client.workflows,
+            "updateTaskExecutionStatuses"
+        )
+
         self._kwargs = {
             "_tapis_set_x_headers_from_service": True,
             "_x_tapis_tenant": ctx.args["tapis_tenant_id"].value,
@@ -49,6 +60,15 @@ class TapisWorkflowsAPIBackend(EventHandler):
             }
         }
 
+        # The byte offset in the pipeline run's log file up to which the logs
+        # have been queued to be shipped
+        self._logs_offset = 0
+        # The number of bytes of the logs queued to be shipped. The API derives
+        # the offsets of the logs from their utf-8 encoding, which differs from
+        # the log file where it contains invalid utf-8
+        self._logs_shipped = 0
+        self._logs_lock = Lock()
+
     def handle(self, event: Event):
         try:
             self.handle_fn_mapping[event.type](event)
@@ -56,67 +76,36 @@ class TapisWorkflowsAPIBackend(EventHandler):
             raise e
 
     def _pipeline_active(self, event):
-        self.service_client.workflows.updatePipelineRunStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            status="active",
-            logs=self._get_logs(event.payload.pipeline.log_file),
-            **self._kwargs
-        )
-        
-        threads = []
+        self._put_pipeline_run_status(event, "active")
+
         for task in event.payload.pipeline.tasks:
-            thread = Thread(
-                target=self._create_task_execution,
-                args=(event.payload.pipeline_run.uuid, task)
+            notification_queue.put(
+                event.payload.pipeline_run.uuid,
+                self._create_task_executions,
+                {
+                    "pipeline_run_uuid": event.payload.pipeline_run.uuid,
+                    "task_id": task.id,
+                    "uuid": task.execution_uuid
+                }
             )
-            thread.start()
-            threads.append(thread)
-
-        for thread in threads:
-            thread.join()
 
     def _pipeline_completed(self, event):
-        self.service_client.workflows.updatePipelineRunStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            status="completed",
-            logs=self._get_logs(event.payload.pipeline.log_file),
-            **self._kwargs
-        )
+        self._put_pipeline_run_status(event, "completed")
 
     def _pipeline_terminated(self, event):
-        self.service_client.workflows.updatePipelineRunStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            status="terminated",
-            logs=self._get_logs(event.payload.pipeline.log_file),
-            **self._kwargs
-        )
+        self._put_pipeline_run_status(event, "terminated")
 
     def _pipeline_archiving(self, event):
         print(f"NOTIFICATION HANDLER: PIPELINE_ARCHIVING: NOT IMPLEMENTED")
 
     def _pipeline_failed(self, event):
-        self.service_client.workflows.updatePipelineRunStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            status="failed",
-            logs=self._get_logs(event.payload.pipeline.log_file),
-            **self._kwargs
-        )
+        self._put_pipeline_run_status(event, "failed")
 
     def _pipeline_staging(self, event):
-        self.service_client.workflows.updatePipelineRunStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            status="staging",
-            logs=self._get_logs(event.payload.pipeline.log_file),
-            **self._kwargs
-        )
+        self._put_pipeline_run_status(event, "staging")
 
     def _pipeline_suspended(self, event):
-        self.service_client.workflows.updatePipelineRunStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            status="suspended",
-            logs=self._get_logs(event.payload.pipeline.log_file),
-            **self._kwargs
-        )
+        self._put_pipeline_run_status(event, "suspended")
 
     # def _pipeline_skipped(self, event):
     #     self.service_client.workflows.updatePipelineRunStatus(
@@ -126,12 +115,10 @@ class TapisWorkflowsAPIBackend(EventHandler):
     #     )
 
     def _task_active(self, event):
-        self.service_client.workflows.updateTaskExecutionStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            task_execution_uuid=event.task.execution_uuid,
+        self._put_task_execution_status(
+            event,
             status="active",
-            last_message="Task is Active",
-            **self._kwargs
+            last_message="Task is Active"
         )
 
     def _task_archiving(self, event):
@@ -141,89 +128,191 @@ class TapisWorkflowsAPIBackend(EventHandler):
         print(f"NOTIFICATION_HANDLER: TASK_BACKOFF: NOT IMPLEMENTED")
 
     def _task_completed(self, event):
-        self.service_client.workflows.updateTaskExecutionStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            task_execution_uuid=event.task.execution_uuid,
+        self._put_task_execution_status(
+            event,
             status="completed",
             last_message="Task Completed Successfully",
             stdout=self._tail_stdout(event.task),
-            stderr=self._tail_stderr(event.task),
-            **self._kwargs
+            stderr=self._tail_stderr(event.task)
         )
 
     def _task_failed(self, event):
-        self.service_client.workflows.updateTaskExecutionStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            task_execution_uuid=event.task.execution_uuid,
+        self._put_task_execution_status(
+            event,
             status="failed",
             last_message="Task Failed: " + str(event.result.errors),
             stdout=self._tail_stdout(event.task),
-            stderr=self._tail_stderr(event.task),
-            **self._kwargs
+            stderr=self._tail_stderr(event.task)
         )
 
     def _task_suspended(self, event):
-        self.service_client.workflows.updateTaskExecutionStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            task_execution_uuid=event.task.execution_uuid,
+        self._put_task_execution_status(
+            event,
             status="suspended",
             last_message="Task Execution has been suspended",
             stdout=self._tail_stdout(event.task),
-            stderr=self._tail_stderr(event.task),
-            **self._kwargs
+            stderr=self._tail_stderr(event.task)
         )
     
     def _task_skipped(self, event):
-        self.service_client.workflows.updateTaskExecutionStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            task_execution_uuid=event.task.execution_uuid,
+        self._put_task_execution_status(
+            event,
             status="skipped",
             last_message="Task skipped",
             stdout="",
-            stderr="",
-            **self._kwargs
+            stderr=""
         )
 
     def _task_terminated(self, event):
-        self.service_client.workflows.updateTaskExecutionStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            task_execution_uuid=event.task.execution_uuid,
+        self._put_task_execution_status(
+            event,
             status="terminated",
             last_message="Task Execution has been terminated",
             stdout=self._tail_stdout(event.task),
-            stderr=self._tail_stderr(event.task),
-            **self._kwargs
+            stderr=self._tail_stderr(event.task)
         )
 
     def _task_pending(self, event):
-        self.service_client.workflows.updateTaskExecutionStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            task_execution_uuid=event.task.execution_uuid,
+        self._put_task_execution_status(
+            event,
             status="pending",
-            last_message="Task awaiting execution",
-            **self._kwargs
+            last_message="Task awaiting execution"
         )
 
     def _task_staging(self, event):
-        self.service_client.workflows.updateTaskExecutionStatus(
-            pipeline_run_uuid=event.payload.pipeline_run.uuid,
-            task_execution_uuid=event.task.execution_uuid,
+        self._put_task_execution_status(
+            event,
             status="staging",
-            last_message="Workflow executor preparing to execute task",
-            **self._kwargs
+            last_message="Workflow executor preparing to execute task"
         )
     
-    def _get_logs(self, log_file_path):
-        with open(log_file_path, "r") as file:
-            return file.read()
-        
-    def _create_task_execution(self, pipeline_run_uuid, task):
-        self.service_client.workflows.createTaskExecution(
-            pipeline_run_uuid=pipeline_run_uuid,
-            task_id=task.id,
-            uuid=task.execution_uuid,
+    def _put_pipeline_run_status(self, event, status):
+        # NOTE Pipeline run statuses are never coalesced. A later status would
+        # take the place of an earlier one and be sent before the task
+        # notifications queued in between. Every chunk of the logs must be
+        # sent as well
+        terminal = status in ["completed", "failed", "terminated"]
+        payload = {
+            "pipeline_run_uuid": event.payload.pipeline_run.uuid,
+            "status": status
+        }
+        if self._batch_operations:
+            (payload["logs"], payload["logs_offset"]) = self._read_logs(
+                event.payload.pipeline.log_file,
+                complete=terminal
+            )
+        else:
+            payload["logs"] = self._get_logs(event.payload.pipeline.log_file)
+
+        notification_queue.put(
+            event.payload.pipeline_run.uuid,
+            self._update_pipeline_run_statuses,
+            payload,
+            # Without its terminal status the run would remain active forever
+            critical=terminal
+        )
+
+    def _put_task_execution_status(self, event, **kwargs):
+        # Only the latest status of a task execution is sent if several
+        # are queued
+        notification_queue.put(
+            event.payload.pipeline_run.uuid,
+            self._update_task_execution_statuses,
+            {
+                "pipeline_run_uuid": event.payload.pipeline_run.uuid,
+                "task_execution_uuid": event.task.execution_uuid,
+                **kwargs
+            },
+            key=event.task.execution_uuid,
+            critical=kwargs["status"] in ["completed", "failed", "terminated", "skipped"]
+        )
+
+    # Senders. Called by the notification queue with a batch of payloads. The
+    # payloads that have been sent are removed so they are not resent on retry
+    def _update_pipeline_run_statuses(self, payloads):
+        while len(payloads) > 0:
+            self.service_client.workflows.updatePipelineRunStatus(
+                **payloads[0],
+                **self._kwargs
+            )
+            payloads.pop(0)
+
+    def _create_task_executions(self, payloads):
+        if not self._batch_operations:
+            while len(payloads) > 0:
+                self.service_client.workflows.createTaskExecution(
+                    **payloads[0],
+                    **self._kwargs
+                )
+                payloads.pop(0)
+            return
+
+        # NOTE Every payload of a batch belongs to the same pipeline run. The
+        # executions are created in a single transaction, so the whole batch is
+        # resent on retry
+        self.service_client.workflows.createTaskExecutions(
+            pipeline_run_uuid=payloads[0]["pipeline_run_uuid"],
+            executions=[
+                {"task_id": payload["task_id"], "uuid": payload["uuid"]}
+                for payload in payloads
+            ],
             **self._kwargs
         )
+        payloads.clear()
+
+    def _update_task_execution_statuses(self, payloads):
+        if not self._batch_operations:
+            while len(payloads) > 0:
+                self.service_client.workflows.updateTaskExecutionStatus(
+                    **payloads[0],
+                    **self._kwargs
+                )
+                payloads.pop(0)
+            return
+
+        self.service_client.workflows.updateTaskExecutionStatuses(
+            pipeline_run_uuid=payloads[0]["pipeline_run_uuid"],
+            executions=[
+                {
+                    "uuid": payload["task_execution_uuid"],
+                    **{
+                        key: value for (key, value) in payload.items()
+                        if key not in ["pipeline_run_uuid", "task_execution_uuid"]
+                    }
+                }
+                for payload in payloads
+            ],
+            **self._kwargs
+        )
+        payloads.clear()
+
+    def _get_logs(self, log_file_path):
+        with open(log_file_path, "r", errors="replace") as file:
+            return file.read()
+
+    def _read_logs(self, log_file_path, complete=False):
+        """Returns the logs written since the last call and the byte offset in
+        the shipped logs at which they start. Only complete lines are returned
+        unless the log file is complete"""
+        with self._logs_lock:
+            with open(log_file_path, "rb") as file:
+                file.seek(self._logs_offset)
+                logs = file.read()
+
+            # NOTE Cutting at the end of the last line also guarantees that a
+            # multi-byte character is never split across chunks
+            if not complete:
+                logs = logs[:logs.rfind(b"\n") + 1]
+
+            self._logs_offset += len(logs)
+
+            # NOTE Invalid bytes are replaced by a 3-byte replacement character,
+            # so the next offset is computed from the logs that are shipped
+            offset = self._logs_shipped
+            logs = logs.decode("utf-8", errors="replace")
+            self._logs_shipped += len(logs.encode("utf-8"))
+
+            return (logs, offset)
 
     def _tail_output(self, task, filename, flag="rb", max_bytes=10000):
         filesize = os.path.getsize(f"{task.output_dir}{filename.lstrip('/')}")
@@ -1,43 +1,42 @@
 
 import os, sys, time, logging, json
-from threading import Thread
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock
 
-from typing import Literal, Union
 from functools import partial
 from json.decoder import JSONDecodeError
 
 
 import pika
 
-from pika.exceptions import AMQPError, ChannelClosedByBroker
-from pika.exchange_type import ExchangeType
+from pika.exceptions import AMQPError
 
 from conf.constants import (
     MAX_CONNECTION_ATTEMPTS,
     STARTING_WORKERS,
+    MIN_WORKERS,
     MAX_WORKERS,
+    WORKER_IDLE_TIMEOUT,
     CONNECTION_RETRY_DELAY,
     INSUFFICIENT_WORKER_RETRY_DELAY,
-    INBOUND_EXCHANGE,
-    RETRY_EXCHANGE,
-    DEAD_LETTER_EXCHANGE,
-    DEFERRED_EXCHANGE,
-    INBOUND_QUEUE,
-    RETRY_QUEUE,
-    DEAD_LETTER_QUEUE,
-    DEFERRED_QUEUE,
+    TASK_RUNNER_MAX_WORKERS,
+    TASK_RUNNER_MAX_QUEUED,
     DUPLICATE_SUBMISSION_POLICY_TERMINATE,
     DUPLICATE_SUBMISSION_POLICY_DENY,
     DUPLICATE_SUBMISSION_POLICY_ALLOW,
     DUPLICATE_SUBMISSION_POLICY_DEFER,
+    COALESCE_DEFERRED_SUBMISSIONS,
+    STARTED_SUBMISSIONS_SIZE,
     PLUGINS,
 )
 from owe_python_sdk.schema import WorkflowSubmissionRequest, EmptyObject
 
-from core.workers import WorkerPool
+from core.workers import WorkerPool, TaskRunner
+from core.intake import Intake
 from core.workflows import WorkflowExecutor
 from utils import bytes_to_json, load_plugins, lbuffer_str as lbuf
-from errors import NoAvailableWorkers, WorkflowTerminated
+from errors import NoAvailableWorkers, TaskRunnerSaturated, WorkflowTerminated
 
 
 logger = logging.getLogger("server")
@@ -45,8 +44,21 @@ logger = logging.getLogger("server")
 # TODO Keep track of workflows submissions somehow so they can be terminated later
 class Server:
     def __init__(self):
-        self.active_workers = []
+        # Active workers indexed by idempotency key, then by worker id
+        self.active_workers = {}
+        # Messages(body and properties) of the submissions deferred by the DEFER
+        # duplicate submission policy. A FIFO per idempotency key
+        self.deferred_submissions = {}
+        # Message ids of the most recently started submissions, oldest first.
+        # Used to drop submissions that were published more than once
+        self.started_submissions = OrderedDict()
+        # Guards the active workers. Reentrant because registering a worker
+        # may deregister the active workers with the same idempotency key
+        self._active_workers_lock = RLock()
         self.worker_pool = None
+        self.task_runner = None
+        self.submission_pool = None
+        self.intake = None
         self.plugins = []
 
     def __call__(self):
@@ -59,49 +71,59 @@ class Server:
         # Initialize plugins
         self.plugins = load_plugins(PLUGINS)
 
+        # Create the thread pool shared by all workflow executors in which
+        # the tasks of every pipeline run are executed
+        self.task_runner = TaskRunner(
+            max_workers=TASK_RUNNER_MAX_WORKERS,
+            max_queued=TASK_RUNNER_MAX_QUEUED
+        )
+
         # Create a worker pool that consists of the workflow executors that will
-        # run the pipelines
+        # run the pipelines. Workers beyond the starting workers are created
+        # on demand
         # TODO catch error for worker classes that dont inherit from "Worker"
+        start = time.monotonic()
         self.worker_pool = WorkerPool(
             worker_cls=WorkflowExecutor,
-            starting_worker_count=100,
-            max_workers=1000,
+            starting_worker_count=STARTING_WORKERS,
+            min_workers=MIN_WORKERS,
+            max_workers=MAX_WORKERS,
+            idle_timeout=WORKER_IDLE_TIMEOUT,
             worker_kwargs={
-                "plugins": self.plugins
+                "plugins": self.plugins,
+                "task_runner": self.task_runner
             }
         )
-        logger.debug(f"{lbuf('[SERVER]')} Workers initialized ({self.worker_pool.count()})")
+        logger.debug(f"{lbuf('[SERVER]')} Workers initialized ({self.worker_pool.count()}) in {round(time.monotonic() - start, 3)}s")
+
+        # Workflow submissions are handled in this pool. There can never be more
+        # submissions running than there are workers to run them
+        self.submission_pool = ThreadPoolExecutor(
+            max_workers=self.worker_pool.max_workers,
+            thread_name_prefix="submission"
+        )
 
         # Connect to the message broker
         connection = self._connect()
 
-        # Create the channel, exchanges, and queues
-        channel = connection.channel()
-
-        # Inbound exchange and queue handles workflow submissions or resubmissions
-        channel.exchange_declare(INBOUND_EXCHANGE, exchange_type=ExchangeType.fanout)
-        inbound_queue = self._declare_queue(channel, INBOUND_QUEUE, exclusive=True)
-        channel.queue_bind(exchange=INBOUND_EXCHANGE, queue=inbound_queue.method.queue)
+        # Periodically discard the workers that have been idle for too long
+        connection.call_later(
+            WORKER_IDLE_TIMEOUT,
+            partial(self._shrink_worker_pool, connection)
+        )
 
-        # The threads that will be started within the on_message callback
-        threads = []
+        # Create the exchanges and queues
+        self.intake = Intake(connection, self._on_message_callback)
+        self.intake.declare()
 
-        # Start consuming the inbound queue
+        # Start consuming the inbound queue. Never prefetch more submissions
+        # than there are free workers to run them
         try:
-            channel.basic_consume(
-                queue=inbound_queue.method.queue,
-                auto_ack=False,
-                on_message_callback=partial(
-                    self._on_message_callback,
-                    args=(connection, threads)
-                )
-            )
-
-            channel.start_consuming()
+            self.intake.start(prefetch=self.worker_pool.available())
 
             # Wait for all to complete
-            for thread in threads:
-                thread.join()
+            self.submission_pool.shutdown(wait=True)
+            self.task_runner.shutdown(wait=True)
 
             connection.close()
 
@@ -115,7 +137,7 @@ class Server:
         except Exception as e:
             logger.error(e)
 
-    def _start_worker(self, body, connection, channel, delivery_tag):
+    def _start_worker(self, body, properties, channel, delivery_tag):
         """Validates and prepares the message from the inbound exchange(and queue),
         provisions a worker from the worker pool, acks the message, registers the 
         active worker to the server, handles the termination of duplicate
@@ -130,10 +152,18 @@ class Server:
             deserialized_request = json.loads(bytes_to_json(body))
             request = WorkflowSubmissionRequest(**deserialized_request)
             
+            # Apply backpressure. Do not start any new pipeline runs while tasks
+            # of already running pipelines are waiting for a free thread
+            if self.task_runner.saturated():
+                raise TaskRunnerSaturated(f"Task runner saturated: {self.task_runner.metrics()}")
+
             # Get a workflow executor worker. If there are none available,
             # this will raise a "NoWorkersAvailabe" error which is handled
             # an the exception block below
             worker = self.worker_pool.check_out()
+            self.intake.set_prefetch(self.worker_pool.available())
+
+            logger.debug(f"{lbuf('[SERVER]')} Task runner metrics: {self.task_runner.metrics()}")
 
             # Run request middlewares over the workflow context
             # NOTE Request middlewares will very likely mutate the workflow context
@@ -141,8 +171,7 @@ class Server:
                 request = plugin.dispatch("request", request)
             
             # Ack the message before running the workflow executor
-            cb = partial(self._ack_nack, "ack", channel, delivery_tag)
-            connection.add_callback_threadsafe(cb)
+            self.intake.ack(channel, delivery_tag)
 
             # Set the acked flag to True(Used to nack the message if an exception
             # occurs above)
@@ -150,79 +179,60 @@ class Server:
 
             # Register the active worker to the server. If worker cannot 
             # execute, check it back in.
-            worker = self._register_worker(request, worker)
+            worker = self._register_worker(request, worker, message=(body, properties))
 
-            threads = []
+            futures = []
             
             if worker.can_start:
-                worker.start(request, threads)
+                worker.start(request, futures)
 
-            for t in threads:
-                t.join()
+            # Wait for every task of the pipeline run to finish. NOTE Futures
+            # are appended to this list as tasks become ready, so it must be
+            # iterated and not copied
+            for future in futures:
+                future.exception()
 
         # Thrown when decoding the message body. Reject the message
         except JSONDecodeError as e:
             logger.error(e)
-            channel.basic_reject(delivery_tag, requeue=False)
+            self.intake.reject(channel, delivery_tag)
             return
-        except NoAvailableWorkers:
-            logger.info(f"{lbuf('[SERVER]')} Insufficient workers available. RETRYING (10s)")
-            connection.add_callback_threadsafe(
-                partial(
-                    self._ack_nack,
-                    "nack",
-                    channel,
-                    delivery_tag,
-                    delay=INSUFFICIENT_WORKER_RETRY_DELAY
-                )
-            )
+        except (NoAvailableWorkers, TaskRunnerSaturated) as e:
+            logger.info(f"{lbuf('[SERVER]')} Insufficient workers available. RETRYING ({INSUFFICIENT_WORKER_RETRY_DELAY}s) | {e}")
+            # Delay the redelivery of the message via the retry queue
+            self.intake.retry(channel, delivery_tag, body, properties)
             return
         except Exception as e:
             logger.error(e)
-            # Nack the message if it has not already been ack
-            # TODO Nack the message into a retry queue. 
-            # Or reject? Why would it not be rejected?
+            # Dead-letter the message if it has not already been acked
             if not acked:
-                cb = partial(self._ack_nack, "nack", channel, delivery_tag)
-                connection.add_callback_threadsafe(cb)
+                self.intake.reject(channel, delivery_tag)
             raise e
 
         # Deregister and return executor back to the worker pool
         self._deregister_worker(worker)
         self.worker_pool.check_in(worker)
+        self.intake.set_prefetch(self.worker_pool.available())
+
+    def _on_message_callback(self, channel, method, properties, body):
+        self.submission_pool.submit(
+            self._start_worker,
+            body,
+            properties,
+            channel,
+            method.delivery_tag
+        )
 
-    def _on_message_callback(self, channel, method, _, body, args):
-        (connection, threads) = args
+    def _shrink_worker_pool(self, connection):
+        discarded = self.worker_pool.shrink()
+        if discarded > 0:
+            logger.debug(f"{lbuf('[SERVER]')} Discarded idle workers ({discarded}). Workers: {self.worker_pool.count()}")
 
-        t = Thread(
-            target=self._start_worker,
-            args=(body, connection, channel, method.delivery_tag)
+        connection.call_later(
+            WORKER_IDLE_TIMEOUT,
+            partial(self._shrink_worker_pool, connection)
         )
 
-        t.start()
-        threads.append(t)
-
-        # Clean up the stopped threads
-        threads = [t for t in threads if t.is_alive()]
-
-    def _ack_nack(
-        self,
-        ack_nack: Union[Literal["ack"], Literal["nack"]],
-        channel,
-        delivery_tag,
-        delay=0
-    ):
-        fn = channel.basic_ack if ack_nack == "ack" else channel.basic_nack
-        kwargs = {}
-        if ack_nack == "nack": kwargs = {"requeue": False}
-        if channel.is_open:
-            # Wait the delay if necessary
-            delay == 0 or time.sleep(abs(delay))
-            fn(delivery_tag, **kwargs)
-            return
-        
-        # TODO do something if channel is closed
-
     def _connect(self):
         # Initialize connection parameters with plain credentials
         connection_parameters = pika.ConnectionParameters(
@@ -257,9 +267,11 @@ class Server:
 
     # TODO handle for the case of multiple active workers with same
     # active worker key
-    def _register_worker(self, request, worker):
+    def _register_worker(self, request, worker, message=None):
         """Registers the worker to the Server. Handles duplicate workflow
-        submissions"""
+        submissions. The message(body and properties) of the submission is
+        required to defer it and to drop the copies of a submission that
+        was already started"""
         # Returns a key based on user-defined idempotency key or pipeline
         # run uuid if no idempotency key is provided
         worker.key = self._resolve_idempotency_key(request)
@@ -267,45 +279,105 @@ class Server:
         # Set the idempotency key on the context
         request.idempotency_key = worker.key
 
-        # Check if there are workers running that have the same unique constraint key
-        active_workers = self._get_active_workers(worker.key)
         policy = request.pipeline.execution_profile.duplicate_submission_policy
 
-        if (
-            policy == DUPLICATE_SUBMISSION_POLICY_DENY
-            and len(active_workers) > 0
-        ):
-            return worker
-        elif policy == DUPLICATE_SUBMISSION_POLICY_TERMINATE:
-            for active_worker in active_workers:
-                active_worker.terminate()
-                self._deregister_worker(active_worker, terminated=True)
-        elif policy == DUPLICATE_SUBMISSION_POLICY_DEFER:
-            logger.info(f"{lbuf('[SERVER]')} Warning: Duplicate Submission Policy of 'DEFER' not implemented. Handling as 'ALLOW'")
-            pass
-        elif policy == DUPLICATE_SUBMISSION_POLICY_ALLOW:
-            pass
-        
-        worker.can_start = True
-        self.active_workers.append(worker)
+        # The message id is the pipeline run uuid
+        message_id = None
+        if message != None and message[1] != None:
+            message_id = message[1].message_id
+
+        # The duplicate check and the registration must be atomic. Otherwise
+        # two submissions with the same key could both be started
+        with self._active_workers_lock:
+            # Check if there are workers running that have the same unique constraint key
+            active_workers = self._get_active_workers(worker.key)
+
+            # The API republishes the submissions the broker did not confirm.
+            # The run was already started if the first copy was delivered
+            if message_id != None and message_id in self.started_submissions:
+                logger.info(f"{lbuf('[SERVER]')} Dropped duplicate delivery of submission '{message_id}'")
+                return worker
+
+            if (
+                policy == DUPLICATE_SUBMISSION_POLICY_DENY
+                and len(active_workers) > 0
+            ):
+                return worker
+            elif policy == DUPLICATE_SUBMISSION_POLICY_TERMINATE:
+                for active_worker in active_workers:
+                    active_worker.terminate()
+                    self._deregister_worker(active_worker, terminated=True)
+            elif (
+                policy == DUPLICATE_SUBMISSION_POLICY_DEFER
+                and len(active_workers) > 0
+            ):
+                self._defer_submission(worker.key, message)
+                return worker
+            elif policy == DUPLICATE_SUBMISSION_POLICY_ALLOW:
+                pass
+
+            worker.can_start = True
+            self.active_workers.setdefault(worker.key, {})[worker.id] = worker
+
+            if message_id != None:
+                self.started_submissions[message_id] = None
+                if len(self.started_submissions) > STARTED_SUBMISSIONS_SIZE:
+                    self.started_submissions.popitem(last=False)
 
         return worker
 
     def _deregister_worker(self, worker, terminated=False):
-        worker.key = None
-        self.active_workers = [ w for w in self.active_workers if w.id != worker.id ]
+        message = None
+        with self._active_workers_lock:
+            workers = self.active_workers.get(worker.key, None)
+            if workers != None:
+                workers.pop(worker.id, None)
+                if len(workers) == 0:
+                    del self.active_workers[worker.key]
+
+                    # The last active run for this key finished. Start the next
+                    # deferred submission. Runs terminated by a duplicate
+                    # submission are replaced by that submission instead
+                    if not terminated:
+                        message = self._next_deferred_submission(worker.key)
+
+            worker.key = None
+
         worker.reset(terminated=terminated)
 
+        # Resubmit the deferred submission. It is handled like any other
+        # submission once it is redelivered
+        if message != None:
+            self.intake.resubmit(*message)
+
+    def _defer_submission(self, key, message):
+        # NOTE Must be called while holding the active workers lock
+        deferred = self.deferred_submissions.setdefault(key, deque())
+
+        # Only the latest submission is run when coalescing. The others
+        # have been superseded by it
+        if COALESCE_DEFERRED_SUBMISSIONS:
+            deferred.clear()
+
+        deferred.append(message)
+        logger.info(f"{lbuf('[SERVER]')} Deferred submission for '{key}' ({len(deferred)} deferred)")
+
+    def _next_deferred_submission(self, key):
+        # NOTE Must be called while holding the active workers lock
+        deferred = self.deferred_submissions.get(key, None)
+        if deferred == None:
+            return None
+
+        message = deferred.popleft()
+        if len(deferred) == 0:
+            del self.deferred_submissions[key]
+
+        return message
+
     def _get_active_workers(self, key):
-        return [worker for worker in self.active_workers if worker.key == key]
+        with self._active_workers_lock:
+            return list(self.active_workers.get(key, {}).values())
     
-    def _declare_queue(self, channel, queue, exclusive=True):
-        try:
-            return channel.queue_declare(queue=queue, exclusive=exclusive)
-        except ChannelClosedByBroker as e:
-            logger.critical(f"{lbuf('[SERVER]')} Exclusive queue declaration error for queue '{queue}' | {e}")
-            sys.exit(1)
-
     def _resolve_idempotency_key(self, request):
         # Check the context's meta for an idempotency key. This will be used
         # to identify duplicate workflow submissions and handle them according
@@ -0,0 +1,193 @@
+import sys, math, logging
+
+from threading import Lock
+
+from pika import BasicProperties
+from pika.exceptions import ChannelClosedByBroker
+from pika.exchange_type import ExchangeType
+
+from conf.constants import (
+    INTAKE_CONSUMERS,
+    INSUFFICIENT_WORKER_RETRY_DELAY,
+    INBOUND_EXCHANGE,
+    RETRY_EXCHANGE,
+    DEAD_LETTER_EXCHANGE,
+    DEFERRED_EXCHANGE,
+    INBOUND_QUEUE,
+    RETRY_QUEUE,
+    DEAD_LETTER_QUEUE,
+)
+from utils import lbuffer_str as lbuf
+
+
+logger = logging.getLogger("server")
+
+class Intake:
+    """Consumes workflow submissions from the inbound queue over one or more
+    channels of a single connection.
+
+    The connection is not thread-safe. 'start' runs the connection's I/O loop
+    in the calling thread, and every other method may be called from any thread;
+    the channel operations are scheduled on the I/O loop.
+
+    Messages that cannot be handled yet are retried after a delay by publishing
+    them to the retry exchange. The retry queue holds them for the retry delay,
+    then dead-letters them back to the inbound exchange. Rejected messages are
+    dead-lettered to the dead letter queue. Deferred messages are resubmitted
+    to the inbound queue via the deferred exchange.
+    """
+
+    def __init__(
+        self,
+        connection,
+        on_message,
+        consumers=INTAKE_CONSUMERS,
+        retry_delay=INSUFFICIENT_WORKER_RETRY_DELAY
+    ):
+        self.connection = connection
+        self.consumers = max(1, consumers)
+        self.retry_delay = retry_delay
+        self.channels = []
+        self.prefetch = None
+        self._on_message = on_message
+        self._lock = Lock()
+        self._stopped = False
+
+    def declare(self):
+        """Declares the exchanges and queues and binds them"""
+        channel = self.connection.channel()
+
+        # Rejected submissions are dead-lettered here
+        channel.exchange_declare(DEAD_LETTER_EXCHANGE, exchange_type=ExchangeType.fanout)
+        self._declare_queue(channel, DEAD_LETTER_QUEUE, exclusive=False)
+        channel.queue_bind(exchange=DEAD_LETTER_EXCHANGE, queue=DEAD_LETTER_QUEUE)
+
+        # Inbound exchange and queue handles workflow submissions or resubmissions
+        channel.exchange_declare(INBOUND_EXCHANGE, exchange_type=ExchangeType.fanout)
+        self._declare_queue(
+            channel,
+            INBOUND_QUEUE,
+            arguments={"x-dead-letter-exchange": DEAD_LETTER_EXCHANGE}
+        )
+        channel.queue_bind(exchange=INBOUND_EXCHANGE, queue=INBOUND_QUEUE)
+
+        # Deferred submissions are resubmitted to the inbound queue via the
+        # deferred exchange when they can be started
+        channel.exchange_declare(DEFERRED_EXCHANGE, exchange_type=ExchangeType.fanout)
+        channel.queue_bind(exchange=DEFERRED_EXCHANGE, queue=INBOUND_QUEUE)
+
+        # Submissions that are retried expire from the retry queue after the
+        # retry delay and are dead-lettered back to the inbound exchange. NOTE
+        # Not exclusive so the submissions waiting out the retry delay are not
+        # lost when the engine disconnects or restarts
+        channel.exchange_declare(RETRY_EXCHANGE, exchange_type=ExchangeType.fanout)
+        self._declare_queue(
+            channel,
+            RETRY_QUEUE,
+            exclusive=False,
+            arguments={
+                "x-message-ttl": int(self.retry_delay * 1000),
+                "x-dead-letter-exchange": INBOUND_EXCHANGE
+            }
+        )
+        channel.queue_bind(exchange=RETRY_EXCHANGE, queue=RETRY_QUEUE)
+
+        channel.close()
+
+    def start(self, prefetch=1):
+        """Opens the consumer channels and runs the I/O loop until stopped"""
+        self.prefetch = max(1, prefetch)
+        for _ in range(self.consumers):
+            channel = self.connection.channel()
+            channel.basic_qos(
+                prefetch_count=self._prefetch_per_channel(self.prefetch),
+                global_qos=True
+            )
+            channel.basic_consume(
+                queue=INBOUND_QUEUE,
+                auto_ack=False,
+                on_message_callback=self._on_message
+            )
+            self.channels.append(channel)
+
+        logger.info(f"{lbuf('[SERVER]')} Consuming '{INBOUND_QUEUE}' ({self.consumers} channels, prefetch {self.prefetch})")
+
+        while not self._stopped:
+            self.connection.process_data_events(time_limit=1)
+
+    def stop(self):
+        self._stopped = True
+
+    def ack(self, channel, delivery_tag):
+        self._threadsafe(channel, channel.basic_ack, delivery_tag)
+
+    def reject(self, channel, delivery_tag):
+        """Dead-letters the message"""
+        self._threadsafe(channel, channel.basic_reject, delivery_tag, requeue=False)
+
+    def retry(self, channel, delivery_tag, body, properties=None):
+        """Publishes the message to the retry exchange and acks the original. The
+        message is redelivered to the inbound queue after the retry delay"""
+        self._threadsafe(channel, self._retry, channel, delivery_tag, body, properties)
+
+    def resubmit(self, body, properties=None):
+        """Publishes a message that has already been acked back to the inbound
+        queue via the deferred exchange"""
+        channel = self.channels[0]
+        self._threadsafe(
+            channel,
+            channel.basic_publish,
+            exchange=DEFERRED_EXCHANGE,
+            routing_key="",
+            body=body,
+            properties=properties or BasicProperties()
+        )
+
+    def set_prefetch(self, prefetch):
+        """Sets the total number of unacknowledged messages that may be delivered
+        across all consumer channels. NOTE The prefetch is set per channel
+        (global_qos) because the broker applies a per-consumer prefetch only to
+        the consumers started after it was set"""
+        prefetch = max(1, prefetch)
+        with self._lock:
+            if prefetch == self.prefetch:
+                return
+            self.prefetch = prefetch
+
+        for channel in self.channels:
+            self._threadsafe(
+                channel,
+                channel.basic_qos,
+                prefetch_count=self._prefetch_per_channel(prefetch),
+                global_qos=True
+            )
+
+    def _retry(self, channel, delivery_tag, body, properties):
+        channel.basic_publish(
+            exchange=RETRY_EXCHANGE,
+            routing_key="",
+            body=body,
+            properties=properties or BasicProperties()
+        )
+        channel.basic_ack(delivery_tag)
+
+    def _prefetch_per_channel(self, prefetch):
+        return max(1, math.ceil(prefetch / self.consumers))
+
+    def _threadsafe(self, channel, fn, *args, **kwargs):
+        def callback():
+            if channel.is_open:
+                fn(*args, **kwargs)
+                return
+            # NOTE Unacked messages of a closed channel are redelivered
+            # by the broker
+            logger.error(f"{lbuf('[SERVER]')} Channel closed. Dropped '{getattr(fn, '__name__', fn)}'")
+
+        self.connection.add_callback_threadsafe(callback)
+
+    def _declare_queue(self, channel, queue, exclusive=True, arguments=None):
+        try:
+            return channel.queue_declare(queue=queue, exclusive=exclusive, arguments=arguments)
+        except ChannelClosedByBroker as e:
+            logger.critical(f"{lbuf('[SERVER]')} Queue declaration error for queue '{queue}' | {e}")
+            sys.exit(1)
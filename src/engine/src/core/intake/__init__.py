@@ -0,0 +1 @@
+from core.intake.Intake import Intake
\ No newline at end of file
@@ -0,0 +1,177 @@
+import os, json, time, tarfile, hashlib, logging, tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from conf.constants import (
+    BASE_WORK_DIR,
+    ARCHIVE_UPLOAD_WORKERS,
+    ARCHIVE_CHECKSUM_CHUNK_SIZE
+)
+
+
+server_logger = logging.getLogger("server")
+
+class ArchiveItem:
+    """A task output to be archived. Directories are archived as a gzipped
+    tarball named after the directory"""
+    __slots__ = ("task_id", "path", "destination", "is_dir")
+
+    def __init__(self, task_id, path, destination):
+        self.task_id = task_id
+        self.path = path
+        self.is_dir = os.path.isdir(path)
+        self.destination = destination + (".tar.gz" if self.is_dir else "")
+
+class ArchiveManifest:
+    """The checksums of the archived outputs by destination"""
+    def __init__(self, checksums=None):
+        self.checksums = dict(checksums or {})
+        self._lock = Lock()
+
+    @classmethod
+    def loads(cls, data):
+        if data == None or len(data) == 0:
+            return cls()
+
+        return cls(json.loads(data).get("checksums", {}))
+
+    def dumps(self):
+        with self._lock:
+            return json.dumps({"checksums": self.checksums}, indent=2, sort_keys=True)
+
+    def has(self, destination, checksum):
+        with self._lock:
+            return self.checksums.get(destination, None) == checksum
+
+    def set(self, destination, checksum):
+        with self._lock:
+            self.checksums[destination] = checksum
+
+def archive_items(pipeline, base_archive_dir):
+    """Returns the items for every output of every task of the pipeline. The
+    outputs of a task are archived to '<base_archive_dir>/<task_id>/output'"""
+    items = []
+    for task in pipeline.tasks:
+        task_output_dir = os.path.join(pipeline.work_dir, task.id, "output")
+        if not os.path.isdir(task_output_dir):
+            continue
+
+        for filename in sorted(os.listdir(task_output_dir)):
+            items.append(
+                ArchiveItem(
+                    task.id,
+                    os.path.join(task_output_dir, filename),
+                    os.path.join(base_archive_dir, task.id, "output", filename)
+                )
+            )
+
+    return items
+
+def base_archive_dir(archive_dir, pipeline):
+    """The archive directory of a pipeline's work. Strips the base work dir
+    from the pipline work dir"""
+    return os.path.join(
+        "/",
+        archive_dir.strip("/"),
+        pipeline.work_dir.replace(BASE_WORK_DIR, "").strip("/")
+    )
+
+def checksum(path):
+    """The sha256 checksum of a file, or of the relative paths and contents
+    of the files in a directory"""
+    digest = hashlib.sha256()
+    if not os.path.isdir(path):
+        _update_digest(digest, path)
+        return digest.hexdigest()
+
+    for (root, dirs, files) in os.walk(path):
+        dirs.sort()
+        for filename in sorted(files):
+            file_path = os.path.join(root, filename)
+            digest.update(os.path.relpath(file_path, path).encode("utf-8") + b"\0")
+            _update_digest(digest, file_path)
+
+    return digest.hexdigest()
+
+def _update_digest(digest, path):
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(ARCHIVE_CHECKSUM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+def pack(path):
+    """Packs a directory into a gzipped tarball in a temporary file and returns
+    the path of the tarball. The tarball is written as a stream so the contents
+    of the directory are never held in memory"""
+    (fd, tarball_path) = tempfile.mkstemp(suffix=".tar.gz")
+    with os.fdopen(fd, "wb") as file:
+        with tarfile.open(fileobj=file, mode="w|gz") as tarball:
+            tarball.add(path, arcname=os.path.basename(path.rstrip("/")))
+
+    return tarball_path
+
+class ArchiveUploader:
+    """Uploads archive items concurrently with a bounded pool of threads.
+
+    'upload' is called with the path of a local file, its destination and the
+    checksum of the item and must be thread-safe. Items whose checksum is in the
+    manifest for their destination are skipped. The manifest is updated as items
+    are uploaded, so an archive that was interrupted resumes where it left off
+    when archived again with the same manifest.
+    """
+
+    def __init__(self, upload, manifest=None, workers=ARCHIVE_UPLOAD_WORKERS, logger=None):
+        self.upload = upload
+        self.manifest = manifest if manifest != None else ArchiveManifest()
+        self.workers = max(1, workers)
+        self.logger = logger or server_logger
+        self._lock = Lock()
+        self._metrics = None
+
+    def run(self, items):
+        """Uploads the items and returns the metrics of the upload"""
+        self._metrics = {
+            "uploaded": 0,
+            "skipped": 0,
+            "failed": 0,
+            "bytes": 0,
+            "seconds": 0,
+            "bytes_per_second": 0
+        }
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # NOTE Consuming the results waits for every upload
+            list(executor.map(self._upload, items))
+
+        seconds = time.monotonic() - start
+        self._metrics["seconds"] = round(seconds, 3)
+        self._metrics["bytes_per_second"] = int(self._metrics["bytes"] / seconds) if seconds > 0 else 0
+
+        return dict(self._metrics)
+
+    def _upload(self, item: ArchiveItem):
+        try:
+            item_checksum = checksum(item.path)
+            if self.manifest.has(item.destination, item_checksum):
+                self._count("skipped")
+                return
+
+            path = pack(item.path) if item.is_dir else item.path
+            try:
+                self.upload(path, item.destination, item_checksum)
+                size = os.path.getsize(path)
+            finally:
+                if item.is_dir:
+                    os.remove(path)
+
+            self.manifest.set(item.destination, item_checksum)
+            self._count("uploaded", size=size)
+        except Exception as e:
+            self._count("failed")
+            self.logger.error(f"FAILED TO ARCHIVE OUTPUT '{os.path.basename(item.path)}' FOR TASK '{item.task_id}': {e}")
+
+    def _count(self, result, size=0):
+        with self._lock:
+            self._metrics[result] += 1
+            self._metrics["bytes"] += size
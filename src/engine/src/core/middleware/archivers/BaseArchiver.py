@@ -0,0 +1,30 @@
+from owe_python_sdk.events import Event, EventHandler
+from owe_python_sdk.events.types import PIPELINE_COMPLETED, PIPELINE_TERMINATED, PIPELINE_FAILED
+from errors.archives import ArchiveError
+from utils import trunc_uuid
+
+
+class BaseArchiver(EventHandler):
+    """Archives the outputs of a pipeline run's tasks when the run ends.
+    Subclasses implement 'archive'"""
+    def handle(self, event: Event):
+        if event.type in [PIPELINE_COMPLETED, PIPELINE_TERMINATED, PIPELINE_FAILED]:
+            event.payload.logger.info(f"[PIPELINE] {event.payload.pipeline.id} [ARCHIVING] {trunc_uuid(event.payload.pipeline_run.uuid)}")    
+            try:
+                self.archive(
+                    event.payload.archive,
+                    event.payload.pipeline,
+                    event.payload.args,
+                    event.payload.logger
+                )
+            except ArchiveError as e:
+                event.payload.logger.error(f"[PIPELINE] {event.payload.pipeline.id} [ERROR] {trunc_uuid(event.payload.pipeline_run.uuid)}: {e.message}")
+                return
+            except Exception as e:
+                event.payload.logger.error(f"[PIPELINE] {event.payload.pipeline.id} [ERROR] {trunc_uuid(event.payload.pipeline_run.uuid)}: {e}")
+                return
+
+            event.payload.logger.info(f"[PIPELINE] {event.payload.pipeline.id} [ARCHIVING COMPLETED] {trunc_uuid(event.payload.pipeline_run.uuid)}")
+
+    def archive(self, archive, pipeline, args, logger):
+        raise NotImplementedError()
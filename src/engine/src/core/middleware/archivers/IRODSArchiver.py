@@ -1,3 +1,81 @@
-class IRODSArchiver:
-    def archive(self, archive, pipeline):
-        pass
\ No newline at end of file
+import os
+
+from conf.constants import IRODS_TRANSFER_THREADS, IRODS_DEFAULT_ZONE
+from core.middleware.archivers.BaseArchiver import BaseArchiver
+from core.middleware.archivers.ArchiveUploader import (
+    ArchiveUploader,
+    archive_items,
+    base_archive_dir
+)
+from errors.archives import ArchiveError
+
+
+CHECKSUM_METADATA_KEY = "sha256"
+
+class IRODSObjectManifest:
+    """Looks up the checksums of archived outputs in the metadata(AVUs) of
+    their data objects"""
+    def __init__(self, session):
+        self.session = session
+
+    def has(self, destination, checksum):
+        try:
+            data_object = self.session.data_objects.get(destination)
+            return data_object.metadata.get_one(CHECKSUM_METADATA_KEY).value == checksum
+        except Exception:
+            # The data object or its checksum does not exist
+            return False
+
+    def set(self, destination, checksum):
+        # Replaces the checksum of the previous upload, if any
+        data_object = self.session.data_objects.get(destination)
+        data_object.metadata.set(CHECKSUM_METADATA_KEY, checksum)
+
+class IRODSArchiver(BaseArchiver):
+    def archive(self, archive, pipeline, args, logger):
+        if archive.credentials == None:
+            raise ArchiveError(f"No credentials for iRODS archive '{archive.id}'")
+
+        zone = getattr(archive, "zone", None) or IRODS_DEFAULT_ZONE
+        session = self._get_session(archive, zone)
+
+        # Archived to the user's home collection unless an archive dir is set
+        archive_dir = base_archive_dir(
+            getattr(archive, "archive_dir", None) or f"/{zone}/home/{archive.credentials.user}",
+            pipeline
+        )
+
+        try:
+            # Create the archive output collection of each task (like an mkdir -p)
+            items = archive_items(pipeline, archive_dir)
+            for collection in sorted(set([os.path.dirname(item.destination) for item in items])):
+                session.collections.create(collection, recurse=True)
+
+            def upload(path, destination, _):
+                # Large outputs are transferred by several threads in parallel
+                session.data_objects.put(path, destination, num_threads=IRODS_TRANSFER_THREADS)
+                logger.info(f"[PIPELINE] {pipeline.id} [ARCHIVED] {os.path.basename(destination)}")
+
+            # Outputs whose data objects have the same checksum are skipped
+            uploader = ArchiveUploader(
+                upload,
+                manifest=IRODSObjectManifest(session),
+                logger=logger
+            )
+            metrics = uploader.run(items)
+        finally:
+            session.cleanup()
+
+        logger.info(f"[PIPELINE] {pipeline.id} [ARCHIVE METRICS] {metrics}")
+
+    def _get_session(self, archive, zone):
+        # NOTE python-irodsclient is only required by pipelines with iRODS archives
+        from irods.session import iRODSSession
+
+        return iRODSSession(
+            host=archive.host,
+            port=int(archive.port),
+            user=archive.credentials.user,
+            password=archive.credentials.password,
+            zone=zone
+        )
@@ -1,3 +1,87 @@
-class S3Archiver:
-    def archive(self, archive, pipeline):
-        pass
\ No newline at end of file
+from conf.constants import (
+    S3_MULTIPART_THRESHOLD,
+    S3_MULTIPART_CHUNKSIZE,
+    S3_MULTIPART_CONCURRENCY
+)
+from core.middleware.archivers.BaseArchiver import BaseArchiver
+from core.middleware.archivers.ArchiveUploader import (
+    ArchiveUploader,
+    archive_items,
+    base_archive_dir
+)
+from errors.archives import ArchiveError
+
+
+CHECKSUM_METADATA_KEY = "sha256"
+
+class S3ObjectManifest:
+    """Looks up the checksums of archived outputs in the metadata of their
+    objects. The checksum is stored with the object when it is uploaded"""
+    def __init__(self, client, bucket):
+        self.client = client
+        self.bucket = bucket
+
+    def has(self, destination, checksum):
+        try:
+            metadata = self.client.head_object(Bucket=self.bucket, Key=destination)["Metadata"]
+        except Exception:
+            # The object does not exist
+            return False
+
+        return metadata.get(CHECKSUM_METADATA_KEY, None) == checksum
+
+    def set(self, destination, checksum):
+        pass
+
+class S3Archiver(BaseArchiver):
+    def archive(self, archive, pipeline, args, logger):
+        if archive.credentials == None:
+            raise ArchiveError(f"No credentials for S3 archive '{archive.id}'")
+
+        (client, transfer_config) = self._get_client(archive)
+
+        # Object keys are relative to the bucket
+        prefix = base_archive_dir(getattr(archive, "archive_dir", None) or "", pipeline).lstrip("/")
+
+        def upload(path, destination, checksum):
+            # Large outputs are streamed from disk in parts that are uploaded
+            # in parallel
+            client.upload_file(
+                path,
+                archive.bucket,
+                destination,
+                ExtraArgs={"Metadata": {CHECKSUM_METADATA_KEY: checksum}},
+                Config=transfer_config
+            )
+            logger.info(f"[PIPELINE] {pipeline.id} [ARCHIVED] {destination}")
+
+        # Outputs whose objects have the same checksum are skipped
+        uploader = ArchiveUploader(
+            upload,
+            manifest=S3ObjectManifest(client, archive.bucket),
+            logger=logger
+        )
+        metrics = uploader.run(archive_items(pipeline, prefix))
+
+        logger.info(f"[PIPELINE] {pipeline.id} [ARCHIVE METRICS] {metrics}")
+
+    def _get_client(self, archive):
+        # NOTE boto3 is only required by pipelines with S3 archives
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        client = boto3.client(
+            "s3",
+            endpoint_url=archive.endpoint,
+            region_name=archive.region,
+            aws_access_key_id=archive.credentials.access_key,
+            aws_secret_access_key=archive.credentials.access_secret
+        )
+        transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=S3_MULTIPART_CONCURRENCY,
+            use_threads=True
+        )
+
+        return (client, transfer_config)
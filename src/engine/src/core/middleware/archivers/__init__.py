@@ -1,4 +1,12 @@
+from core.middleware.archivers.ArchiveUploader import (
+    ArchiveItem,
+    ArchiveManifest,
+    ArchiveUploader,
+    archive_items,
+    base_archive_dir,
+    checksum,
+    pack
+)
+from core.middleware.archivers.BaseArchiver import BaseArchiver
 from core.middleware.archivers.S3Archiver import S3Archiver
 from core.middleware.archivers.IRODSArchiver import IRODSArchiver
-
-
@@ -0,0 +1,237 @@
+import time, heapq, logging
+
+from collections import deque
+from threading import Thread, Condition
+
+from conf.constants import (
+    NOTIFICATION_QUEUE_MAX_SIZE,
+    NOTIFICATION_BATCH_SIZE,
+    NOTIFICATION_WORKERS,
+    NOTIFICATION_MAX_RETRIES,
+    NOTIFICATION_RETRY_DELAY,
+    NOTIFICATION_MAX_RETRY_DELAY
+)
+from utils import lbuffer_str as lbuf
+
+
+server_logger = logging.getLogger("server")
+
+class Notification:
+    __slots__ = ("sender", "key", "payload", "critical", "attempts")
+
+    def __init__(self, sender, key, payload, critical=False):
+        self.sender = sender
+        self.key = key
+        self.payload = payload
+        self.critical = critical
+        # Number of failed attempts to send the notification
+        self.attempts = 0
+
+class NotificationQueue:
+    """A bounded queue of notifications shared by every notification handler of
+    an engine instance. Notifications are sent by background threads so the
+    workflow that produced them is never blocked.
+
+    Notifications are put on a channel(i.e. a pipeline run). The notifications of
+    a channel are sent one batch at a time in the order they were put. A batch
+    consists of consecutive notifications of a channel with the same sender, a
+    callable that receives the list of payloads. The sender may remove the
+    payloads it has sent from the list; only the remaining payloads are retried
+    if it raises. A notification put with the key of a notification of the same
+    channel that has not been sent yet replaces the payload of that notification.
+
+    A failed batch is retried after a delay. The channel is set aside until
+    then, so the threads keep sending the notifications of other channels.
+    Critical notifications (e.g. the terminal status of a run) are queued even
+    if the queue is full, and are retried every 'max_retry_delay' seconds once
+    'max_retries' is exceeded instead of being dropped.
+    """
+
+    def __init__(
+        self,
+        max_size=NOTIFICATION_QUEUE_MAX_SIZE,
+        batch_size=NOTIFICATION_BATCH_SIZE,
+        workers=NOTIFICATION_WORKERS,
+        max_retries=NOTIFICATION_MAX_RETRIES,
+        retry_delay=NOTIFICATION_RETRY_DELAY,
+        max_retry_delay=NOTIFICATION_MAX_RETRY_DELAY
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        # Pending notifications by channel and the notifications that can still
+        # be coalesced by channel and key
+        self._channels = {}
+        self._keyed = {}
+
+        # Channels with pending notifications that are not being sent
+        self._ready = deque()
+        # Channels waiting to retry a failed batch by the time of the retry
+        self._delayed = []
+        self._delayed_count = 0
+        # Channels that are either ready or being sent
+        self._scheduled = set()
+
+        self._size = 0
+        self._sent = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._threads = []
+        self._condition = Condition()
+
+    def put(self, channel, sender, payload, key=None, critical=False):
+        """Queues a notification. Returns False if the queue is full and the
+        notification was dropped. Critical notifications are never dropped
+        because the queue is full"""
+        with self._condition:
+            if key != None:
+                notification = self._keyed.get((channel, key), None)
+                if notification != None and notification.sender == sender:
+                    notification.payload = payload
+                    notification.critical = notification.critical or critical
+                    self._coalesced += 1
+                    return True
+
+            if self._size >= self.max_size and not critical:
+                self._dropped += 1
+                server_logger.error(f"{lbuf('[SERVER]')} Notification queue full ({self.max_size}). Dropped notification for '{channel}'")
+                return False
+
+            notification = Notification(sender, key, payload, critical=critical)
+            self._channels.setdefault(channel, deque()).append(notification)
+            if key != None:
+                self._keyed[(channel, key)] = notification
+            self._size += 1
+
+            if channel not in self._scheduled:
+                self._scheduled.add(channel)
+                self._ready.append(channel)
+                self._condition.notify()
+
+            self._start()
+
+        return True
+
+    def flush(self, timeout=None):
+        """Blocks until every queued notification has been sent or dropped.
+        Returns False if the timeout expired first"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: len(self._scheduled) == 0,
+                timeout=timeout
+            )
+
+    def metrics(self):
+        with self._condition:
+            return {
+                "queued": self._size,
+                "sent": self._sent,
+                "coalesced": self._coalesced,
+                "dropped": self._dropped,
+            }
+
+    def _start(self):
+        # NOTE Must be called while holding the lock
+        if len(self._threads) > 0:
+            return
+
+        for i in range(self.workers):
+            thread = Thread(target=self._run, name=f"notifications-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            (channel, batch) = self._next_batch()
+            unsent = self._send(channel, batch)
+            sent = len(batch) - len(unsent)
+
+            with self._condition:
+                self._size -= sent
+                self._sent += sent
+
+                attempts = max([notification.attempts for notification in unsent], default=0) + 1
+                if attempts > self.max_retries:
+                    # Only the critical notifications are retried past the
+                    # max retries
+                    dropped = [notification for notification in unsent if not notification.critical]
+                    unsent = [notification for notification in unsent if notification.critical]
+                    if len(dropped) > 0:
+                        server_logger.error(f"{lbuf('[SERVER]')} Failed to send notifications for '{channel}'. Dropped {len(dropped)} notifications")
+                        self._size -= len(dropped)
+                        self._dropped += len(dropped)
+
+                if len(unsent) > 0:
+                    # The unsent notifications are retried before the
+                    # notifications queued after them
+                    delay = self.max_retry_delay
+                    if attempts <= self.max_retries:
+                        delay = min(self.retry_delay * (2 ** (attempts - 1)), self.max_retry_delay)
+                    server_logger.error(f"{lbuf('[SERVER]')} Failed to send notifications for '{channel}'. Retrying ({delay}s)")
+                    for notification in unsent:
+                        notification.attempts = attempts
+                    self._channels[channel].extendleft(reversed(unsent))
+                    self._delayed_count += 1
+                    heapq.heappush(self._delayed, (time.monotonic() + delay, self._delayed_count, channel))
+                    self._condition.notify_all()
+                    continue
+
+                # The channel remains scheduled while it has pending notifications
+                if len(self._channels.get(channel, [])) > 0:
+                    self._ready.append(channel)
+                else:
+                    self._channels.pop(channel, None)
+                    self._scheduled.discard(channel)
+
+                self._condition.notify_all()
+
+    def _next_batch(self):
+        with self._condition:
+            while True:
+                # Channels whose retry delay has passed are ready again
+                now = time.monotonic()
+                while len(self._delayed) > 0 and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+
+                if len(self._ready) > 0:
+                    break
+
+                timeout = None
+                if len(self._delayed) > 0:
+                    timeout = self._delayed[0][0] - now
+                self._condition.wait(timeout=timeout)
+
+            channel = self._ready.popleft()
+            notifications = self._channels[channel]
+
+            batch = [notifications.popleft()]
+            while (
+                len(notifications) > 0
+                and len(batch) < self.batch_size
+                and notifications[0].sender == batch[0].sender
+            ):
+                batch.append(notifications.popleft())
+
+            # Notifications being sent can no longer be coalesced
+            for notification in batch:
+                if notification.key != None:
+                    self._keyed.pop((channel, notification.key), None)
+
+            return (channel, batch)
+
+    def _send(self, channel, batch):
+        # Returns the notifications that were not sent. The sender removes the
+        # payloads it has sent from the front of the list
+        payloads = [notification.payload for notification in batch]
+        try:
+            batch[0].sender(payloads)
+            return []
+        except Exception as e:
+            server_logger.error(f"{lbuf('[SERVER]')} Failed to send notifications for '{channel}' | {e}")
+            return batch[len(batch) - len(payloads):]
+
+notification_queue = NotificationQueue()
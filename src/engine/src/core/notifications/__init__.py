@@ -0,0 +1 @@
+from core.notifications.NotificationQueue import NotificationQueue, notification_queue
\ No newline at end of file
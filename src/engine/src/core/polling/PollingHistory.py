@@ -0,0 +1,28 @@
+from collections import deque
+from statistics import median
+from threading import Lock
+
+from conf.constants import POLLING_HISTORY_SIZE
+
+
+class PollingHistory:
+    """Durations of the most recent runs of each task, keyed by an identifier of
+    the task, e.g. '<group_id>.<pipeline_id>.<task_id>'"""
+    def __init__(self, size=POLLING_HISTORY_SIZE):
+        self._size = size
+        self._durations = {}
+        self._lock = Lock()
+
+    def record(self, key, duration):
+        with self._lock:
+            self._durations.setdefault(key, deque(maxlen=self._size)).append(duration)
+
+    def expected_duration(self, key):
+        with self._lock:
+            durations = self._durations.get(key, None)
+            if durations == None or len(durations) == 0:
+                return None
+
+            return median(durations)
+
+polling_history = PollingHistory()
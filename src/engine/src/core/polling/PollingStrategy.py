@@ -0,0 +1,124 @@
+import time, math, random
+
+from conf.constants import (
+    MIN_POLLING_INTERVAL,
+    MAX_POLLING_INTERVAL,
+    POLLING_BACKOFF_FACTOR,
+    POLLING_BACKOFF_JITTER,
+    POLLING_BACKOFF_MAX_INTERVAL,
+    POLLING_EXEC_TIME_DIVISOR
+)
+
+
+def clamp(interval, min_interval, max_interval):
+    return max(min_interval, min(interval, max_interval))
+
+class PollingStrategy:
+    """Determines how long a task executor waits between consecutive polls of
+    the status of a long-running job. 'next_interval' is called before each
+    poll and 'complete' is called once the job has reached a terminal state."""
+    def __init__(
+        self,
+        min_interval=MIN_POLLING_INTERVAL,
+        max_interval=MAX_POLLING_INTERVAL
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.polls = 0
+        self.started_at = time.monotonic()
+
+    def next_interval(self) -> float:
+        interval = clamp(self._interval(), self.min_interval, self.max_interval)
+        self.polls += 1
+        return interval
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def complete(self):
+        pass
+
+    def _interval(self) -> float:
+        raise NotImplementedError()
+
+class FixedPollingStrategy(PollingStrategy):
+    def _interval(self):
+        return self.min_interval
+
+class ExponentialBackoffPollingStrategy(PollingStrategy):
+    """Doubles(by default) the interval after every poll. Jitter spreads out the
+    polls of tasks that were started at the same time"""
+    def __init__(
+        self,
+        min_interval=MIN_POLLING_INTERVAL,
+        max_interval=POLLING_BACKOFF_MAX_INTERVAL,
+        factor=POLLING_BACKOFF_FACTOR,
+        jitter=POLLING_BACKOFF_JITTER
+    ):
+        PollingStrategy.__init__(self, min_interval, max_interval)
+        self.factor = factor
+        self.jitter = jitter
+        # The exponent at which the interval reaches the max interval. The
+        # exponent stops growing there, so the interval never overflows
+        self.max_exponent = 0
+        if factor > 1 and self.min_interval > 0:
+            self.max_exponent = math.ceil(
+                math.log(self.max_interval / self.min_interval, factor))
+
+    def _interval(self):
+        exponent = min(self.polls, self.max_exponent)
+        interval = min(self.min_interval * (self.factor ** exponent), self.max_interval)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+class MaxExecTimePollingStrategy(PollingStrategy):
+    """Polls at a fixed fraction of the task's max_exec_time. Tasks that are
+    permitted to run for days are polled far less often than tasks that must
+    complete in minutes"""
+    def __init__(
+        self,
+        max_exec_time,
+        min_interval=MIN_POLLING_INTERVAL,
+        max_interval=MAX_POLLING_INTERVAL,
+        divisor=POLLING_EXEC_TIME_DIVISOR
+    ):
+        PollingStrategy.__init__(self, min_interval, max_interval)
+        self.max_exec_time = max_exec_time
+        self.divisor = divisor
+
+    def _interval(self):
+        if self.max_exec_time == None or self.max_exec_time <= 0:
+            return self.min_interval
+
+        return self.max_exec_time / self.divisor
+
+class HistoricalPollingStrategy(PollingStrategy):
+    """Uses the durations of previous runs of the same task to poll sparsely
+    until the task is expected to complete, then backs off exponentially from
+    the minimum interval. Behaves like the exponential backoff strategy when
+    there are no previous runs"""
+    def __init__(
+        self,
+        history,
+        key,
+        min_interval=MIN_POLLING_INTERVAL,
+        max_interval=MAX_POLLING_INTERVAL,
+        divisor=10
+    ):
+        PollingStrategy.__init__(self, min_interval, max_interval)
+        self.history = history
+        self.key = key
+        self.divisor = divisor
+        self.expected_duration = self.history.expected_duration(key)
+        self._backoff = ExponentialBackoffPollingStrategy(min_interval=min_interval)
+
+    def _interval(self):
+        remaining = (self.expected_duration or 0) - self.elapsed()
+        if remaining <= 0:
+            return self._backoff.next_interval()
+
+        # Poll at a fraction of the expected duration but never sleep past
+        # the expected completion time
+        return min(self.expected_duration / self.divisor, remaining)
+
+    def complete(self):
+        self.history.record(self.key, self.elapsed())
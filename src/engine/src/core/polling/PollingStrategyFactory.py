@@ -0,0 +1,38 @@
+from core.polling.PollingStrategy import (
+    FixedPollingStrategy,
+    ExponentialBackoffPollingStrategy,
+    MaxExecTimePollingStrategy,
+    HistoricalPollingStrategy
+)
+from core.polling.PollingHistory import polling_history
+from conf.constants import MIN_POLLING_INTERVAL, POLLING_STRATEGY
+
+
+class PollingStrategyFactory:
+    def build(self, task, ctx, strategy=POLLING_STRATEGY, min_interval=MIN_POLLING_INTERVAL):
+        fn = getattr(self, f"_{strategy}", None)
+        if fn == None:
+            raise Exception(f"Invalid polling strategy '{strategy}'. Expected oneOf ['fixed', 'exponential', 'max_exec_time', 'historical']")
+
+        return fn(task, ctx, min_interval)
+
+    def _fixed(self, _, __, min_interval):
+        return FixedPollingStrategy(min_interval=min_interval)
+
+    def _exponential(self, _, __, min_interval):
+        return ExponentialBackoffPollingStrategy(min_interval=min_interval)
+
+    def _max_exec_time(self, task, _, min_interval):
+        return MaxExecTimePollingStrategy(
+            task.execution_profile.max_exec_time,
+            min_interval=min_interval
+        )
+
+    def _historical(self, task, ctx, min_interval):
+        return HistoricalPollingStrategy(
+            polling_history,
+            f"{ctx.group.id}.{ctx.pipeline.id}.{task.id}",
+            min_interval=min_interval
+        )
+
+polling_strategy_factory = PollingStrategyFactory()
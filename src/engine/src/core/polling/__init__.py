@@ -0,0 +1,9 @@
+from core.polling.PollingStrategy import (
+    PollingStrategy,
+    FixedPollingStrategy,
+    ExponentialBackoffPollingStrategy,
+    MaxExecTimePollingStrategy,
+    HistoricalPollingStrategy
+)
+from core.polling.PollingHistory import PollingHistory, polling_history
+from core.polling.PollingStrategyFactory import polling_strategy_factory
@@ -1,27 +1,179 @@
-import os
+import io, os, time, fcntl, shutil, hashlib, tempfile
+
+from contextlib import contextmanager
 
 import git
 
+from conf.constants import (
+    GIT_CACHE_DIR,
+    GIT_CACHE_TTL,
+    GIT_CACHE_DEPTH,
+    GIT_CACHE_FILTER
+)
+
 
 class GitCacheRepository:
-    def __init__(self, cache_dir):
+    """A cache of bare mirrors of git repositories shared by every pipeline run.
+
+    Each repository is mirrored once into a directory named after the sha256 of
+    its url and only fetched again once the last fetch is older than 'ttl'
+    seconds, so repeated runs do not touch the network. The files of a ref are
+    materialized from the mirror without cloning, and files can be read from a
+    ref without materializing it at all.
+
+    Operations on a mirror hold a lock on the mirror's lock file, so the mirror
+    is never fetched by two threads or processes at the same time.
+    """
+    FETCHED_AT_FILENAME = "owe-fetched-at"
+
+    def __init__(
+        self,
+        cache_dir=GIT_CACHE_DIR,
+        ttl=GIT_CACHE_TTL,
+        depth=GIT_CACHE_DEPTH,
+        filter=GIT_CACHE_FILTER
+    ):
         self._cache_dir = cache_dir
+        self.ttl = ttl
+        self.depth = depth
+        self.filter = filter
+
+    def checkout(self, url: str, directory: str, branch=None):
+        """Writes the files of the branch(or the default branch) of the
+        repository into the directory"""
+        with self._lock(url):
+            mirror_dir = self._mirror(url, branch)
+            os.makedirs(directory, exist_ok=True)
+
+            # A throwaway index is used so that the mirror is never modified.
+            # NOTE The files of a partial mirror are fetched here as needed
+            (fd, index_file) = tempfile.mkstemp(prefix="owe-index-")
+            os.close(fd)
+            os.remove(index_file)
+            try:
+                git.cmd.Git().execute(
+                    [
+                        "git",
+                        f"--git-dir={mirror_dir}",
+                        f"--work-tree={directory}",
+                        "read-tree",
+                        "-u",
+                        "--reset",
+                        self._ref(branch)
+                    ],
+                    env={"GIT_INDEX_FILE": index_file}
+                )
+            finally:
+                if os.path.exists(index_file):
+                    os.remove(index_file)
+
+    def read_file(self, url: str, path: str, branch=None) -> bytes:
+        """Returns the contents of a file at the branch(or the default branch)
+        of the repository"""
+        with self._lock(url):
+            mirror_dir = self._mirror(url, branch)
+
+            # Streamed so the contents are returned as they are in the file
+            contents = io.BytesIO()
+            git.cmd.Git().execute(
+                [
+                    "git",
+                    f"--git-dir={mirror_dir}",
+                    "show",
+                    f"{self._ref(branch)}:{path.lstrip('/')}"
+                ],
+                output_stream=contents
+            )
+
+            return contents.getvalue()
+
+    def rev_parse(self, url: str, branch=None) -> str:
+        """Returns the sha of the commit at the branch(or the default branch)
+        of the repository"""
+        with self._lock(url):
+            return self._rev_parse(self._mirror(url, branch), branch)
+
+    def mirror_dir(self, url: str):
+        return os.path.join(
+            self._cache_dir,
+            hashlib.sha256(url.encode("utf-8")).hexdigest() + ".git"
+        )
+
+    def _mirror(self, url, branch):
+        # Returns the mirror's directory once the mirror exists, is fresh and
+        # has the branch. The lock of the url must be held
+        mirror_dir = self.mirror_dir(url)
+        if not os.path.exists(os.path.join(mirror_dir, self.FETCHED_AT_FILENAME)):
+            self._clone(url, mirror_dir)
+            return mirror_dir
+
+        if self._is_stale(mirror_dir):
+            self._fetch(mirror_dir)
+            return mirror_dir
+
+        # A branch created since the last fetch
+        try:
+            self._rev_parse(mirror_dir, branch)
+        except git.exc.GitCommandError:
+            self._fetch(mirror_dir)
+
+        return mirror_dir
+
+    def _clone(self, url, mirror_dir):
+        # Remove what is left of a clone that failed
+        shutil.rmtree(mirror_dir, ignore_errors=True)
+
+        args = ["git", "clone", "--mirror", "--quiet"]
+        if self.depth != None:
+            args.extend(["--depth", str(self.depth), "--no-single-branch"])
+        if self.filter != None:
+            args.append(f"--filter={self.filter}")
+
+        try:
+            git.cmd.Git().execute(args + [url, mirror_dir])
+        except Exception as e:
+            shutil.rmtree(mirror_dir, ignore_errors=True)
+            raise e
+
+        self._touch(mirror_dir)
+
+    def _fetch(self, mirror_dir):
+        args = ["git", f"--git-dir={mirror_dir}", "fetch", "--prune", "--quiet"]
+        if self.depth != None:
+            args.extend(["--depth", str(self.depth)])
+
+        git.cmd.Git().execute(args)
+        self._touch(mirror_dir)
+
+    def _is_stale(self, mirror_dir):
+        fetched_at = os.path.getmtime(os.path.join(mirror_dir, self.FETCHED_AT_FILENAME))
+        return time.time() - fetched_at >= self.ttl
+
+    def _touch(self, mirror_dir):
+        with open(os.path.join(mirror_dir, self.FETCHED_AT_FILENAME), "w"):
+            pass
+
+    def _rev_parse(self, mirror_dir, branch):
+        return git.cmd.Git().execute(
+            [
+                "git",
+                f"--git-dir={mirror_dir}",
+                "rev-parse",
+                "--verify",
+                "--quiet",
+                f"{self._ref(branch)}^{{commit}}"
+            ]
+        )
+
+    def _ref(self, branch):
+        return branch if branch != None else "HEAD"
 
-    def add(self, url: str, directory: str, branch=None):
-        kwargs = {}
-        if branch != None:
-            kwargs["branch"] = branch
-        git.Repo.clone_from(url, os.path.join(self._cache_dir, directory.lstrip("/")), **kwargs)
-
-    def repo_exists(self, path):
-        return os.path.exists(os.path.join(self._cache_dir, path.lstrip("/")))
-    
-    def update(self, directory, branch=None):
-        git.cmd.Git(os.path.join(self._cache_dir, directory.lstrip("/"))).pull()
-
-    def add_or_update(self, url, directory, branch=None):
-        if not self.repo_exists(directory):
-            self.add(url, directory, branch)
-            return
-        
-        self.update(directory, branch)
\ No newline at end of file
+    @contextmanager
+    def _lock(self, url):
+        os.makedirs(self._cache_dir, exist_ok=True)
+        with open(self.mirror_dir(url) + ".lock", "w") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
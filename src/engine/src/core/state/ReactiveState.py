@@ -1,96 +1,103 @@
 import copy
 
-from typing import Any
-from threading import Lock
+from types import MappingProxyType
+from typing import Any, Callable, Union
+from threading import RLock, local
 
 from core.state import Hook
 
 
 class ReactiveState(object):
     """ReactiveState is a thread-safe state management mechanism that allows
-    user-defined functions to be performed when when state is queried or mutated.
-    
-    NOTE This will only work when the object's attributes are fetched and set directly,
-    and refrences created to this object will not 
+    user-defined functions(hooks) to be performed when state is mutated.
+
+    The state is stored in a dict that is never modified in place. Every write
+    copies the dict, sets the new value and swaps the reference, so reads never
+    take the lock and always see a consistent snapshot of the state. Writes are
+    serialized by a lock and run the hooks subscribed to the attribute being
+    written while holding it. Hooks with no attrs are run on every write. Writes
+    made by a hook do not trigger any hooks.
+
+    The initial state is either a dict, which is deep copied on every reset, or a
+    function that returns the fresh state of a run. Prefer the latter. Resetting
+    with a function is a single allocation no matter how large the previous state
+    has grown, and the previous state is simply dropped.
+
+    NOTE This will only work when the object's attributes are fetched and set directly.
+    Mutating a value in place(i.e. appending to a list) does not trigger any hooks
     """
 
     def __init__(self):
         super(ReactiveState, self).__setattr__("_hooks", [])
+        super(ReactiveState, self).__setattr__("_hooks_by_attr", {})
         super(ReactiveState, self).__setattr__("_initial_state", {})
         super(ReactiveState, self).__setattr__("_state", {})
-        super(ReactiveState, self).__setattr__("_lock", Lock())
-        super(ReactiveState, self).__setattr__("_called_externally", True)
-        
-    def __setattr__(self, __name: str, __value: Any) -> None:
-        if self._called_externally:
-            self._set_external(__name, __value)
-            return
-
-        self._set_internal(__name, __value)
-
-    def __getattr__(self, __name: str) -> Any:
-        if self._called_externally:
-            return self._get_external(__name)
-
-        return self._get_internal(__name)
+        super(ReactiveState, self).__setattr__("_lock", RLock())
+        super(ReactiveState, self).__setattr__("_local", local())
 
-    def _set_external(self, __name: str, __value: Any) -> None:
-        self._lock.acquire()
+    def __setattr__(self, __name: str, __value: Any) -> None:
+        with self._lock:
+            state = dict(self._state)
+            state[__name] = __value
+            super(ReactiveState, self).__setattr__("_state", state)
 
-        self._state[__name] = __value
+            # Writes made by hooks do not trigger hooks
+            if getattr(self._local, "running_hooks", False):
+                return
 
-        try:
             self._run_hooks(__name)
-        except Exception as e:
-            self._lock.release()
-            raise e
-
-        self._lock.release()
-
-    def _set_internal(self, __name: str, __value: Any) -> None:
-        self._state[__name] = __value
 
-    def _get_external(self, __name: str) -> None:
-        self._lock.acquire()
-
-        try:
-            value = self._state[__name]
-        except KeyError:
-            self._lock.release()
-            raise AttributeError(f"type object '{type(self)}' has no attribute '{__name}'")
-
-        try:
-            self._run_hooks(__name)
-        except Exception as e:
-            self._lock.release()
-            raise e
-        
-        self._lock.release()
-
-        return value
-    
-    def _get_internal(self, __name: str) -> None:
+    def __getattr__(self, __name: str) -> Any:
+        # NOTE Only invoked for names that are not attributes of the instance
+        # itself. Reading the reference to the state dict is atomic.
         try:
-            value = self._state[__name]
+            return self._state[__name]
         except KeyError:
-            self._lock.release()
             raise AttributeError(f"type object '{type(self)}' has no attribute '{__name}'")
 
-        return value
-
     def _run_hooks(self, __name):
-        super(ReactiveState, self).__setattr__("_called_externally", False)
-        for hook in self._hooks:
-            if __name in hook.attrs or len(hook.attrs) == 0:
+        # NOTE Must be called while holding the lock
+        self._local.running_hooks = True
+        try:
+            for hook in self._get_hooks(__name):
                 hook(self)
-        super(ReactiveState, self).__setattr__("_called_externally", True)
+        finally:
+            self._local.running_hooks = False
+
+    def _get_hooks(self, __name):
+        # NOTE Must be called while holding the lock. Hooks are resolved once
+        # per attribute and kept in the order in which they were registered
+        hooks = self._hooks_by_attr.get(__name, None)
+        if hooks == None:
+            hooks = [
+                hook for hook in self._hooks
+                if __name in hook.attrs or len(hook.attrs) == 0
+            ]
+            self._hooks_by_attr[__name] = hooks
+
+        return hooks
+
+    def snapshot(self):
+        """Returns a read-only view of the state at the time of the call.
+        Subsequent writes are not reflected in the snapshot"""
+        return MappingProxyType(self._state)
 
     def reset(self):
-        super(ReactiveState, self).__setattr__("_state", copy.deepcopy(self._initial_state))
+        with self._lock:
+            super(ReactiveState, self).__setattr__("_state", self._new_state())
+
+    def set_initial_state(self, state: Union[dict, Callable[[], dict]]):
+        with self._lock:
+            super(ReactiveState, self).__setattr__("_initial_state", state)
+            super(ReactiveState, self).__setattr__("_state", self._new_state())
+
+    def _new_state(self):
+        if callable(self._initial_state):
+            return dict(self._initial_state())
 
-    def set_initial_state(self, state: dict):
-        super(ReactiveState, self).__setattr__("_initial_state", state)
-        super(ReactiveState, self).__setattr__("_state", copy.deepcopy(state))
+        return copy.deepcopy(self._initial_state)
 
     def register_hooks(self, hooks: list[Hook]):
-        super(ReactiveState, self).__setattr__("_hooks", hooks)
\ No newline at end of file
+        with self._lock:
+            super(ReactiveState, self).__setattr__("_hooks", hooks)
+            super(ReactiveState, self).__setattr__("_hooks_by_attr", {})
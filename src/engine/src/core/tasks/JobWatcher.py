@@ -0,0 +1,182 @@
+import time, logging
+
+from concurrent.futures import Future
+from threading import Thread, Lock
+
+from kubernetes import config, client, watch
+from kubernetes.client.exceptions import ApiException
+
+from conf.constants import (
+    KUBERNETES_NAMESPACE,
+    KUBERNETES_JOB_LABEL_SELECTOR,
+    JOB_WATCHER_TIMEOUT,
+    JOB_WATCHER_RETRY_DELAY
+)
+from utils import lbuffer_str as lbuf
+from utils.k8s import job_in_terminal_state
+from errors import TaskExecutionError
+
+
+server_logger = logging.getLogger("server")
+
+class JobWatcher:
+    """Watches every Kubernetes job created by the engine with a single watch
+    stream and resolves the futures of task executors waiting on those jobs when
+    they reach a terminal state. This replaces each task executor polling the
+    Kubernetes API for the status of its own job.
+
+    The watch stream is started in a background thread the first time a job is
+    watched. Whenever the stream needs to be (re)established, all jobs are listed
+    first so no terminal state is missed between streams.
+
+    The future of a job that is deleted before it reaches a terminal state
+    fails with a TaskExecutionError.
+    """
+
+    def __init__(
+        self,
+        batch_v1_api=None,
+        namespace=KUBERNETES_NAMESPACE,
+        label_selector=KUBERNETES_JOB_LABEL_SELECTOR,
+        watch_cls=watch.Watch,
+        timeout=JOB_WATCHER_TIMEOUT,
+        retry_delay=JOB_WATCHER_RETRY_DELAY
+    ):
+        self._batch_v1_api = batch_v1_api
+        self._namespace = namespace
+        self._label_selector = label_selector
+        self._watch_cls = watch_cls
+        self._timeout = timeout
+        self._retry_delay = retry_delay
+
+        # Futures of the jobs being waited on, by job name
+        self._futures = {}
+        self._lock = Lock()
+        self._thread = None
+        self._stopped = False
+
+    def watch(self, job_name) -> Future:
+        """Returns a future that resolves to the job once it is in a terminal
+        state"""
+        with self._lock:
+            future = self._futures.get(job_name, None)
+            if future == None:
+                future = Future()
+                self._futures[job_name] = future
+            self._start()
+
+        # The job may have reached a terminal state before it was watched
+        try:
+            self._on_job(
+                self._get_batch_v1_api().read_namespaced_job(job_name, self._namespace)
+            )
+        except Exception as e:
+            with self._lock:
+                future.done() or future.set_exception(e)
+
+        return future
+
+    def unwatch(self, job_name):
+        with self._lock:
+            self._futures.pop(job_name, None)
+
+    def stop(self):
+        self._stopped = True
+
+    def _start(self):
+        # NOTE Must be called while holding the lock
+        if self._thread != None and self._thread.is_alive():
+            return
+
+        self._stopped = False
+        self._thread = Thread(target=self._run, name="job-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        resource_version = None
+        while not self._stopped:
+            try:
+                api = self._get_batch_v1_api()
+
+                # List the jobs to sync the state of all watched jobs and get the
+                # resource version from which to start the watch stream
+                if resource_version == None:
+                    # NOTE Jobs are created before they are watched, so every
+                    # job watched before the list was requested is listed
+                    # unless it was deleted
+                    with self._lock:
+                        watched = list(self._futures)
+                    jobs = api.list_namespaced_job(
+                        self._namespace,
+                        label_selector=self._label_selector
+                    )
+                    for job in jobs.items:
+                        self._on_job(job)
+                    listed = set([job.metadata.name for job in jobs.items])
+                    for job_name in watched:
+                        if job_name not in listed:
+                            self._on_deleted(job_name)
+                    resource_version = jobs.metadata.resource_version
+
+                w = self._watch_cls()
+                for event in w.stream(
+                    api.list_namespaced_job,
+                    namespace=self._namespace,
+                    label_selector=self._label_selector,
+                    resource_version=resource_version,
+                    timeout_seconds=self._timeout
+                ):
+                    if self._stopped:
+                        w.stop()
+                        break
+
+                    # The resource version is too old. Relist
+                    if event["type"] == "ERROR":
+                        resource_version = None
+                        break
+
+                    job = event["object"]
+                    resource_version = job.metadata.resource_version
+                    if event["type"] == "DELETED" and not job_in_terminal_state(job):
+                        self._on_deleted(job.metadata.name)
+                        continue
+
+                    self._on_job(job)
+            except ApiException as e:
+                # 410 Gone. The resource version is too old
+                if e.status == 410:
+                    resource_version = None
+                    continue
+                server_logger.error(f"{lbuf('[SERVER]')} Job watcher error: {e}")
+                resource_version = None
+                time.sleep(self._retry_delay)
+            except Exception as e:
+                server_logger.error(f"{lbuf('[SERVER]')} Job watcher error: {e}")
+                resource_version = None
+                time.sleep(self._retry_delay)
+
+    def _on_job(self, job):
+        if not job_in_terminal_state(job):
+            return
+
+        with self._lock:
+            future = self._futures.get(job.metadata.name, None)
+            if future != None and not future.done():
+                future.set_result(job)
+
+    def _on_deleted(self, job_name):
+        with self._lock:
+            future = self._futures.get(job_name, None)
+            if future != None and not future.done():
+                future.set_exception(
+                    TaskExecutionError(f"Job '{job_name}' was deleted before it reached a terminal state")
+                )
+
+    def _get_batch_v1_api(self):
+        if self._batch_v1_api == None:
+            config.load_incluster_config()
+            self._batch_v1_api = client.BatchV1Api()
+
+        return self._batch_v1_api
+
+job_watcher = JobWatcher()
@@ -0,0 +1,266 @@
+import os, time, logging
+
+from threading import Thread, Lock
+
+from kubernetes.client.exceptions import ApiException
+
+from conf.constants import (
+    KUBERNETES_NAMESPACE,
+    POD_LOG_MAX_BYTES,
+    POD_LOG_BACKUP_COUNT,
+    POD_LOG_CHUNK_SIZE,
+    POD_LOG_RETRY_DELAY,
+    POD_LOG_STREAM_TIMEOUT
+)
+from utils import lbuffer_str as lbuf
+from utils.k8s import job_in_terminal_state
+
+
+server_logger = logging.getLogger("server")
+
+class PodLogStreamer:
+    """Streams the logs of a job's pod to a file in chunks while the job runs,
+    so the logs are never held in memory whole and can be tailed from the file
+    as they are written.
+
+    The stream is started in a background thread that waits for the pod's
+    container to start and follows its logs until the container exits. The file
+    is rotated once it reaches 'max_bytes', keeping 'backup_count' rotated files
+    named '<name>.1' (newest) to '<name>.<backup_count>' in 'backup_dir', which
+    defaults to the directory of the file. Without backups, the logs past
+    'max_bytes' are dropped.
+
+    The logs of the newest pod of the job that has not terminated are followed.
+    When its logs end before the job has reached a terminal state(i.e. the pod
+    failed and the job will retry it), the pod that replaces it is followed
+    next. The state of the job is read with 'batch_v1_api'. Without it, only
+    the logs of a single pod are streamed.
+    """
+
+    TRUNCATED_MARKER = b"\n[LOGS TRUNCATED]\n"
+
+    def __init__(
+        self,
+        core_v1_api,
+        job_name,
+        path,
+        batch_v1_api=None,
+        backup_dir=None,
+        namespace=KUBERNETES_NAMESPACE,
+        max_bytes=POD_LOG_MAX_BYTES,
+        backup_count=POD_LOG_BACKUP_COUNT,
+        chunk_size=POD_LOG_CHUNK_SIZE,
+        retry_delay=POD_LOG_RETRY_DELAY
+    ):
+        self._core_v1_api = core_v1_api
+        self._batch_v1_api = batch_v1_api
+        self._job_name = job_name
+        self._namespace = namespace
+        self.path = path
+        self.backup_path = os.path.join(
+            backup_dir or os.path.dirname(path),
+            os.path.basename(path)
+        )
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.chunk_size = chunk_size
+        self.retry_delay = retry_delay
+
+        # The exception that ended the stream, if any
+        self.error = None
+        self.bytes_streamed = 0
+        self.truncated = False
+
+        self._file = None
+        self._size = 0
+        self._response = None
+        self._lock = Lock()
+        self._thread = None
+        self._stopped = False
+
+    def start(self):
+        self._thread = Thread(
+            target=self._run,
+            name=f"pod-logs-{self._job_name}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def join(self, timeout=POD_LOG_STREAM_TIMEOUT):
+        """Waits for the stream to end once the pod's container has exited.
+        Stops the stream if it has not ended within the timeout. Returns False
+        if the stream had to be stopped"""
+        if self._thread == None:
+            return True
+
+        self._thread.join(timeout=timeout)
+        if not self._thread.is_alive():
+            return True
+
+        server_logger.error(f"{lbuf('[SERVER]')} Timed out streaming the logs of job '{self._job_name}'")
+        self.stop()
+        return False
+
+    def stop(self):
+        """Stops streaming. Logs already received are kept"""
+        with self._lock:
+            self._stopped = True
+            response = self._response
+
+        # Closing the response unblocks the read in the streaming thread
+        if response != None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+        if self._thread != None:
+            self._thread.join(timeout=self.retry_delay + 1)
+
+    def _run(self):
+        # The pods whose logs have been streamed and the newest of them
+        followed = set()
+        last = None
+        try:
+            while True:
+                (response, pod) = self._open_stream(followed, last)
+                if response == None:
+                    return
+
+                followed.add(pod.metadata.name)
+                last = pod
+                try:
+                    for chunk in response.stream(self.chunk_size):
+                        self._write(chunk)
+                finally:
+                    response.release_conn()
+                    with self._lock:
+                        self._response = None
+        except Exception as e:
+            # A stream that was stopped is expected to be interrupted
+            if not self._stopped:
+                self.error = e
+                server_logger.error(f"{lbuf('[SERVER]')} Error streaming the logs of job '{self._job_name}' | {e}")
+        finally:
+            self._close()
+
+    def _open_stream(self, followed, last):
+        # Returns the log stream of the next pod of the job to follow once its
+        # container has started and the pod. Returns None if stopped first or
+        # if the job has no pod left to follow
+        while not self._stopped:
+            pods = self._core_v1_api.list_namespaced_pod(
+                namespace=self._namespace,
+                label_selector=f"job-name={self._job_name}"
+            ).items
+
+            pod = self._pod(pods, followed, last)
+            if pod == None and last != None and self._job_done():
+                return (None, None)
+
+            if pod != None:
+                try:
+                    response = self._core_v1_api.read_namespaced_pod_log(
+                        name=pod.metadata.name,
+                        namespace=self._namespace,
+                        follow=True,
+                        _preload_content=False
+                    )
+                    with self._lock:
+                        if not self._stopped:
+                            self._response = response
+                            return (response, pod)
+                    response.release_conn()
+                    return (None, None)
+                except ApiException as e:
+                    # The pod's container is still being created
+                    if e.status != 400:
+                        raise e
+
+            time.sleep(self.retry_delay)
+
+        return (None, None)
+
+    def _pod(self, pods, followed, last):
+        # The newest pod created after the last followed pod that has not
+        # terminated. Falls back to the newest of these pods if they all have,
+        # in which case its logs are read to the end. Terminated pods are only
+        # followed first or once the job is done, as they would otherwise be
+        # followed in place of the pod that replaces them
+        pods = sorted(
+            [
+                pod for pod in pods
+                if pod.metadata.name not in followed
+                and (last == None or pod.metadata.creation_timestamp >= last.metadata.creation_timestamp)
+            ],
+            key=lambda pod: pod.metadata.creation_timestamp,
+            reverse=True
+        )
+        if len(pods) == 0:
+            return None
+
+        for pod in pods:
+            if pod.status.phase not in ["Succeeded", "Failed"]:
+                return pod
+
+        if last == None or self._job_done():
+            return pods[0]
+
+        return None
+
+    def _job_done(self):
+        # Without the batch api, the job is considered done once the logs of
+        # its first pod have been streamed
+        if self._batch_v1_api == None:
+            return True
+
+        try:
+            job = self._batch_v1_api.read_namespaced_job(self._job_name, self._namespace)
+        except ApiException as e:
+            # The job was deleted
+            if e.status == 404:
+                return True
+            raise e
+
+        return job_in_terminal_state(job)
+
+    def _write(self, chunk):
+        if self._file == None:
+            self._file = open(self.path, "ab")
+            self._size = self._file.tell()
+
+        self.bytes_streamed += len(chunk)
+        while len(chunk) > 0:
+            if self._size >= self.max_bytes and not self._rotate():
+                break
+
+            part = chunk[:self.max_bytes - self._size]
+            self._file.write(part)
+            self._size += len(part)
+            chunk = chunk[len(part):]
+
+        # Flushed so the logs can be tailed from the file as they arrive
+        self._file.flush()
+
+    def _rotate(self):
+        # Returns False if the logs are truncated instead
+        if self.backup_count < 1:
+            if not self.truncated:
+                self._file.write(self.TRUNCATED_MARKER)
+                self.truncated = True
+            return False
+
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.backup_path}.{i}"):
+                os.replace(f"{self.backup_path}.{i}", f"{self.backup_path}.{i + 1}")
+        os.replace(self.path, f"{self.backup_path}.1")
+
+        self._file = open(self.path, "wb")
+        self._size = 0
+        return True
+
+    def _close(self):
+        if self._file != None:
+            self._file.close()
+            self._file = None
@@ -1,4 +1,4 @@
-import os, base64, time, shutil, inspect, json
+import os, base64, shutil, inspect, json
 
 from kubernetes import client
 
@@ -8,6 +8,7 @@ from owe_python_sdk.constants import FUNCTION_TASK_RUNTIMES, STDERR, STDOUT
 from conf.constants import (
     WORKFLOW_NFS_SERVER,
     KUBERNETES_NAMESPACE,
+    KUBERNETES_JOB_LABELS,
     OWE_PYTHON_SDK_DIR,
 )
 from core.resources import JobResource
@@ -15,6 +16,7 @@ from utils import get_flavor
 from utils.k8s import flavor_to_k8s_resource_reqs, gen_resource_name
 from core.tasks import function_bootstrap
 from core.repositories import GitCacheRepository
+from errors import WorkflowTerminated
 
 
 class ContainerDetails:
@@ -52,12 +54,16 @@ class Function(TaskExecutor):
 
     def execute(self):
         job_name = gen_resource_name(prefix="fn")
-        # Prepares the file system for the Function task by clone 
-        # git repsoitories specified in the request
-        git_cache_repo = GitCacheRepository(cache_dir=self.task.exec_dir)
+        # Prepares the file system for the Function task by checking out the
+        # git repsoitories specified in the request from the git cache
+        git_cache_repo = GitCacheRepository()
         try:
             for repo in self.task.git_repositories:
-                git_cache_repo.add(repo.url, repo.directory, branch=repo.branch)
+                git_cache_repo.checkout(
+                    repo.url,
+                    os.path.join(self.task.exec_dir, repo.directory.lstrip("/")),
+                    branch=repo.branch
+                )
         except Exception as e:
             return self._task_result(1, errors=[str(e)])
         
@@ -67,7 +73,7 @@ class Function(TaskExecutor):
         # Job body
         body = client.V1Job(
             metadata=client.V1ObjectMeta(
-                labels=dict(job=job_name),
+                labels=dict(job=job_name, **KUBERNETES_JOB_LABELS),
                 name=job_name,
                 namespace=KUBERNETES_NAMESPACE,
             ),
@@ -120,18 +126,12 @@ class Function(TaskExecutor):
             return self._task_result(1, errors=[e])
 
         try:
-            while not self._job_in_terminal_state(job):
-                if self.terminating:
-                    self.ctx.logger.error("Workflow Terminated")
-                    self.cleanup(terminating=True)
-                    self._stderr("Workflow Terminated", "w")
-                    return self._task_result(2, errors=["Workflow Terminated"])
-
-                job = self.batch_v1_api.read_namespaced_job(
-                    job.metadata.name, KUBERNETES_NAMESPACE
-                )
-
-                time.sleep(self.polling_interval)
+            job = self._wait_for_job(job)
+        except WorkflowTerminated:
+            self.ctx.logger.error("Workflow Terminated")
+            self.cleanup(terminating=True)
+            self._stderr("Workflow Terminated", "w")
+            return self._task_result(2, errors=["Workflow Terminated"])
         except Exception as e:
             self.ctx.logger.error(str(e))
             self._stderr(str(e), "w")
@@ -1,9 +1,10 @@
-import time, logging
+import logging
 
-from kubernetes import client, watch # TODO watch.Watch?
+from kubernetes import client
 
 from conf.constants import (
     KUBERNETES_NAMESPACE,
+    KUBERNETES_JOB_LABELS,
     WORKFLOW_NFS_SERVER,
     KANIKO_IMAGE_URL,
     KANIKO_IMAGE_TAG
@@ -28,58 +29,31 @@ class Kaniko(BaseBuildExecutor):
     def execute(self):
         # Create the kaniko job. Return a failed task result on exception
         # with the error message as the str value of the exception
+        log_streamer = None
         try: 
             job = self._create_job()
-            # Poll the job status until the job is in a terminal state
-            while not self._job_in_terminal_state(job):
-                if self.terminating:
-                    raise WorkflowTerminated()
-                job = self.batch_v1_api.read_namespaced_job(
-                    job.metadata.name, KUBERNETES_NAMESPACE
-                )
-
-                time.sleep(self.polling_interval)
+            # Stream the logs(stdout) of this job's pod while it runs
+            log_streamer = self._stream_job_logs(job)
+            # Wait until the job is in a terminal state
+            job = self._wait_for_job(job)
         except WorkflowTerminated as e:
             # Log the Termination Error
             self.ctx.logger.error(str(e))
+            if log_streamer != None:
+                log_streamer.stop()
             self.cleanup(terminating=True)
             return self._task_result(2, errors=[e])
         except Exception as e:
             self.ctx.logger.error(str(e))
+            if log_streamer != None:
+                log_streamer.stop()
             return self._task_result(1, errors=[e])
 
-        # Get the job's pod name
-        pod_list = self.core_v1_api.list_namespaced_pod(
-            namespace=KUBERNETES_NAMESPACE,
-            label_selector=f"job-name={job.metadata.name}"
-        )
-
-        pod_name = pod_list.items[0].metadata.name
-
-        # Get the logs(stdout) from this job's pod
-        logs = None
-        try:
-            # for line in watch.stream(
-            #     self.core_v1_api.read_namespaced_pod_log,
-            #     name=pod_name,
-            #     namespace=KUBERNETES_NAMESPACE
-            # ):
-            #    self._stdout(line, flag="ab")
-
-            logs = self.core_v1_api.read_namespaced_pod_log(
-                name=pod_name,
-                namespace=KUBERNETES_NAMESPACE,
-                _return_http_data_only=True,
-                _preload_content=False,
-            ).data  # .decode("utf-8")
-            self._stdout(logs, flag="ab")
-
-        except client.rest.ApiException as e:
-            self.ctx.logger.error(f"Exception reading pod log: {e}")
-            return self._task_result(1, errors=[e])
-        except Exception as e:
-            self.ctx.logger.error(str(e))
-            return self._task_result(1, errors=[e])
+        # Wait for the remaining logs once the job's pod has exited
+        log_streamer.join()
+        if log_streamer.error != None:
+            self.ctx.logger.error(f"Exception reading pod log: {log_streamer.error}")
+            return self._task_result(1, errors=[log_streamer.error])
 
         # TODO Validate the jobs outputs against outputs in the task definition
 
@@ -175,7 +149,7 @@ class Kaniko(BaseBuildExecutor):
 
         # Job metadata
         metadata = client.V1ObjectMeta(
-            labels=dict(job=job_name),
+            labels=dict(job=job_name, **KUBERNETES_JOB_LABELS),
             name=job_name,
             namespace=KUBERNETES_NAMESPACE,
         )
@@ -1,4 +1,4 @@
-import time, logging
+import logging
 
 from kubernetes.client.rest import ApiException
 from kubernetes.client import (
@@ -12,7 +12,7 @@ from kubernetes.client import (
     V1ObjectMeta,
 )
 
-from conf.constants import KUBERNETES_NAMESPACE, WORKFLOW_NFS_SERVER
+from conf.constants import KUBERNETES_NAMESPACE, KUBERNETES_JOB_LABELS, WORKFLOW_NFS_SERVER
 from core.resources import JobResource
 from core.tasks.BaseBuildExecutor import BaseBuildExecutor
 from core.tasks.executors.builders.singularity.helpers.ContainerBuilder import container_builder
@@ -28,45 +28,29 @@ class Singularity(BaseBuildExecutor):
     def execute(self):
         # Create the kaniko job return a failed task result on exception
         # with the error message as the str value of the exception
+        log_streamer = None
         try: 
             job = self._create_job()
+
+            # Stream the logs(stdout) of this job's pod while it runs
+            log_streamer = self._stream_job_logs(job)
         
-            # Poll the job status until the job is in a terminal state
-            while not self._job_in_terminal_state(job):
-                if self.terminating:
-                    raise WorkflowTerminated()
-                job = self.batch_v1_api.read_namespaced_job(
-                    job.metadata.name, KUBERNETES_NAMESPACE
-                )
-
-                time.sleep(self.polling_interval)
+            # Wait until the job is in a terminal state
+            job = self._wait_for_job(job)
         except WorkflowTerminated as e:
+            if log_streamer != None:
+                log_streamer.stop()
             self.cleanup(terminating=True)
             return self._task_result(2, errors=[e])
         except ApiException as e:
+            if log_streamer != None:
+                log_streamer.stop()
             return self._task_result(1, errors=[str(e)])
 
-
-        # Get the job's pods name
-        pod_name = self.core_v1_api.list_namespaced_pod(
-            namespace=KUBERNETES_NAMESPACE,
-            label_selector=f"job-name={job.metadata.name}"
-        ).items[0].metadata.name
-        
-        # Get the logs(stdout) from this job's pod
-        logs = None
-        try:
-            logs = self.core_v1_api.read_namespaced_pod_log(
-                name=pod_name,
-                namespace=KUBERNETES_NAMESPACE,
-                _return_http_data_only=True,
-                _preload_content=False,
-            ).data  # .decode("utf-8")
-            # logging.debug(f"{logs}\n") # TODO Remove
-            self._stdout(logs)
-
-        except ApiException as e:
-            logging.exception(e)
+        # Wait for the remaining logs once the job's pod has exited
+        log_streamer.join()
+        if log_streamer.error != None:
+            logging.error(f"Exception reading pod log: {log_streamer.error}")
 
         # TODO Validate the jobs outputs against outputs in the task definition
 
@@ -143,7 +127,7 @@ class Singularity(BaseBuildExecutor):
 
         # Job metadata
         metadata = V1ObjectMeta(
-            labels=dict(job=job_name),
+            labels=dict(job=job_name, **KUBERNETES_JOB_LABELS),
             name=job_name,
             namespace=KUBERNETES_NAMESPACE,
         )
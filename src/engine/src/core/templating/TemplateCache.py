@@ -0,0 +1,51 @@
+from collections import OrderedDict
+from threading import Lock
+
+from conf.constants import TEMPLATE_CACHE_MAX_SIZE, RESOLVED_PIPELINE_CACHE_MAX_SIZE
+
+
+class TemplateCache:
+    """A least recently used cache of parsed templates shared by every workflow
+    executor. Each template is cached with the sha of the commit it was read
+    from, and is invalidated once the template's git ref points to another
+    commit. Also caches pipelines with their template applied"""
+    def __init__(self, max_size=TEMPLATE_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._templates = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, sha):
+        """Returns the template cached for the key at the commit, or None"""
+        with self._lock:
+            entry = self._templates.get(key, None)
+            if entry == None or entry[0] != sha:
+                self.misses += 1
+                return None
+
+            self._templates.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, sha, template):
+        with self._lock:
+            self._templates[key] = (sha, template)
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "size": len(self._templates),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+template_cache = TemplateCache()
+resolved_pipeline_cache = TemplateCache(max_size=RESOLVED_PIPELINE_CACHE_MAX_SIZE)
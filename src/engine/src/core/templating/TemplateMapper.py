@@ -1,6 +1,12 @@
+import copy, json, hashlib
+
 from typing import Union
 
+from pydantic import parse_obj_as
+
 from core.repositories import TemplateRepository
+from core.templating.TemplateCache import template_cache, resolved_pipeline_cache
+from conf.constants import GIT_CACHE_DIR
 from owe_python_sdk.schema import (
     Uses,
     Pipeline,
@@ -15,7 +21,12 @@ from owe_python_sdk.schema import (
 
 
 class TemplateMapper:
-    def __init__(self, cache_dir: str):
+    def __init__(
+        self,
+        cache_dir: str=GIT_CACHE_DIR,
+        cache=template_cache,
+        pipeline_cache=resolved_pipeline_cache
+    ):
         self.task_map_by_type = {
             "function": FunctionTask,
             "application": ApplicationTask,
@@ -25,6 +36,69 @@ class TemplateMapper:
             "tapis_actor": TapisActorTask
         }
         self.template_repo = TemplateRepository(cache_dir=cache_dir)
+        self.template_cache = cache
+        self.pipeline_cache = pipeline_cache
+        # The templates resolved by this mapper. A mapper is created per run,
+        # so each template is resolved once per run no matter how many tasks
+        # use it
+        self._templates = {}
+
+    def get_template(self, uses: Uses) -> dict:
+        """Returns a copy of the template of the uses. Templates are read from
+        the git cache only if the template cache has no template for the commit
+        the uses' branch points to"""
+        key = (uses.source.url, uses.source.branch, uses.name, uses.path)
+        if key not in self._templates:
+            sha = self.template_repo.get_sha(uses)
+            template = self.template_cache.get(key, sha)
+            if template == None:
+                template = self.template_repo.get_by_uses(uses, sha=sha)
+                self.template_cache.set(key, sha, template)
+
+            self._templates[key] = template
+
+        # The cached template is shared so it must never be modified
+        return copy.deepcopy(self._templates[key])
+
+    def resolve_pipeline(self, pipeline: Pipeline) -> Pipeline:
+        """Returns a copy of the pipeline with the template of its uses applied.
+        The tasks of the template that the pipeline does not define are added
+        to the pipeline's tasks.
+
+        Resolved pipelines are cached by the pipeline's uuid with the commit of
+        the template, so a pipeline is only resolved again once its template or
+        its own definition changes
+        """
+        definition = pipeline.dict(include=set(Pipeline.__fields__.keys()))
+        key = str(getattr(pipeline, "uuid", None) or pipeline.id)
+        try:
+            version = (
+                self.template_repo.get_sha(pipeline.uses),
+                hashlib.sha256(
+                    json.dumps(definition, sort_keys=True, default=str).encode("utf-8")
+                ).hexdigest()
+            )
+        except Exception as e:
+            raise Exception(f"Template mapping error: {e}")
+
+        resolved = self.pipeline_cache.get(key, version)
+        if resolved == None:
+            resolved = self.map(Pipeline(**definition), pipeline.uses)
+            template = self.get_template(pipeline.uses)
+
+            # Template tasks are mapped to their own templates with the rest of
+            # the pipeline's tasks
+            task_ids = [task.id for task in resolved.tasks]
+            resolved.tasks = resolved.tasks + [
+                parse_obj_as(Task, task)
+                for task in template.get("tasks", None) or []
+                if task.get("id", None) not in task_ids
+            ]
+
+            self.pipeline_cache.set(key, version, resolved)
+
+        # The cached pipeline is shared so it must never be modified
+        return copy.deepcopy(resolved)
 
     def map(
             self,
@@ -36,12 +110,13 @@ class TemplateMapper:
         
         IMPORTANT NOTE:
         The map target object is modified and returned by this function, not a
-        copy.
+        copy. Unless the template changes the class of the map target(template
+        tasks), in which case a new object is returned.
         """
 
         # Clone git repository specified on the pipeline.uses if exists
         try:
-            template = self.template_repo.get_by_uses(uses)
+            template = self.get_template(uses)
         except Exception as e:
             raise Exception(f"Template mapping error: {e}")
         
@@ -108,6 +183,11 @@ class TemplateMapper:
         # map target object
         new_obj = map_target_class(**tmp_obj)
 
+        # A template task becomes a task of the template's type, so it cannot be
+        # updated in place
+        if not isinstance(map_target, map_target_class):
+            return new_obj
+
         # Now update all of the properties to the map target object from the tmp
         # object.
         # NOTE this allows us to return the exact same object that was passed as
@@ -1 +1,2 @@
+from core.templating.TemplateCache import TemplateCache, template_cache, resolved_pipeline_cache
 from core.templating.TemplateMapper import TemplateMapper
\ No newline at end of file
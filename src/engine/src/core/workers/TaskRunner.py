@@ -0,0 +1,105 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+
+
+class TaskRunner:
+    """A bounded thread pool shared by every WorkflowExecutor of an engine
+    instance. Tasks are submitted with a key (the pipeline run uuid) and an
+    optional per-key limit. Tasks that would exceed the per-key limit are held
+    back in a per-key FIFO and dispatched to the pool as soon as another task
+    with the same key finishes, so they never occupy a pool thread while waiting.
+    """
+
+    def __init__(self, max_workers, max_queued=None):
+        self.max_workers = max_workers
+
+        # The number of tasks allowed to wait for a free thread before the runner
+        # reports itself as saturated
+        self.max_queued = max_queued if max_queued != None else max_workers
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="task-runner"
+        )
+
+        # Number of tasks currently executing and number of tasks waiting
+        # in the pool for a free thread
+        self._active = 0
+        self._queued = 0
+
+        # Tasks held back by their per-key limit
+        self._deferred = {}
+
+        # Number of tasks per key that are either queued or active
+        self._running = {}
+
+        self._lock = Lock()
+
+    def submit(self, key, fn, *args, limit=None, **kwargs) -> Future:
+        future = Future()
+        with self._lock:
+            running = self._running.get(key, 0)
+            if limit != None and limit > 0 and running >= limit:
+                self._deferred.setdefault(key, deque()).append(
+                    (future, fn, args, kwargs)
+                )
+                return future
+
+            self._running[key] = running + 1
+            self._dispatch(key, future, fn, args, kwargs)
+
+        return future
+
+    def saturated(self):
+        with self._lock:
+            return self._queued >= self.max_queued
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "deferred": sum([len(q) for q in self._deferred.values()]),
+                "utilization": self._active / self.max_workers,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _dispatch(self, key, future, fn, args, kwargs):
+        # NOTE Must be called while holding the lock
+        self._queued += 1
+        self._executor.submit(self._run, key, future, fn, args, kwargs)
+
+    def _run(self, key, future, fn, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._release(key)
+
+    def _release(self, key):
+        # NOTE Must be called while holding the lock. Dispatch the next task
+        # held back for this key in place of the one that just finished
+        deferred = self._deferred.get(key, None)
+        if deferred != None and len(deferred) > 0:
+            (future, fn, args, kwargs) = deferred.popleft()
+            if len(deferred) == 0:
+                del self._deferred[key]
+            self._dispatch(key, future, fn, args, kwargs)
+            return
+
+        self._running[key] -= 1
+        if self._running[key] == 0:
+            del self._running[key]
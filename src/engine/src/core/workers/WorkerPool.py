@@ -1,3 +1,5 @@
+import time
+
 from collections import deque
 from threading import Lock
 
@@ -6,77 +8,112 @@ from core.workers import Worker
 
 
 class WorkerPool:
+    """A pool of reusable workers. Workers are created lazily when none are
+    available, up to 'max_workers'. Idle workers are kept in a stack so the most
+    recently used workers are reused first, and the workers at the bottom of the
+    stack that have been idle for longer than 'idle_timeout' seconds are
+    discarded until only 'min_workers' remain.
+
+    Checking workers in and out is thread-safe and runs in constant time."""
+
     def __init__(
         self,
         worker_cls: Worker,
-        starting_worker_count,
+        starting_worker_count=0,
         max_workers=1000,
+        min_workers=0,
+        idle_timeout=None,
         worker_args=[],
         worker_kwargs={},
     ):
         self.max_workers = max_workers
-        # Double-ended queue. Like a list but better
+        self.min_workers = min(min_workers, max_workers)
+        self.idle_timeout = idle_timeout
+
+        # Double-ended queue of (worker, idle since) tuples. Workers are checked
+        # in and out at the right, so the longest idle workers are on the left
         self.pool = deque()
 
         # Generate the workers
         self.worker_cls = worker_cls
-        for i in range(starting_worker_count):
-            self.pool.append(worker_cls(*worker_args, _id=i, **worker_kwargs))
-            
-        self.checked_out = []
-        
+        self.worker_args = worker_args
+        self.worker_kwargs = worker_kwargs
+        now = time.monotonic()
+        for i in range(min(max(starting_worker_count, self.min_workers), max_workers)):
+            self.pool.append((worker_cls(*worker_args, _id=i, **worker_kwargs), now))
+
+        # Checked out workers by worker id
+        self.checked_out = {}
+
         # Pessimistic locking mechanism
         self.lock = Lock()
 
     def check_out(self):
         # To prevent other threads from checking out the same worker more than
         # once, we lock it down using the threading.Lock thread locker
-        self.lock.acquire()
-        
-        # Return a worker if one or more in the pool
-        if len(self.pool) > 0:
-            worker = self.pool.pop()
-            self.checked_out.append(worker)
-            # Release the lock
-            self.lock.release()
-            return worker
-
-        # Calculate the total number of workers
-        total_workers = len(self.checked_out) + len(self.pool)
-
-        # Create a new worker if there are no available workers and the 
-        # max worker limit has not yet been reached
-        if total_workers < self.max_workers:
-            worker = self.worker_cls()
-            self.checked_out.append(worker)
-            # Release the lock
-            self.lock.release()
-            return worker
-
-        # Release the lock
-        self.lock.release()
+        with self.lock:
+            # Discard the workers that have been idle for too long
+            self._shrink()
+
+            # Return a worker if one or more in the pool
+            if len(self.pool) > 0:
+                (worker, _) = self.pool.pop()
+                self.checked_out[worker.id] = worker
+                return worker
+
+            # Create a new worker if there are no available workers and the
+            # max worker limit has not yet been reached
+            if self.count() < self.max_workers:
+                worker = self.worker_cls(*self.worker_args, **self.worker_kwargs)
+                self.checked_out[worker.id] = worker
+                return worker
 
         # There are no more available workers
         raise NoAvailableWorkers(f"No available workers: Max Workers: {self.max_workers}")
 
     def check_in(self, worker):
-        if worker in self.checked_out:
-            self.checked_out.remove(worker)
-        
-        self.pool.appendleft(worker)
-        
-        if self.count() > self.max_workers:
-            self.pool.remove(worker)
-            raise WorkerLimitExceed(f"This WorkerPool has exceed the maximum allowable number of workers ({self.max_workers})")
+        with self.lock:
+            self.checked_out.pop(worker.id, None)
+
+            self.pool.append((worker, time.monotonic()))
+
+            if self.count() > self.max_workers:
+                self.pool.pop()
+                raise WorkerLimitExceed(f"This WorkerPool has exceed the maximum allowable number of workers ({self.max_workers})")
+
+    def shrink(self):
+        """Discards the workers that have been idle for longer than the idle
+        timeout. Returns the number of workers discarded"""
+        with self.lock:
+            return self._shrink()
+
+    def _shrink(self):
+        # NOTE Must be called while holding the lock
+        if self.idle_timeout == None:
+            return 0
+
+        discarded = 0
+        deadline = time.monotonic() - self.idle_timeout
+        while (
+            len(self.pool) > 0
+            and self.count() > self.min_workers
+            and self.pool[0][1] <= deadline
+        ):
+            self.pool.popleft()
+            discarded += 1
+
+        return discarded
 
     def count(self):
         return len(self.checked_out) + len(self.pool)
 
-    def get_all_running(self):
-        return self.checked_out
-        
-
+    def available(self):
+        """Number of workers that can still be checked out"""
+        return self.max_workers - len(self.checked_out)
 
+    def idle_count(self):
+        return len(self.pool)
 
-        
-        
+    def get_all_running(self):
+        with self.lock:
+            return list(self.checked_out.values())
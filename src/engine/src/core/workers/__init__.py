@@ -1,2 +1,3 @@
 from core.workers.Worker import Worker
-from core.workers.WorkerPool import WorkerPool
\ No newline at end of file
+from core.workers.WorkerPool import WorkerPool
+from core.workers.TaskRunner import TaskRunner
\ No newline at end of file
@@ -1,35 +1,24 @@
-class GraphValidator:
-    def __init__(self):
-        self.last_task = None
-        self.traversed_edges = []
-
-    def has_cycle(self, task_dependency_map, initial_tasks):
-        self.task_dependency_map = task_dependency_map
-        initial_task_ids = [initial_task.id for initial_task in initial_tasks]
-
-        for id in initial_task_ids:
-            if len(self.task_dependency_map[id]) > 0:
-                has_cycle = self.traverse(self.task_dependency_map[id][0], id)
-                if has_cycle:
-                    return True
-
-            # self.traversed_edges = [] # TODO reset traversed edges here?
-
-        return False
+from collections import deque
 
-    def traverse(self, to_vertex, from_vertex):
-        edge = f"{from_vertex}:{to_vertex}"
-        if edge in self.traversed_edges:
-            return True
 
-        self.traversed_edges.append(edge)
-
-        dependencies = self.task_dependency_map[to_vertex]
-        for dependency in dependencies:
-            has_cycle = self.traverse(dependency, to_vertex)
-            if has_cycle:
-                return True
-
-        # self.traversed_edges = [] # TODO reset traversed edges here?
-
-        return False
+class GraphValidator:
+    def has_cycle(self, task_dependency_map, initial_tasks):
+        """Detects cycles using Kahn's algorithm. Tasks are removed from the graph
+        once all of their parents have been removed. Any task that can never be
+        removed is part of (or depends on) a cycle. Runs in O(tasks + dependencies)."""
+        indegrees = {task_id: 0 for task_id in task_dependency_map}
+        for task_id in task_dependency_map:
+            for child_task_id in task_dependency_map[task_id]:
+                indegrees[child_task_id] += 1
+
+        queue = deque([initial_task.id for initial_task in initial_tasks])
+        visited = 0
+        while len(queue) > 0:
+            task_id = queue.popleft()
+            visited += 1
+            for child_task_id in task_dependency_map[task_id]:
+                indegrees[child_task_id] -= 1
+                if indegrees[child_task_id] == 0:
+                    queue.append(child_task_id)
+
+        return visited != len(task_dependency_map)
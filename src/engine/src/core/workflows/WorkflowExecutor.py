@@ -1,6 +1,7 @@
 import os, logging
 
-from threading import Thread, Lock
+from collections import deque
+from threading import Lock
 from uuid import uuid4
 from pathlib import Path
 
@@ -29,8 +30,13 @@ from errors.tasks import (
     ConditionalExpressionEvalError
 )
 from core.middleware.archivers import S3Archiver, IRODSArchiver
-from conf.constants import BASE_WORK_DIR
-from core.workers import Worker
+from conf.constants import (
+    BASE_WORK_DIR,
+    TASK_RUNNER_MAX_WORKERS,
+    TASK_RUNNER_MAX_QUEUED,
+    EVENT_EXCHANGE_FLUSH_TIMEOUT
+)
+from core.workers import Worker, TaskRunner
 from core.state import Hook, method_hook
 
 from core.workflows import params_validator
@@ -77,15 +83,27 @@ class WorkflowExecutor(Worker, EventPublisher):
     the Server is persitent, meaning that it is used throughout the lifetime
     of the Workflow Executor Server. After each run of a workflow, the
     WorkflowExecutor and its EventExchange are reset.
+
+    Tasks are not run in threads owned by the WorkflowExecutor. They are submitted
+    to a TaskRunner, a bounded thread pool that is shared by all of the
+    WorkflowExecutors of the Server.
     """
 
-    def __init__(self, _id=None, plugins=[]):
+    def __init__(self, _id=None, plugins=[], task_runner: TaskRunner=None):
         # Initialze the Worker class
         Worker.__init__(self, _id)
 
         # Set the plugins
         self._plugins = plugins
 
+        # The thread pool in which this WorkflowExecutor's tasks are executed
+        self._task_runner = task_runner
+        if self._task_runner == None:
+            self._task_runner = TaskRunner(
+                max_workers=TASK_RUNNER_MAX_WORKERS,
+                max_queued=TASK_RUNNER_MAX_QUEUED
+            )
+
         # Initializes the primary(and only)event exchange, enabling publishers
         # (the WorkflowExecutor and other Event producers) to publish Events to it,
         # triggering subscribers to handle those events. 
@@ -93,36 +111,27 @@ class WorkflowExecutor(Worker, EventPublisher):
             self,
             EventExchange(
                 config=ExchangeConfig(
-                    reset_on=[PIPELINE_COMPLETED, PIPELINE_FAILED, PIPELINE_TERMINATED]
+                    reset_on=[PIPELINE_COMPLETED, PIPELINE_FAILED, PIPELINE_TERMINATED],
+                    flush_timeout=EVENT_EXCHANGE_FLUSH_TIMEOUT
                 )
             )
         )
 
+        # Guards the indegree counters and the ready queue. Multiple task threads
+        # may reach a terminal state at the same time and resolve the same
+        # dependent tasks
+        self._scheduler_lock = Lock()
+
         container_factory = IOCContainerFactory()
         self.container = container_factory.build()
 
         self.state = self.container.load("ReactiveState")
-        self.state.set_initial_state({
-            "threads": [],
-            "terminated": False,
-            "terminating": False,
-            "failed": [],
-            "failures_permitted": [],
-            "succeeded": [],
-            "finished": [],
-            "skipped": [],
-            "queue": [],
-            "tasks": [],
-            "executors": {},
-            "dependency_graph": {},
-            "ready_tasks": [],
-            "ctx": None,
-        })
+        self.state.set_initial_state(self._new_run_state)
         self.state.register_hooks(
             [
                 Hook(
                     self._on_change_state,
-                    attrs=[] # No attrs means all state gets/sets triggers this hook
+                    attrs=["terminating"]
                 ),
                 # NOTE Not necessary to have this as a hook, but a good it's a good
                 # demonstration of how ReactiveState works. Move logic from 
@@ -142,11 +151,12 @@ class WorkflowExecutor(Worker, EventPublisher):
     def t_str(self, task, status): return f"{lbuf('[TASK]')} {self.state.ctx.idempotency_key} {status} {self.state.ctx.pipeline.id}.{task.id}"
 
     @interruptable()
-    def start(self, ctx, threads):
+    def start(self, ctx, futures):
         """This method is the entrypoint for a workflow exection. It's invoked
         by the main Server instance when a workflow submission is 
-        recieved"""
-        self.state.threads = threads
+        recieved. A future is appended to the futures list for every task
+        submitted to the task runner"""
+        self.state.futures = futures
 
         try:
             # Prepare the workflow executor, temporary results storage,
@@ -164,7 +174,7 @@ class WorkflowExecutor(Worker, EventPublisher):
                 return
 
             # Get the first tasks
-            unstarted_threads = self._fetch_ready_tasks()
+            ready_tasks = self._fetch_ready_tasks()
 
             # Log the pipeline status change
             self.state.ctx.logger.info(self.p_str("ACTIVE"))
@@ -172,8 +182,10 @@ class WorkflowExecutor(Worker, EventPublisher):
             # Publish the active event
             self.publish(Event(PIPELINE_ACTIVE, self.state.ctx))
             
-            # NOTE Triggers the hook _on_change_ready_task
-            self.state.ready_tasks += unstarted_threads
+            # NOTE Triggers the hook _on_change_ready_task. The hook empties
+            # ready_tasks, so the ready tasks are assigned rather than appended
+            # to a list that may be shared with other task threads
+            self.state.ready_tasks = ready_tasks
         except Exception as e:
             # Trigger the terminal state callback.
             self._on_pipeline_terminal_state(event=PIPELINE_FAILED, message=str(e))
@@ -187,7 +199,7 @@ class WorkflowExecutor(Worker, EventPublisher):
         # All subsequent references to the context should be made via 'self.state.ctx'
         self._set_context(ctx)
         
-        # Prepare the file system for this pipeline and handle pipeline templating
+        # Prepare the file system for this pipeline
         self._prepare_pipeline()
 
         # Publish the PIPELINE_STAGING event
@@ -198,6 +210,10 @@ class WorkflowExecutor(Worker, EventPublisher):
         # Setup the server and the pipeline run loggers
         self._setup_loggers()
 
+        # Apply the pipeline's template. Done once the loggers are set up so
+        # that a pipeline whose template cannot be resolved fails like any other
+        self._prepare_pipeline_template()
+
         # Prepare task objects and create the directory structure for task output and execution
         self._prepare_tasks()
 
@@ -226,7 +242,8 @@ class WorkflowExecutor(Worker, EventPublisher):
         and generates and registers the task executors that will be called to perform the
         work detailed in the task definition."""
         self.state.ctx.output = {}
-        for task in self.state.ctx.pipeline.tasks:
+
+        for (i, task) in enumerate(self.state.ctx.pipeline.tasks):
             self.state.ctx.logger.info(self.t_str(task, "STAGING"))
 
             # Publish the task active event
@@ -262,10 +279,10 @@ class WorkflowExecutor(Worker, EventPublisher):
             self._prepare_task_fs(task)
 
             # Fetch task templates
-            if task.uses != None:
-                template_mapper = TemplateMapper(cache_dir=self.state.ctx.pipeline.git_cache_dir)
+            if getattr(task, "uses", None) != None:
                 try:
-                    task = template_mapper.map(task, task.uses)
+                    task = self.state.template_mapper.map(task, task.uses)
+                    self.state.ctx.pipeline.tasks[i] = task
                 except Exception as e:
                     # Trigger the terminal state callback.
                     self._on_pipeline_terminal_state(event=PIPELINE_FAILED, message=str(e))
@@ -359,10 +376,10 @@ class WorkflowExecutor(Worker, EventPublisher):
                 task_result = TaskResult(1, errors=[str(e)])
 
         # Get the next queued tasks if any
-        unstarted_threads = self._on_task_terminal_state(task, task_result)
+        ready_tasks = self._on_task_terminal_state(task, task_result)
 
-        # NOTE Triggers hook _on_change_ready_task
-        self.state.ready_tasks += unstarted_threads
+        # NOTE Triggers hook _on_change_ready_task. See 'start' method
+        self.state.ready_tasks = ready_tasks
 
     @interruptable()
     def _on_task_terminal_state(self, task, task_result):
@@ -395,8 +412,9 @@ class WorkflowExecutor(Worker, EventPublisher):
             self._on_pipeline_terminal_state(event=PIPELINE_FAILED)
             return []
 
-        # Execute all possible queued tasks
-        return self._fetch_ready_tasks()
+        # Execute all tasks that became ready as a result of this task
+        # reaching a terminal state
+        return self._fetch_ready_tasks(finished_task=task)
 
     @interruptable()
     def _on_pipeline_terminal_state(self, event=None, message=""):
@@ -478,8 +496,8 @@ class WorkflowExecutor(Worker, EventPublisher):
     
     @interruptable()
     def _set_tasks(self, tasks):
-        # Create a list of the ids of the tasks
-        task_ids = [task.id for task in tasks]
+        # Create a set of the ids of the tasks
+        task_ids = {task.id for task in tasks}
 
         # Determine if there are any invalid dependencies (dependencies not
         # included in the tasks list)
@@ -503,60 +521,86 @@ class WorkflowExecutor(Worker, EventPublisher):
         if invalid_deps > 0:
             raise InvalidDependenciesError(invalid_deps_message)
 
+        tasks_by_id = {task.id: task for task in tasks}
         self.state.tasks = tasks
+        self.state.tasks_by_id = tasks_by_id
 
         # Build the dependency graph where the key is a task id and the value is
-        # an array of all the dependent tasks
-        self.state.dependency_graph = {task.id: [] for task in self.state.tasks}
-        for task in self.state.tasks:
-            for parent_task in task.depends_on:
-                self.state.dependency_graph[parent_task.id].append(task.id)
+        # an array of all the dependent tasks. The indegree of a task is the
+        # number of unique tasks it depends on. It is decremented each time one
+        # of those tasks reaches a terminal state, and the task is ready to run
+        # when it reaches 0
+        dependency_graph = {task.id: [] for task in tasks}
+        parent_can_fail_flags = {task.id: [] for task in tasks}
+        indegrees = {}
+        for task in tasks:
+            parent_task_ids = set()
+            for dep in task.depends_on:
+                if dep.id in parent_task_ids:
+                    continue
+                parent_task_ids.add(dep.id)
+                dependency_graph[dep.id].append(task.id)
+                parent_can_fail_flags[dep.id].append(dep.can_fail)
+
+            indegrees[task.id] = len(parent_task_ids)
+
+        self.state.dependency_graph = dependency_graph
 
         # Determine if a task can fail and set the tasks' can_fail flags.
         # A parent task is permitted to fail iff all of the following criteria are met:
         # - It has children
         # - All can_fail flags for a given parent task's children's task_dependency object == True 
         try:
-            for parent_task_id in self.state.dependency_graph:
-                parent_task = self._get_task_by_id(parent_task_id)
-                child_tasks = [
-                    self._get_task_by_id(child_task_id)
-                    for child_task_id
-                    in self.state.dependency_graph[parent_task_id]
-                ]
-                parent_can_fail_flags = []
-                for child_task in child_tasks:
-                    dep = next(filter(lambda dep: dep.id == parent_task_id, child_task.depends_on))
-                    parent_can_fail_flags.append(dep.can_fail)
+            for parent_task_id, can_fail_flags in parent_can_fail_flags.items():
+                parent_task = tasks_by_id[parent_task_id]
 
                 # If the length of can_fail_flags == 0, then this task has no child tasks
                 parent_task.can_fail = (
-                    False if len(parent_can_fail_flags) == 0
-                    else all(parent_can_fail_flags)
+                    False if len(can_fail_flags) == 0
+                    else all(can_fail_flags)
                 )
         except Exception as e:
             raise Exception(f"Error resolving can_fail flag for parent task '{parent_task_id}': {e}")
 
         # Detect loops in the graph
         try:
-            initial_tasks = self._get_initial_tasks(self.state.tasks)
+            initial_tasks = self._get_initial_tasks(tasks)
             graph_validator = self.container.load("GraphValidator")
-            if graph_validator.has_cycle(self.state.dependency_graph, initial_tasks):
+            if graph_validator.has_cycle(dependency_graph, initial_tasks):
                 raise CycleDetectedError("Cyclic dependencies detected")
         except (
             InvalidDependenciesError, CycleDetectedError, MissingInitialTasksError
         ) as e:
             raise e
 
-        # Add all tasks to the queue
-        self.state.queue = [ task for task in self.state.tasks ]
+        # Queue the initial tasks. All other tasks are queued when their
+        # indegree drops to 0
+        self.state.indegrees = indegrees
+        self.state.queue = deque(initial_tasks)
 
     @interruptable()
     def _prepare_pipeline(self):
         # Create all of the directories needed for the pipeline to run and persist results and cache
         self._prepare_pipeline_fs()
-            
-        # TODO Perform template mapping at the pipeline level here.
+
+    @interruptable()
+    def _prepare_pipeline_template(self):
+        """Applies the pipeline's template to the pipeline. Raises an exception
+        if the template cannot be resolved"""
+        # A single template mapper for the run so that the pipeline and the
+        # tasks that use the same template share the resolved template
+        self.state.template_mapper = TemplateMapper()
+
+        if getattr(self.state.ctx.pipeline, "uses", None) == None:
+            return
+
+        self.state.ctx.logger.debug(self.p_str("MAPPING PIPELINE TEMPLATE"))
+        resolved = self.state.template_mapper.resolve_pipeline(self.state.ctx.pipeline)
+
+        # NOTE The attributes are updated on the pipeline object of the context
+        # as it also holds the directories of the run
+        for attr in resolved.__fields__.keys():
+            setattr(self.state.ctx.pipeline, attr, getattr(resolved, attr))
 
     @interruptable()
     def _prepare_pipeline_fs(self):
@@ -633,48 +677,42 @@ class WorkflowExecutor(Worker, EventPublisher):
             )
 
     @interruptable()
-    def _fetch_ready_tasks(self):
-        ready_tasks = []
-        threads = []
-        for task in self.state.queue:
-            if self._task_is_ready(task):
-                ready_tasks.append(task)
-
-        for task in ready_tasks:
-            self._remove_from_queue(task)
-            t = Thread(
-                target=self._start_task,
-                args=(task,)
-            )
-            threads.append(t)
+    def _fetch_ready_tasks(self, finished_task=None):
+        """Returns every task in the ready queue. If a finished task is provided,
+        the tasks that depend on it are resolved first"""
+        if finished_task != None:
+            self._resolve_dependents(finished_task)
 
-        return threads
+        return self._drain_queue()
 
     @interruptable()
-    def _task_is_ready(self, task):
-        # All tasks without dependencies are ready immediately
-        if len(task.depends_on) == 0: return True
+    def _resolve_dependents(self, finished_task):
+        """Decrements the indegree of each task that depends on the finished task
+        and queues those that have no remaining unfinished dependencies. Runs in
+        O(out-degree) of the finished task."""
+        indegrees = self.state.indegrees
+        tasks_by_id = self.state.tasks_by_id
+        queue = self.state.queue
+        dependent_task_ids = self.state.dependency_graph.get(finished_task.id, [])
+        with self._scheduler_lock:
+            for task_id in dependent_task_ids:
+                indegrees[task_id] -= 1
+                if indegrees[task_id] == 0:
+                    queue.append(tasks_by_id[task_id])
 
-        for dep in task.depends_on:
-            dep_task = self._get_task_by_id(dep.id)
-            if dep_task == None:
-                raise Exception(f"Illegal dependency: Task with id '{dep.id}' doesn't exist")
-            
-            if dep_task.can_fail and dep_task.id in self.state.failed:
-                continue
+    @interruptable()
+    def _drain_queue(self):
+        queue = self.state.queue
+        ready_tasks = []
+        with self._scheduler_lock:
+            while len(queue) > 0:
+                ready_tasks.append(queue.popleft())
 
-            if dep_task.id not in self.state.finished:
-                return False
+        return ready_tasks
 
-        return True
-    
     @interruptable()
     def _get_task_by_id(self, task_id):
-        return next(filter(lambda t: t.id == task_id,self.state.tasks), None)
-
-    @interruptable()
-    def _remove_from_queue(self, task):
-        len(self.state.queue) == 0 or self.state.queue.pop(self.state.queue.index(task))
+        return self.state.tasks_by_id.get(task_id, None)
 
     @interruptable()
     def _register_executor(self, run_uuid, task, executor):
@@ -703,9 +741,8 @@ class WorkflowExecutor(Worker, EventPublisher):
         pass
     
     def terminate(self):
-        # NOTE SIDE EFFECT. Triggers the _on_terminate_hook in the
-        # reactive state. Will prevent all gets and sets to self.state
-        # thereafter
+        # NOTE SIDE EFFECT. Triggers the _on_change_state hook in the
+        # reactive state
         self.state.terminating = True
 
     def reset(self, terminated=False):
@@ -798,6 +835,30 @@ class WorkflowExecutor(Worker, EventPublisher):
             middleware.subscriptions
         )
 
+    def _new_run_state(self):
+        """Returns the reactive state of a new run. The state is built from scratch
+        for every run, so resetting the WorkflowExecutor never copies or traverses
+        the state of the previous run"""
+        return {
+            "futures": [],
+            "terminated": False,
+            "terminating": False,
+            "failed": [],
+            "failures_permitted": [],
+            "succeeded": [],
+            "finished": [],
+            "skipped": [],
+            "queue": deque(),
+            "tasks": [],
+            "tasks_by_id": {},
+            "indegrees": {},
+            "executors": {},
+            "dependency_graph": {},
+            "ready_tasks": [],
+            "ctx": None,
+            "template_mapper": None,
+        }
+
     def _set_initial_state(self):
         # Non-reactive state
         self.work_dir = None
@@ -813,9 +874,16 @@ class WorkflowExecutor(Worker, EventPublisher):
     # Hooks
     @method_hook
     def _on_change_ready_task(self, state):
-        for t in state.ready_tasks:
-            t.start()
-            state.threads.append(t)
+        # Submit the ready tasks to the task runner. The task runner will hold back
+        # tasks that exceed the pipeline's max_parallel_tasks
+        for task in state.ready_tasks:
+            future = self._task_runner.submit(
+                state.ctx.pipeline_run.uuid,
+                self._start_task,
+                task,
+                limit=state.ctx.pipeline.execution_profile.max_parallel_tasks
+            )
+            state.futures.append(future)
 
         # Remove the ready tasks
         state.ready_tasks = []
@@ -826,7 +894,7 @@ class WorkflowExecutor(Worker, EventPublisher):
         """Cleans up the resources and state of the WorkflowExecutor when terminated.
 
         This is invoked by the WorkflowExecutors ReactiveState object when the intercept 
-        condition is met, i.e. when the 'terminate' method changes 'self.state.terminated' 
+        condition is met, i.e. when the 'terminate' method changes 'self.state.terminating' 
         to True.
         """
         if not state.terminating or state.terminated:
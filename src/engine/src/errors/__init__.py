@@ -13,6 +13,9 @@ class NoAvailableWorkers(ApplicationError):
 class WorkerLimitExceed(ApplicationError):
     pass
 
+class TaskRunnerSaturated(ApplicationError):
+    pass
+
 class WorkflowTerminated(ApplicationError):
     def __init__(self, msg="Workflow Terminated"):
         ApplicationError.__init__(self, msg)
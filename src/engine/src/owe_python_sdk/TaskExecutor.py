@@ -1,5 +1,7 @@
 import os
 
+from concurrent.futures import TimeoutError
+
 from kubernetes import config, client
 from kubernetes.client.exceptions import ApiException
 
@@ -9,17 +11,30 @@ from owe_python_sdk.TaskResult import TaskResult
 from owe_python_sdk.TaskOutputFile import TaskOutputFile
 from owe_python_sdk.constants import STDERR, STDOUT
 from utils import lbuffer_str as lbuf
+from utils.k8s import job_failed, job_succeeded, job_in_terminal_state
 from core.resources import Resource, ResourceType
+from core.tasks.JobWatcher import job_watcher
+from core.tasks.PodLogStreamer import PodLogStreamer
+from core.polling import polling_strategy_factory
 from conf.constants import (
     DEFAULT_POLLING_INTERVAL,
+    MIN_POLLING_INTERVAL,
     KUBERNETES_NAMESPACE,
 )
+from errors import WorkflowTerminated
 
 
 TSTR = lbuf('[TASK]')
 
 class TaskExecutor(EventPublisher):
-    def __init__(self, task, ctx, exchange: EventExchange, plugins=[]):
+    def __init__(
+        self,
+        task,
+        ctx,
+        exchange: EventExchange,
+        plugins=[],
+        min_polling_interval=MIN_POLLING_INTERVAL
+    ):
         # Enabling task executors to publish events to the exchange. 
         EventPublisher.__init__(self, exchange)
         
@@ -39,28 +54,56 @@ class TaskExecutor(EventPublisher):
         self.core_v1_api = client.CoreV1Api()
         self.batch_v1_api = client.BatchV1Api()
 
-        # Set the polling interval for the task executor based on the
-        # the task max_exec_time
-        self._set_polling_interval(task)
+        # Set the strategy that determines the interval between polls of
+        # long-running jobs, e.g. Tapis jobs and actor executions
+        self.polling_strategy = polling_strategy_factory.build(
+            task,
+            self.ctx,
+            min_interval=min_polling_interval
+        )
 
-    def _set_polling_interval(self, task):
-        # Default is already the DEFAULT_POLLING_INTERVAL
-        if task.max_exec_time <= 0: return
-        
-        # TODO Replace line below.
-        # Calculate the interval based on the max_exec_time of the task
-        interval = self.polling_interval
+    def _wait_for_job(self, job):
+        """Blocks until the job reaches a terminal state and returns it. The status
+        of the job is pushed by the engine-wide job watcher. The polling interval
+        only determines how often the termination flag is checked. Raises
+        WorkflowTerminated if this task executor is terminated while waiting"""
+        future = job_watcher.watch(job.metadata.name)
+        try:
+            while True:
+                if self.terminating:
+                    raise WorkflowTerminated()
+                try:
+                    job = future.result(timeout=self.polling_interval)
+                    self.polling_strategy.complete()
+                    return job
+                except TimeoutError:
+                    continue
+        finally:
+            job_watcher.unwatch(job.metadata.name)
+
+    def _stream_job_logs(self, job):
+        """Starts streaming the logs of the job's pod to the task's stdout file
+        while the job runs. Rotated logs are kept in the task's work dir so they
+        are not reported as outputs of the task"""
+        streamer = PodLogStreamer(
+            self.core_v1_api,
+            job.metadata.name,
+            f"{self.task.output_dir}{STDOUT.lstrip('/')}",
+            batch_v1_api=self.batch_v1_api,
+            backup_dir=self.task.work_dir
+        )
+        streamer.start()
 
-        self.polling_interval = interval if interval >= 1 else self.polling_interval
+        return streamer
 
     def _job_in_terminal_state(self, job):
-        return (self._job_failed(job) or self._job_succeeded(job)) and job.status.active == None
+        return job_in_terminal_state(job)
 
     def _job_failed(self, job):
-        return type(job.status.failed) == int and job.status.failed > 0
+        return job_failed(job)
 
     def _job_succeeded(self, job):
-        return type(job.status.succeeded) == int and job.status.succeeded > 0
+        return job_succeeded(job)
 
     def _register_resource(self, resource: Resource):
         self._resources.append(resource)
@@ -1,74 +1,197 @@
-import logging
+import time, logging
 
 from typing import List, Union
-from threading import Lock
+from collections import deque
+from threading import Lock, Condition, Thread, current_thread
 
 from owe_python_sdk.events import EventHandler, Event
 from owe_python_sdk.events.ExchangeConfig import ExchangeConfig
 
 
+class Subscription:
+    """Delivers the events a subscriber is subscribed to in the order they were
+    published. The events are handled by the subscription's own worker thread
+    so a slow subscriber never holds back the publisher or other subscribers"""
+    def __init__(self, handler: EventHandler, events: List[str]):
+        self.handler = handler
+        self.events = set(events)
+        self.published = 0
+        self.handled = 0
+        self.failed = 0
+
+        self._queue = deque()
+        # The time at which the event being handled was published
+        self._handling = None
+        self._stopped = False
+        self._condition = Condition()
+        self._thread = None
+
+    def put(self, event: Event):
+        with self._condition:
+            self._queue.append((event, time.monotonic()))
+            self.published += 1
+            if self._thread == None:
+                self._thread = Thread(
+                    target=self._run,
+                    name=f"subscriber-{type(self.handler).__name__}",
+                    daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Blocks until every event put has been handled. Returns False if the
+        timeout expired first"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: len(self._queue) == 0 and self._handling == None,
+                timeout=timeout
+            )
+
+    def stop(self):
+        """Stops the worker once the events put have been handled"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def is_worker(self, thread):
+        return self._thread == thread
+
+    def metrics(self):
+        with self._condition:
+            oldest = self._handling
+            if len(self._queue) > 0 and oldest == None:
+                oldest = self._queue[0][1]
+
+            return {
+                "subscriber": type(self.handler).__name__,
+                "queued": len(self._queue),
+                "published": self.published,
+                "handled": self.handled,
+                "failed": self.failed,
+                # Seconds since the oldest event not yet handled was published
+                "lag": time.monotonic() - oldest if oldest != None else 0
+            }
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._queue) > 0 or self._stopped)
+                if len(self._queue) == 0:
+                    return
+                (event, self._handling) = self._queue.popleft()
+
+            failed = False
+            try:
+                self.handler.handle(event)
+            except Exception as exception:
+                failed = True
+                logging.error(f"EVENT EXCHANGE ERROR: {str(exception)}")
+
+            with self._condition:
+                self._handling = None
+                self.handled += 1
+                self.failed += int(failed)
+                self._condition.notify_all()
+
 class EventExchange:
+    """Delivers published events to the subscribers of the event types through
+    a Subscription per subscriber. Publishing never waits on a subscriber, except
+    for the events the exchange is configured to flush on. These wait until every
+    subscriber has handled every event published before them(e.g. so that the
+    archivers have finished before the run is cleaned up)"""
     def __init__(self, config: ExchangeConfig=None):
         # If no config is provided use the default exchange config
         if config == None:
             config = ExchangeConfig()
 
-        self._set_config(config)
-
         self.lock = Lock()
 
+        self._set_config(config)
+
     def add_subscribers(
         self,
         subscribers: Union[
-            EventHandler, 
+            EventHandler,
             List[EventHandler]
         ],
         events: List[str] = []
     ):
-        if type(subscribers) == List:
+        if type(subscribers) == list:
             for subscriber in subscribers:
-                self.add_subscriber(subscriber, events)
+                self._add_subscriber(subscriber, events)
             return
 
         self._add_subscriber(subscribers, events)
 
     def _add_subscriber(self, subscriber: EventHandler, events):
         key = id(subscriber)
-        
-        self.subscribers[key] = {
-            "handler": subscriber,
-            "events": events
-        }
+
+        with self.lock:
+            self.subscribers[key] = Subscription(subscriber, events)
 
     def publish(self, events: List[Event]):
         for e in events:
-            for key in self.subscribers:
-                # Ensure allow_once events are only handled once
-                self.lock.acquire()
-                if e.type in self._config.allow_once and {key: e.type} in self.handled_events:
-                    self.lock.release()
-                    return
-                self.handled_events.append({key: e.type})
-                self.lock.release()
+            with self.lock:
+                subscriptions = list(self.subscribers.items())
+                for (key, subscription) in subscriptions:
+                    if e.type not in subscription.events:
+                        continue
+
+                    # Ensure allow_once events are only handled once
+                    if e.type in self._config.allow_once:
+                        if (key, e.type) in self.handled_events:
+                            continue
+                        self.handled_events.add((key, e.type))
+
+                    subscription.put(e)
+
+            if e.type in self._config.flush_on:
+                self.flush(timeout=self._config.flush_timeout)
 
-                subscriber = self.subscribers[key]
-                if e.type in subscriber["events"]:
-                    try:
-                        subscriber["handler"].handle(e)
-                    except Exception as exception:
-                        logging.error(f"EVENT EXCHANGE ERROR: {str(exception)}")
+            # Reset on the configured reset event
+            if e.type in self._config.reset_on:
+                self.reset()
 
-        # Reset on the configured reset event
-        if e.type in self._config.reset_on:
-            self.reset()
+    def flush(self, timeout=None):
+        """Blocks until every subscriber has handled the events published so far.
+        Returns False if the timeout expired first"""
+        with self.lock:
+            subscriptions = list(self.subscribers.values())
+
+        # NOTE A subscriber that publishes an event that is flushed on cannot
+        # wait for itself
+        thread = current_thread()
+        if any([subscription.is_worker(thread) for subscription in subscriptions]):
+            return False
+
+        deadline = time.monotonic() + timeout if timeout != None else None
+        for subscription in subscriptions:
+            remaining = max(0, deadline - time.monotonic()) if deadline != None else None
+            if not subscription.flush(timeout=remaining):
+                logging.error(f"EVENT EXCHANGE ERROR: Timed out flushing events to subscriber '{type(subscription.handler).__name__}'")
+                return False
+
+        return True
+
+    def metrics(self):
+        """Returns the delivery metrics of each subscriber"""
+        with self.lock:
+            return [subscription.metrics() for subscription in self.subscribers.values()]
 
     def _set_config(self, config: ExchangeConfig):
         self._config = config
         self._set_initial_state()
 
     def reset(self):
-        self._set_initial_state()
+        with self.lock:
+            # The subscribers' workers exit once they have handled the events
+            # already published to them
+            for subscription in self.subscribers.values():
+                subscription.stop()
+
+            self._set_initial_state()
 
     def _set_initial_state(self):
         self.subscribers = {}
-        self.handled_events = []
\ No newline at end of file
+        self.handled_events = set()
@@ -12,7 +12,14 @@ class ExchangeConfig:
         # The allow once list will permit handling of specific events only once
         # per subscriber
         allow_once: List[str] = [PIPELINE_COMPLETED, PIPELINE_FAILED, PIPELINE_TERMINATED], # TODO Maybe remove terminated
-        reset_on: List[Union[str, int]] = [PIPELINE_COMPLETED, PIPELINE_FAILED, PIPELINE_TERMINATED]
+        reset_on: List[Union[str, int]] = [PIPELINE_COMPLETED, PIPELINE_FAILED, PIPELINE_TERMINATED],
+        # Publishing these events waits until the subscribers have handled all
+        # events published so far. Defaults to the reset_on events
+        flush_on: List[Union[str, int]] = None,
+        # The maximum number of seconds to wait for the subscribers when flushing
+        flush_timeout: float = None
     ):
         self.allow_once = [*allow_once]
-        self.reset_on = [*reset_on]
\ No newline at end of file
+        self.reset_on = [*reset_on]
+        self.flush_on = [*(flush_on if flush_on != None else reset_on)]
+        self.flush_timeout = flush_timeout
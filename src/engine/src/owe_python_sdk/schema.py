@@ -501,6 +501,7 @@ class BaseExecutionProfile(BaseModel):
 
 class PipelineExecutionProfile(BaseExecutionProfile):
     duplicate_submission_policy: str = EnumDuplicateSubmissionPolicy.Terminate
+    max_parallel_tasks: int = None # No limit other than the engine's task runner
 
 class TaskExecutionProfile(BaseExecutionProfile):
     flavor: EnumTaskFlavor = EnumTaskFlavor.C1_MED
@@ -0,0 +1,89 @@
+import os, io, tarfile, tempfile, unittest
+
+from types import SimpleNamespace
+
+from core.middleware.archivers import (
+    ArchiveManifest,
+    ArchiveUploader,
+    archive_items
+)
+from tests.fixtures.tapis import FakeFilesService
+
+
+class TestArchiveUploader(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.pipeline = SimpleNamespace(
+            work_dir=self.dir.name,
+            tasks=[SimpleNamespace(id=f"task{i}") for i in range(4)]
+        )
+        for task in self.pipeline.tasks:
+            output_dir = os.path.join(self.dir.name, task.id, "output")
+            os.makedirs(os.path.join(output_dir, "results", "nested"))
+            self.write(os.path.join(output_dir, ".stdout"), f"{task.id} stdout")
+            self.write(os.path.join(output_dir, "results", "a.csv"), "a")
+            self.write(os.path.join(output_dir, "results", "nested", "b.csv"), "b")
+
+        self.files = FakeFilesService(delay=0.01)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, path, contents):
+        with open(path, "w") as file:
+            file.write(contents)
+
+    def upload(self, path, destination, checksum):
+        with open(path, "rb") as blob:
+            self.files.insert(systemId="system", path=destination, file=blob)
+
+    def archive(self, manifest=None, workers=4):
+        uploader = ArchiveUploader(self.upload, manifest=manifest, workers=workers)
+        metrics = uploader.run(archive_items(self.pipeline, "/archive"))
+        return (uploader, metrics)
+
+    def testUploadsFilesAndDirectories(self):
+        (_, metrics) = self.archive()
+
+        self.assertEqual(metrics["uploaded"], 8)
+        self.assertEqual(metrics["failed"], 0)
+        self.assertGreater(metrics["bytes"], 0)
+        self.assertEqual(
+            self.files.files[("system", "/archive/task0/output/.stdout")],
+            b"task0 stdout"
+        )
+
+        # Directories are uploaded as a tarball
+        tarball = self.files.files[("system", "/archive/task0/output/results.tar.gz")]
+        with tarfile.open(fileobj=io.BytesIO(tarball), mode="r:gz") as archive:
+            self.assertEqual(
+                sorted(archive.getnames()),
+                ["results", "results/a.csv", "results/nested", "results/nested/b.csv"]
+            )
+
+    def testBoundedConcurrency(self):
+        self.archive(workers=3)
+        self.assertGreater(self.files.max_concurrent, 1)
+        self.assertLessEqual(self.files.max_concurrent, 3)
+
+    def testResumesWithManifest(self):
+        self.files.fail = set(["/archive/task1/output/.stdout"])
+        (uploader, metrics) = self.archive()
+        self.assertEqual(metrics["failed"], 1)
+
+        # Only the failed and changed outputs are uploaded again
+        self.write(os.path.join(self.dir.name, "task2", "output", "results", "a.csv"), "changed")
+        manifest = ArchiveManifest.loads(uploader.manifest.dumps())
+        (_, metrics) = self.archive(manifest=manifest)
+
+        self.assertEqual(metrics["uploaded"], 2)
+        self.assertEqual(metrics["skipped"], 6)
+        self.assertEqual(self.files.inserts, 10)
+
+    def testEmptyManifest(self):
+        self.assertEqual(ArchiveManifest.loads(b"").checksums, {})
+        self.assertEqual(ArchiveManifest.loads(None).checksums, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
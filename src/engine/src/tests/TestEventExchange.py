@@ -0,0 +1,119 @@
+import time, unittest
+
+from threading import Event as ThreadingEvent
+
+from owe_python_sdk.events import Event, EventHandler, EventExchange, ExchangeConfig
+from owe_python_sdk.events.types import (
+    PIPELINE_ACTIVE,
+    PIPELINE_COMPLETED,
+    TASK_ACTIVE,
+    TASK_COMPLETED
+)
+
+
+class Recorder(EventHandler):
+    def __init__(self, block=None, delay=0):
+        self.handled = []
+        self.block = block
+        self.delay = delay
+
+    def handle(self, event):
+        if self.block != None:
+            self.block.wait()
+        time.sleep(self.delay)
+        self.handled.append(event.payload)
+
+class Failing(EventHandler):
+    def handle(self, event):
+        raise Exception("failed")
+
+class TestEventExchange(unittest.TestCase):
+    def setUp(self):
+        self.exchange = EventExchange(config=ExchangeConfig(flush_timeout=5))
+        self.events = [PIPELINE_ACTIVE, PIPELINE_COMPLETED, TASK_ACTIVE, TASK_COMPLETED]
+
+    def tearDown(self):
+        self.exchange.reset()
+
+    def testOrdered(self):
+        subscriber = Recorder()
+        self.exchange.add_subscribers(subscriber, self.events)
+        for i in range(100):
+            self.exchange.publish([Event(TASK_ACTIVE, i)])
+
+        self.assertTrue(self.exchange.flush(timeout=5))
+        self.assertEqual(subscriber.handled, list(range(100)))
+
+    def testOnlySubscribedEvents(self):
+        subscriber = Recorder()
+        self.exchange.add_subscribers(subscriber, [TASK_COMPLETED])
+        self.exchange.publish([Event(TASK_ACTIVE, 0), Event(TASK_COMPLETED, 1)])
+
+        self.assertTrue(self.exchange.flush(timeout=5))
+        self.assertEqual(subscriber.handled, [1])
+
+    def testPublishNeverWaitsOnSubscribers(self):
+        block = ThreadingEvent()
+        slow = Recorder(block=block)
+        fast = Recorder()
+        self.exchange.add_subscribers([slow, fast], self.events)
+
+        start = time.perf_counter()
+        for i in range(10):
+            self.exchange.publish([Event(TASK_ACTIVE, i)])
+        elapsed = time.perf_counter() - start
+
+        # The slow subscriber does not hold back the publisher or the other
+        # subscribers
+        self.assertLess(elapsed, 1)
+        self.assertFalse(self.exchange.flush(timeout=0.2))
+        self.assertEqual(fast.handled, list(range(10)))
+        self.assertEqual(slow.handled, [])
+
+        metrics = self.exchange.metrics()
+        self.assertEqual([m["queued"] for m in metrics], [9, 0])
+        self.assertGreater(metrics[0]["lag"], 0)
+        self.assertEqual(metrics[1]["lag"], 0)
+
+        block.set()
+        self.assertTrue(self.exchange.flush(timeout=5))
+        self.assertEqual(slow.handled, list(range(10)))
+
+    def testAllowOncePerSubscriber(self):
+        first = Recorder()
+        second = Recorder()
+        self.exchange = EventExchange(
+            config=ExchangeConfig(allow_once=[TASK_COMPLETED], reset_on=[])
+        )
+        self.exchange.add_subscribers(first, self.events)
+        self.exchange.publish([Event(TASK_COMPLETED, 0)])
+        self.exchange.add_subscribers(second, self.events)
+        self.exchange.publish([Event(TASK_COMPLETED, 1), Event(TASK_ACTIVE, 2)])
+
+        self.assertTrue(self.exchange.flush(timeout=5))
+        self.assertEqual(first.handled, [0, 2])
+        self.assertEqual(second.handled, [1, 2])
+
+    def testFlushAndResetOnTerminalEvent(self):
+        subscriber = Recorder(delay=0.01)
+        self.exchange.add_subscribers(subscriber, self.events)
+        for i in range(5):
+            self.exchange.publish([Event(TASK_ACTIVE, i)])
+
+        # Returns once every pending event was handled
+        self.exchange.publish([Event(PIPELINE_COMPLETED, "completed")])
+        self.assertEqual(subscriber.handled, [0, 1, 2, 3, 4, "completed"])
+        self.assertEqual(self.exchange.subscribers, {})
+
+    def testFailingSubscriber(self):
+        subscriber = Recorder()
+        self.exchange.add_subscribers([Failing(), subscriber], self.events)
+        self.exchange.publish([Event(TASK_ACTIVE, 0), Event(TASK_ACTIVE, 1)])
+
+        self.assertTrue(self.exchange.flush(timeout=5))
+        self.assertEqual(subscriber.handled, [0, 1])
+        self.assertEqual([m["failed"] for m in self.exchange.metrics()], [2, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
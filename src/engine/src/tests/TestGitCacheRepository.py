@@ -0,0 +1,105 @@
+import os, json, shutil, tempfile, unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from core.repositories import GitCacheRepository, TemplateRepository
+from owe_python_sdk.schema import Uses
+from tests.fixtures.git import run_git, init_repo, commit
+
+
+class TestGitCacheRepository(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.tmp_dir, "source")
+        self.url = init_repo(self.source_dir)
+        self.sha = commit(self.source_dir, {"main.py": "v1\n", "lib/util.py": "util\n"})
+
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.work_dir = os.path.join(self.tmp_dir, "work")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def read(self, *path):
+        with open(os.path.join(self.work_dir, *path)) as file:
+            return file.read()
+
+    def testCheckout(self):
+        repo = GitCacheRepository(cache_dir=self.cache_dir)
+        repo.checkout(self.url, self.work_dir)
+
+        self.assertEqual(self.read("main.py"), "v1\n")
+        self.assertEqual(self.read("lib", "util.py"), "util\n")
+        self.assertEqual(repo.rev_parse(self.url), self.sha)
+        self.assertEqual(repo.read_file(self.url, "/main.py"), b"v1\n")
+        # One mirror per url
+        self.assertEqual(
+            [name for name in os.listdir(self.cache_dir) if name.endswith(".git")],
+            [os.path.basename(repo.mirror_dir(self.url))]
+        )
+
+    def testFetchedOnlyOnceStale(self):
+        fresh = GitCacheRepository(cache_dir=self.cache_dir, ttl=3600)
+        fresh.checkout(self.url, self.work_dir)
+        sha = commit(self.source_dir, {"main.py": "v2\n"})
+
+        # The mirror is fresh so the new commit is not fetched
+        self.assertEqual(fresh.rev_parse(self.url), self.sha)
+        self.assertEqual(fresh.read_file(self.url, "main.py"), b"v1\n")
+
+        stale = GitCacheRepository(cache_dir=self.cache_dir, ttl=0)
+        self.assertEqual(stale.rev_parse(self.url), sha)
+        stale.checkout(self.url, self.work_dir)
+        self.assertEqual(self.read("main.py"), "v2\n")
+
+    def testNewBranchFetched(self):
+        repo = GitCacheRepository(cache_dir=self.cache_dir, ttl=3600)
+        repo.checkout(self.url, self.work_dir)
+        run_git(self.source_dir, "checkout", "-q", "-b", "feature")
+        commit(self.source_dir, {"main.py": "feature\n"})
+
+        # Branches missing from a fresh mirror are fetched
+        repo.checkout(self.url, self.work_dir, branch="feature")
+        self.assertEqual(self.read("main.py"), "feature\n")
+        repo.checkout(self.url, self.work_dir, branch="main")
+        self.assertEqual(self.read("main.py"), "v1\n")
+
+    def testShallowAndPartial(self):
+        sha = commit(self.source_dir, {"main.py": "v2\n"})
+        repo = GitCacheRepository(
+            cache_dir=self.cache_dir,
+            depth=1,
+            filter="blob:none"
+        )
+        repo.checkout(self.url, self.work_dir)
+
+        self.assertEqual(self.read("main.py"), "v2\n")
+        self.assertEqual(repo.rev_parse(self.url), sha)
+        self.assertTrue(os.path.exists(os.path.join(repo.mirror_dir(self.url), "shallow")))
+
+    def testConcurrentCheckouts(self):
+        repo = GitCacheRepository(cache_dir=self.cache_dir)
+        directories = [os.path.join(self.work_dir, str(i)) for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda directory: repo.checkout(self.url, directory), directories))
+
+        for i in range(8):
+            self.assertEqual(self.read(str(i), "main.py"), "v1\n")
+
+    def testTemplateRepository(self):
+        commit(self.source_dir, {
+            "owe-config.json": json.dumps({"etl": {"path": "templates/etl.json"}}),
+            "templates/etl.json": json.dumps({"type": "function"})
+        })
+        templates = TemplateRepository(cache_dir=self.cache_dir)
+
+        self.assertEqual(
+            templates.get_by_uses(Uses(source={"url": self.url}, name="etl")),
+            {"type": "function"}
+        )
+        with self.assertRaises(Exception):
+            templates.get_by_uses(Uses(source={"url": self.url}, name="missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
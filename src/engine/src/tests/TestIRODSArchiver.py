@@ -0,0 +1,100 @@
+import os, logging, tempfile, unittest
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from core.middleware.archivers import IRODSArchiver, checksum
+from errors.archives import ArchiveError
+from tests.fixtures.irods import FakeIRODSSession
+
+
+class LocalIRODSArchiver(IRODSArchiver):
+    def __init__(self, session):
+        self.session = session
+
+    def _get_session(self, archive, zone):
+        return self.session
+
+class TestIRODSArchiver(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.pipeline = SimpleNamespace(
+            id="pipeline",
+            work_dir=os.path.join(self.dir.name, "run"),
+            tasks=[SimpleNamespace(id="build"), SimpleNamespace(id="test")]
+        )
+        for task in self.pipeline.tasks:
+            output_dir = os.path.join(self.pipeline.work_dir, task.id, "output")
+            os.makedirs(os.path.join(output_dir, "reports"))
+            self.write(os.path.join(output_dir, ".stdout"), f"{task.id} stdout")
+            self.write(os.path.join(output_dir, "reports", "report.txt"), "report")
+
+        self.archive = SimpleNamespace(
+            id="results",
+            host="localhost",
+            port="1247",
+            zone="tempZone",
+            credentials=SimpleNamespace(user="alice", password="password")
+        )
+        self.session = FakeIRODSSession()
+        self.archiver = LocalIRODSArchiver(self.session)
+        self.logger = logging.getLogger("test")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, path, contents):
+        with open(path, "w") as file:
+            file.write(contents)
+
+    def path(self, task_id, filename):
+        work_dir = self.pipeline.work_dir.strip("/")
+        return f"/tempZone/home/alice/{work_dir}/{task_id}/output/{filename}"
+
+    @patch("core.middleware.archivers.IRODSArchiver.IRODS_TRANSFER_THREADS", 3)
+    def testUploadsWithChecksums(self):
+        self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+
+        # The output collection of each task is created
+        self.assertTrue(set([
+            os.path.dirname(self.path(task_id, ".stdout")) for task_id in ["build", "test"]
+        ]).issubset(self.session.collections_created))
+
+        self.assertEqual(len(self.session.puts), 4)
+        self.assertTrue(all([num_threads == 3 for (_, num_threads) in self.session.puts]))
+        stdout = self.session.objects[self.path("build", ".stdout")]
+        self.assertEqual(stdout.body, b"build stdout")
+        self.assertEqual(
+            stdout.metadata.get_one("sha256").value,
+            checksum(os.path.join(self.pipeline.work_dir, "build", "output", ".stdout"))
+        )
+        self.assertIn(self.path("test", "reports.tar.gz"), self.session.objects)
+        self.assertTrue(self.session.cleaned_up)
+
+    def testSkipsUnchangedObjects(self):
+        self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+        self.write(os.path.join(self.pipeline.work_dir, "test", "output", "reports", "report.txt"), "changed")
+        self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+
+        # Only the changed directory is uploaded again
+        self.assertEqual(len(self.session.puts), 5)
+        self.assertEqual(self.session.puts[-1][0], self.path("test", "reports.tar.gz"))
+
+    def testArchiveDir(self):
+        self.archive.archive_dir = "/tempZone/projects/results"
+        self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+
+        work_dir = self.pipeline.work_dir.strip("/")
+        self.assertIn(
+            f"/tempZone/projects/results/{work_dir}/build/output/.stdout",
+            self.session.objects
+        )
+
+    def testRequiresCredentials(self):
+        self.archive.credentials = None
+        with self.assertRaises(ArchiveError):
+            self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+
+
+if __name__ == "__main__":
+    unittest.main()
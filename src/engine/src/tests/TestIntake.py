@@ -0,0 +1,130 @@
+import time, unittest
+
+from threading import Thread
+
+from core.intake import Intake
+from conf.constants import (
+    INBOUND_EXCHANGE,
+    INBOUND_QUEUE,
+    RETRY_QUEUE,
+    DEAD_LETTER_QUEUE,
+)
+from tests.fixtures.amqp import FakeBroker, FakeConnection
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError()
+        time.sleep(0.001)
+
+class TestIntake(unittest.TestCase):
+    def setUp(self):
+        self.broker = FakeBroker()
+        self.connection = FakeConnection(self.broker)
+        self.received = []
+        self.intake = None
+        self.thread = None
+
+    def tearDown(self):
+        if self.intake != None:
+            self.intake.stop()
+        if self.thread != None:
+            self.thread.join()
+
+    def start(self, prefetch=1, consumers=1, on_message=None):
+        def receive(channel, method, properties, body):
+            self.received.append((channel, method.delivery_tag, properties, body))
+
+        self.intake = Intake(
+            self.connection,
+            on_message or receive,
+            consumers=consumers,
+            retry_delay=10
+        )
+        self.intake.declare()
+        self.thread = Thread(target=self.intake.start, kwargs={"prefetch": prefetch})
+        self.thread.start()
+
+    def unacked(self):
+        return sum([len(channel.unacked) for channel in self.connection.channels])
+
+    def testDeclare(self):
+        self.start()
+        self.assertEqual(
+            self.broker.queues[RETRY_QUEUE]["arguments"],
+            {"x-message-ttl": 10000, "x-dead-letter-exchange": INBOUND_EXCHANGE}
+        )
+        self.assertIn(DEAD_LETTER_QUEUE, self.broker.queues)
+        # Retried submissions outlive the engine's connection
+        self.assertFalse(self.broker.queues[RETRY_QUEUE]["exclusive"])
+
+    def testAck(self):
+        self.start()
+        self.broker.publish(INBOUND_EXCHANGE, b"1")
+        wait_until(lambda: len(self.received) == 1)
+
+        (channel, tag, _, _) = self.received[0]
+        self.intake.ack(channel, tag)
+        wait_until(lambda: self.unacked() == 0)
+
+    def testPrefetch(self):
+        self.start(prefetch=2)
+        for i in range(5):
+            self.broker.publish(INBOUND_EXCHANGE, str(i).encode())
+
+        wait_until(lambda: len(self.received) == 2)
+        time.sleep(0.05)
+        self.assertEqual(len(self.received), 2)
+
+        # More workers became free
+        self.intake.set_prefetch(4)
+        wait_until(lambda: len(self.received) == 4)
+
+    def testMultipleConsumers(self):
+        self.start(prefetch=3, consumers=3)
+        for i in range(3):
+            self.broker.publish(INBOUND_EXCHANGE, str(i).encode())
+
+        wait_until(lambda: len(self.received) == 3)
+        self.assertEqual(len(set([channel for (channel, _, _, _) in self.received])), 3)
+
+    def testRetry(self):
+        self.start(prefetch=2)
+        self.broker.publish(INBOUND_EXCHANGE, b"retried")
+        self.broker.publish(INBOUND_EXCHANGE, b"acked")
+        wait_until(lambda: len(self.received) == 2)
+
+        # Retrying a message does not delay the ack of other messages
+        (channel, tag, properties, body) = self.received[0]
+        self.intake.retry(channel, tag, body, properties)
+        self.intake.ack(self.received[1][0], self.received[1][1])
+        wait_until(lambda: self.unacked() == 0)
+        self.assertEqual(self.broker.messages(RETRY_QUEUE), [b"retried"])
+
+        # Redelivered once the retry delay elapses
+        self.broker.expire(RETRY_QUEUE)
+        wait_until(lambda: len(self.received) == 3)
+        self.assertEqual(self.received[2][3], b"retried")
+
+    def testResubmit(self):
+        self.start()
+        wait_until(lambda: len(self.intake.channels) == 1)
+        self.intake.resubmit(b"deferred")
+        wait_until(lambda: len(self.received) == 1)
+        self.assertEqual(self.received[0][3], b"deferred")
+
+    def testReject(self):
+        self.start()
+        self.broker.publish(INBOUND_EXCHANGE, b"invalid")
+        wait_until(lambda: len(self.received) == 1)
+
+        (channel, tag, _, _) = self.received[0]
+        self.intake.reject(channel, tag)
+        wait_until(lambda: self.broker.messages(DEAD_LETTER_QUEUE) == [b"invalid"])
+        self.assertEqual(self.broker.messages(INBOUND_QUEUE), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
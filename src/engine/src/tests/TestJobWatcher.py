@@ -0,0 +1,75 @@
+import unittest
+
+from core.tasks.JobWatcher import JobWatcher
+from errors import TaskExecutionError
+from tests.fixtures.kubernetes import job, FakeBatchV1Api, FakeWatch
+
+
+class TestJobWatcher(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeBatchV1Api()
+        FakeWatch.api = self.api
+        self.watcher = JobWatcher(
+            batch_v1_api=self.api,
+            namespace="test",
+            watch_cls=FakeWatch
+        )
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.api.update(job("stop"))
+
+    def testResolvesOnTerminalState(self):
+        self.api.update(job("job-1"))
+        future = self.watcher.watch("job-1")
+        self.assertFalse(future.done())
+
+        self.api.update(job("job-1", active=None, succeeded=1))
+        self.assertEqual(future.result(timeout=5).status.succeeded, 1)
+
+    def testResolvesAlreadyFinishedJob(self):
+        self.api.update(job("job-1", active=None, failed=1))
+        future = self.watcher.watch("job-1")
+        self.assertEqual(future.result(timeout=5).status.failed, 1)
+
+    def testFailsOnDeletedJob(self):
+        self.api.update(job("job-1"))
+        future = self.watcher.watch("job-1")
+
+        self.api.delete("job-1")
+        with self.assertRaises(TaskExecutionError):
+            future.result(timeout=5)
+
+    def testFailsOnJobMissingFromRelist(self):
+        self.api.update(job("job-1"))
+        future = self.watcher.watch("job-1")
+        # Wait for the stream before the deletion is missed
+        self.api.update(job("job-2", active=None, succeeded=1))
+        self.watcher.watch("job-2").result(timeout=5)
+
+        # The job is deleted while the stream is down
+        del self.api.jobs["job-1"]
+        for stream in self.api.streams:
+            stream.put({"type": "ERROR", "object": None})
+
+        with self.assertRaises(TaskExecutionError):
+            future.result(timeout=5)
+
+    def testSingleStreamForManyJobs(self):
+        futures = {}
+        for i in range(100):
+            self.api.update(job(f"job-{i}"))
+            futures[i] = self.watcher.watch(f"job-{i}")
+
+        for i in range(100):
+            self.api.update(job(f"job-{i}", active=None, succeeded=1))
+
+        for future in futures.values():
+            future.result(timeout=5)
+
+        # One read per watched job and a single watch stream. No polling
+        self.assertEqual(self.api.calls["read"], 100)
+        self.assertEqual(len(self.api.streams), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import time, unittest
+
+from threading import Event, Lock
+
+from core.notifications import NotificationQueue
+
+
+class Recorder:
+    """A sender that records every batch it is sent"""
+    def __init__(self, fail=0, block=None):
+        self.batches = []
+        self.fail = fail
+        self.block = block
+        self.lock = Lock()
+
+    def __call__(self, payloads):
+        if self.block != None:
+            self.block.wait()
+
+        with self.lock:
+            if self.fail > 0:
+                self.fail -= 1
+                # Send the first payload before failing
+                self.batches.append([payloads.pop(0)])
+                raise Exception("failed")
+
+            self.batches.append(list(payloads))
+
+    def payloads(self):
+        return [payload for batch in self.batches for payload in batch]
+
+class TestNotificationQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = NotificationQueue(
+            max_size=100,
+            batch_size=10,
+            workers=4,
+            max_retries=2,
+            retry_delay=0
+        )
+
+    def testOrderAndBatching(self):
+        # Hold the channel until every notification has been queued
+        block = Event()
+        self.queue.put("run", Recorder(block=block), "staging")
+        creates = Recorder()
+        updates = Recorder()
+        for i in range(15):
+            self.queue.put("run", creates, i)
+        for i in range(3):
+            self.queue.put("run", updates, i)
+        block.set()
+
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertEqual(creates.payloads(), list(range(15)))
+        self.assertEqual([len(batch) for batch in creates.batches], [10, 5])
+        self.assertEqual(updates.batches, [[0, 1, 2]])
+
+    def testCoalesce(self):
+        block = Event()
+        sender = Recorder(block=block)
+
+        # The first notification is being sent and can no longer be coalesced
+        self.queue.put("run", sender, "task1.staging", key="task1")
+        time.sleep(0.05)
+        self.queue.put("run", sender, "task1.active", key="task1")
+        self.queue.put("run", sender, "task2.active", key="task2")
+        self.queue.put("run", sender, "task1.completed", key="task1")
+        block.set()
+
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertEqual(
+            sender.payloads(),
+            ["task1.staging", "task1.completed", "task2.active"]
+        )
+        self.assertEqual(self.queue.metrics()["coalesced"], 1)
+
+    def testRetry(self):
+        sender = Recorder(fail=2)
+        for i in range(3):
+            self.queue.put("run", sender, i)
+
+        # The payloads sent before each failure are not resent
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertEqual(sender.payloads(), [0, 1, 2])
+        self.assertEqual(self.queue.metrics()["sent"], 3)
+
+    def testDropAfterMaxRetries(self):
+        def fail(payloads): raise Exception("failed")
+        self.queue.put("run", fail, 0)
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertEqual(self.queue.metrics()["dropped"], 1)
+
+    def testPutNeverBlocks(self):
+        block = Event()
+        sender = Recorder(block=block)
+        queue = NotificationQueue(max_size=5, workers=1, retry_delay=0)
+
+        start = time.perf_counter()
+        results = [queue.put(f"run{i}", sender, i) for i in range(10)]
+        elapsed = time.perf_counter() - start
+        block.set()
+
+        # The queue is full while the sender is blocked. Notifications are
+        # dropped rather than blocking the caller
+        self.assertLess(elapsed, 1)
+        self.assertEqual(results.count(False), 5)
+        self.assertTrue(queue.flush(timeout=5))
+
+    def testCriticalNeverDropped(self):
+        block = Event()
+        sender = Recorder(block=block)
+        queue = NotificationQueue(max_size=2, workers=1, retry_delay=0)
+        for i in range(2):
+            queue.put("run", sender, i)
+
+        self.assertFalse(queue.put("run", sender, "active"))
+        self.assertTrue(queue.put("run", sender, "completed", critical=True))
+        block.set()
+
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(sender.payloads(), [0, 1, "completed"])
+
+    def testCriticalRetriedPastMaxRetries(self):
+        failures = [5]
+        sent = []
+        def sender(payloads):
+            if failures[0] > 0:
+                failures[0] -= 1
+                raise Exception("failed")
+            sent.extend(payloads)
+        queue = NotificationQueue(workers=1, max_retries=2, retry_delay=0, max_retry_delay=0.01)
+        queue.put("run", sender, "active")
+        queue.put("run", sender, "completed", critical=True)
+
+        # The critical notification outlives the max retries of its batch
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(sent, ["completed"])
+        self.assertEqual(queue.metrics()["dropped"], 1)
+        self.assertEqual(queue.metrics()["queued"], 0)
+
+    def testRetryDoesNotHoldWorker(self):
+        queue = NotificationQueue(workers=1, max_retries=1, retry_delay=0.5)
+        failing = Recorder(fail=1)
+        sender = Recorder()
+        queue.put("run1", failing, 0)
+        queue.put("run1", failing, 1)
+        time.sleep(0.1)
+        queue.put("run2", sender, 0)
+
+        # The only worker sends the other channel while the failed batch waits
+        # out its retry delay
+        time.sleep(0.2)
+        self.assertEqual(sender.payloads(), [0])
+        self.assertEqual(failing.payloads(), [0])
+
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(failing.payloads(), [0, 1])
+        self.assertEqual(queue.metrics()["sent"], 3)
+
+    def testChannelsSentConcurrently(self):
+        block = Event()
+        blocked = Recorder(block=block)
+        sender = Recorder()
+        self.queue.put("run1", blocked, 0)
+        self.queue.put("run2", sender, 0)
+
+        # A slow channel does not hold back other channels
+        self.assertFalse(self.queue.flush(timeout=0.2))
+        self.assertEqual(sender.payloads(), [0])
+        block.set()
+        self.assertTrue(self.queue.flush(timeout=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
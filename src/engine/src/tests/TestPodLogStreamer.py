@@ -0,0 +1,164 @@
+import os, time, unittest, tempfile
+
+from threading import Event
+
+from core.tasks.PodLogStreamer import PodLogStreamer
+from tests.fixtures.kubernetes import FakeCoreV1Api, FakeBatchV1Api, FakeLogResponse, pod, job
+
+
+class TestPodLogStreamer(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, ".stdout")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def streamer(self, api, **kwargs):
+        return PodLogStreamer(api, "job", self.path, namespace="test", retry_delay=0.01, **kwargs)
+
+    def read(self, path=None):
+        with open(path or self.path, "rb") as file:
+            return file.read()
+
+    def testStreamsToFile(self):
+        response = FakeLogResponse([b"line 1\n", b"line 2\n"])
+        streamer = self.streamer(FakeCoreV1Api(response, pending=2))
+        streamer.start()
+
+        self.assertTrue(streamer.join(timeout=5))
+        self.assertIsNone(streamer.error)
+        self.assertEqual(self.read(), b"line 1\nline 2\n")
+        self.assertTrue(response.released)
+
+    def testLogsAvailableWhileRunning(self):
+        block = Event()
+        streamer = self.streamer(FakeCoreV1Api(FakeLogResponse([b"building\n"], block=block)))
+        streamer.start()
+
+        # The logs can be tailed before the job ends
+        for _ in range(500):
+            if os.path.exists(self.path) and self.read() == b"building\n":
+                break
+            block.wait(0.01)
+        self.assertEqual(self.read(), b"building\n")
+
+        block.set()
+        self.assertTrue(streamer.join(timeout=5))
+
+    def testRotation(self):
+        response = FakeLogResponse([b"0123456789", b"abcdefghij", b"ABCDE"])
+        streamer = self.streamer(FakeCoreV1Api(response), max_bytes=8, backup_count=2)
+        streamer.start()
+
+        self.assertTrue(streamer.join(timeout=5))
+        # The oldest logs are dropped past the backup count
+        self.assertEqual(self.read(), b"E")
+        self.assertEqual(self.read(f"{self.path}.1"), b"ghijABCD")
+        self.assertEqual(self.read(f"{self.path}.2"), b"89abcdef")
+        self.assertFalse(os.path.exists(f"{self.path}.3"))
+        self.assertEqual(streamer.bytes_streamed, 25)
+
+    def testRotatedOutsideOutputDir(self):
+        output_dir = os.path.join(self.dir.name, "output")
+        os.mkdir(output_dir)
+        path = os.path.join(output_dir, ".stdout")
+        response = FakeLogResponse([b"0123456789"])
+        streamer = PodLogStreamer(
+            FakeCoreV1Api(response),
+            "job",
+            path,
+            backup_dir=self.dir.name,
+            namespace="test",
+            max_bytes=8,
+            backup_count=1
+        )
+        streamer.start()
+
+        self.assertTrue(streamer.join(timeout=5))
+        # Only the current logs are in the output dir
+        self.assertEqual(os.listdir(output_dir), [".stdout"])
+        self.assertEqual(self.read(path), b"89")
+        self.assertEqual(self.read(os.path.join(self.dir.name, ".stdout.1")), b"01234567")
+
+    def testFollowsNewestActivePod(self):
+        api = FakeCoreV1Api(
+            FakeLogResponse([b"retry\n"]),
+            pods=[
+                pod("job-failed", phase="Failed", created=1),
+                pod("job-retry", phase="Running", created=2),
+                pod("job-first", phase="Failed", created=0)
+            ]
+        )
+        streamer = self.streamer(api)
+        streamer.start()
+
+        self.assertTrue(streamer.join(timeout=5))
+        self.assertEqual(api.logs_read, ["job-retry"])
+
+        # The newest pod is followed once they have all terminated
+        api = FakeCoreV1Api(
+            FakeLogResponse([b"done\n"]),
+            pods=[pod("job-first", phase="Failed", created=0), pod("job-last", phase="Succeeded", created=1)]
+        )
+        streamer = self.streamer(api)
+        streamer.start()
+
+        self.assertTrue(streamer.join(timeout=5))
+        self.assertEqual(api.logs_read, ["job-last"])
+
+    def testFollowsRetryPods(self):
+        batch_v1_api = FakeBatchV1Api()
+        batch_v1_api.update(job("job"))
+        block = Event()
+        api = FakeCoreV1Api(
+            {
+                "job-1": FakeLogResponse([b"attempt 1\n"], block=block),
+                "job-2": FakeLogResponse([b"attempt 2\n"])
+            },
+            pods=[pod("job-1", created=0)]
+        )
+        streamer = self.streamer(api, batch_v1_api=batch_v1_api)
+        streamer.start()
+
+        for _ in range(500):
+            if os.path.exists(self.path) and self.read() == b"attempt 1\n":
+                break
+            block.wait(0.01)
+
+        # The first pod fails and the job retries it in a new pod
+        api.pods = [pod("job-1", phase="Failed", created=0)]
+        block.set()
+        time.sleep(0.05)
+        api.pods = [pod("job-1", phase="Failed", created=0), pod("job-2", created=1)]
+        time.sleep(0.05)
+        batch_v1_api.update(job("job", active=None, succeeded=1))
+
+        self.assertTrue(streamer.join(timeout=5))
+        self.assertIsNone(streamer.error)
+        self.assertEqual(api.logs_read, ["job-1", "job-2"])
+        self.assertEqual(self.read(), b"attempt 1\nattempt 2\n")
+
+    def testTruncation(self):
+        response = FakeLogResponse([b"0123456789", b"abcdefghij"])
+        streamer = self.streamer(FakeCoreV1Api(response), max_bytes=12, backup_count=0)
+        streamer.start()
+
+        self.assertTrue(streamer.join(timeout=5))
+        self.assertEqual(self.read(), b"0123456789ab" + PodLogStreamer.TRUNCATED_MARKER)
+        self.assertTrue(streamer.truncated)
+
+    def testStop(self):
+        response = FakeLogResponse([b"partial\n"], block=Event())
+        streamer = self.streamer(FakeCoreV1Api(response))
+        streamer.start()
+
+        # The stream has not ended in time and is stopped
+        self.assertFalse(streamer.join(timeout=0.1))
+        self.assertTrue(response.closed)
+        self.assertIsNone(streamer.error)
+        self.assertEqual(self.read(), b"partial\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+
+from types import SimpleNamespace
+
+from core.polling import (
+    FixedPollingStrategy,
+    ExponentialBackoffPollingStrategy,
+    MaxExecTimePollingStrategy,
+    HistoricalPollingStrategy,
+    PollingHistory,
+    polling_strategy_factory
+)
+
+
+def task(max_exec_time=3600):
+    return SimpleNamespace(
+        id="task",
+        execution_profile=SimpleNamespace(max_exec_time=max_exec_time)
+    )
+
+def ctx():
+    return SimpleNamespace(
+        group=SimpleNamespace(id="group"),
+        pipeline=SimpleNamespace(id="pipeline")
+    )
+
+class TestPollingStrategy(unittest.TestCase):
+    def testFixed(self):
+        strategy = FixedPollingStrategy(min_interval=2)
+        self.assertEqual([strategy.next_interval() for _ in range(3)], [2, 2, 2])
+
+    def testExponentialBackoff(self):
+        strategy = ExponentialBackoffPollingStrategy(
+            min_interval=1,
+            max_interval=10,
+            jitter=0
+        )
+        self.assertEqual(
+            [strategy.next_interval() for _ in range(6)],
+            [1, 2, 4, 8, 10, 10]
+        )
+
+    def testExponentialBackoffJitter(self):
+        strategy = ExponentialBackoffPollingStrategy(
+            min_interval=10,
+            max_interval=100,
+            jitter=0.5
+        )
+        for _ in range(20):
+            interval = strategy.next_interval()
+            self.assertGreaterEqual(interval, 10)
+            self.assertLessEqual(interval, 100)
+
+    def testMaxExecTime(self):
+        strategy = MaxExecTimePollingStrategy(86400, divisor=100)
+        self.assertEqual(strategy.next_interval(), 864)
+
+        # Never polls more often than the minimum interval
+        strategy = MaxExecTimePollingStrategy(10, min_interval=2, divisor=100)
+        self.assertEqual(strategy.next_interval(), 2)
+
+    def testHistorical(self):
+        history = PollingHistory()
+
+        # No previous runs. Backs off from the minimum interval
+        strategy = HistoricalPollingStrategy(history, "key", min_interval=1)
+        self.assertLessEqual(strategy.next_interval(), 1.1)
+        strategy.complete()
+        self.assertIsNotNone(history.expected_duration("key"))
+
+        for duration in [100, 200, 300]:
+            history.record("key", duration)
+
+        # Polls at a fraction of the expected duration
+        strategy = HistoricalPollingStrategy(history, "key", divisor=10)
+        self.assertEqual(history.expected_duration("key"), 150)
+        self.assertEqual(strategy.next_interval(), 15)
+
+    def testPollingHistorySize(self):
+        history = PollingHistory(size=2)
+        for duration in [1000, 10, 20]:
+            history.record("key", duration)
+
+        self.assertEqual(history.expected_duration("key"), 15)
+        self.assertIsNone(history.expected_duration("other"))
+
+    def testFactory(self):
+        strategy = polling_strategy_factory.build(task(), ctx(), strategy="fixed", min_interval=2)
+        self.assertIsInstance(strategy, FixedPollingStrategy)
+        self.assertEqual(strategy.next_interval(), 2)
+
+        strategy = polling_strategy_factory.build(task(1000), ctx(), strategy="max_exec_time")
+        self.assertIsInstance(strategy, MaxExecTimePollingStrategy)
+        self.assertEqual(strategy.max_exec_time, 1000)
+
+        strategy = polling_strategy_factory.build(task(), ctx(), strategy="historical")
+        self.assertEqual(strategy.key, "group.pipeline.task")
+
+        with self.assertRaises(Exception):
+            polling_strategy_factory.build(task(), ctx(), strategy="invalid")
+
+    def testPollsOverLongRun(self):
+        # Number of polls over a 24 hour run at the previous fixed 1s interval
+        # versus the exponential backoff strategy
+        duration = 86400
+        strategy = ExponentialBackoffPollingStrategy(min_interval=1, jitter=0)
+        elapsed, polls = 0, 0
+        while elapsed < duration:
+            elapsed += strategy.next_interval()
+            polls += 1
+
+        self.assertLess(polls, duration / 50)
+
+    def testExponentialBackoffCappedOverManyPolls(self):
+        # The interval stays at the max interval rather than overflowing
+        strategy = ExponentialBackoffPollingStrategy(
+            min_interval=0.5,
+            max_interval=60,
+            jitter=0
+        )
+        intervals = [strategy.next_interval() for _ in range(1100)]
+
+        self.assertEqual(intervals[:9], [0.5, 1, 2, 4, 8, 16, 32, 60, 60])
+        self.assertEqual(set(intervals[7:]), {60})
+
+
+if __name__ == "__main__":
+    unittest.main()
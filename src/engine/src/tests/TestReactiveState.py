@@ -1,7 +1,10 @@
 import unittest
 
+from threading import Thread
+
 from core.ioc import IOCContainerFactory
 from core.daos import WorkflowExecutorStateDAO
+from core.state import ReactiveState, Hook
 
 
 class TestIOCContainerFactory(unittest.TestCase):
@@ -23,5 +26,134 @@ class TestIOCContainerFactory(unittest.TestCase):
         obj2 = self.container.load("ReactiveState")
         self.assertEqual(id(obj1), id(obj2))
 
+class TestReactiveState(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.state = ReactiveState()
+        self.state.set_initial_state({
+            "failed": [],
+            "finished": [],
+            "ready_tasks": [],
+            "terminating": False
+        })
+        self.state.register_hooks([
+            Hook(lambda state: self.calls.append("all")),
+            Hook(lambda state: self.calls.append("ready_tasks"), attrs=["ready_tasks"])
+        ])
+
+    def testGetSet(self):
+        self.state.failed = ["task"]
+        self.assertEqual(self.state.failed, ["task"])
+        with self.assertRaises(AttributeError):
+            self.state.missing
+
+    def testHooksNotRunOnRead(self):
+        self.state.failed
+        self.state.ready_tasks
+        self.assertEqual(self.calls, [])
+
+    def testHooksRunOnSubscribedWrite(self):
+        self.state.failed = []
+        self.assertEqual(self.calls, ["all"])
+
+        self.calls.clear()
+        self.state.ready_tasks = ["task"]
+        self.assertEqual(self.calls, ["all", "ready_tasks"])
+
+    def testWriteInHookDoesNotRunHooks(self):
+        def consume(state):
+            self.calls.append(list(state.ready_tasks))
+            state.ready_tasks = []
+
+        self.state.register_hooks([Hook(consume, attrs=["ready_tasks"])])
+        self.state.ready_tasks = ["task"]
+        self.assertEqual(self.calls, [["task"]])
+        self.assertEqual(self.state.ready_tasks, [])
+
+    def testSnapshot(self):
+        snapshot = self.state.snapshot()
+        self.state.terminating = True
+        self.assertFalse(snapshot["terminating"])
+        self.assertTrue(self.state.terminating)
+        with self.assertRaises(TypeError):
+            snapshot["terminating"] = True
+
+    def testReset(self):
+        self.state.failed.append("task")
+        self.state.terminating = True
+        self.state.reset()
+        self.assertEqual(self.state.failed, [])
+        self.assertFalse(self.state.terminating)
+
+    def testResetWithFactory(self):
+        self.state.set_initial_state(lambda: {"failed": [], "ctx": None})
+        failed = self.state.failed
+        failed.append("task")
+        self.state.ctx = {"tasks": list(range(10000))}
+
+        self.state.reset()
+        self.assertEqual(self.state.failed, [])
+        self.assertIsNot(self.state.failed, failed)
+        self.assertIsNone(self.state.ctx)
+
+    def testResetCallsFactoryOnce(self):
+        calls = []
+        def initial_state():
+            calls.append(1)
+            return {"failed": [], "ctx": None}
+
+        self.state.set_initial_state(initial_state)
+        self.state.ctx = {"tasks": list(range(10000))}
+        calls.clear()
+
+        # The previous state is dropped rather than copied
+        self.state.reset()
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(self.state.ctx)
+
+    def testConcurrentWrites(self):
+        self.state.register_hooks([])
+        def write(i):
+            for j in range(1000):
+                setattr(self.state, f"key{i}", j)
+
+        threads = [Thread(target=write, args=(i,)) for i in range(8)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        # No write is lost when the state dict is swapped concurrently
+        for i in range(8):
+            self.assertEqual(getattr(self.state, f"key{i}"), 999)
+
+    def testConcurrentReads(self):
+        calls = []
+        self.state.register_hooks([Hook(lambda state: calls.append(1))])
+        writes = 2000
+        errors = []
+
+        def write():
+            for i in range(writes):
+                setattr(self.state, f"key{i}", i)
+
+        def read():
+            while len(calls) < writes:
+                snapshot = self.state.snapshot()
+                # Writes are applied whole and in order. A reader never sees a
+                # write without the writes made before it
+                keys = [key for key in snapshot if key.startswith("key")]
+                if sorted(snapshot[key] for key in keys) != list(range(len(keys))):
+                    errors.append(keys)
+                self.state.failed
+
+        readers = [Thread(target=read) for _ in range(8)]
+        writer = Thread(target=write)
+        for thread in readers: thread.start()
+        writer.start()
+        for thread in [writer, *readers]: thread.join()
+
+        self.assertEqual(errors, [])
+        # Hooks ran once per write and never on reads
+        self.assertEqual(len(calls), writes)
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,80 @@
+import os, logging, tempfile, unittest
+
+from types import SimpleNamespace
+
+from core.middleware.archivers import S3Archiver, checksum
+from errors.archives import ArchiveError
+from tests.fixtures.s3 import FakeS3Client
+
+
+class LocalS3Archiver(S3Archiver):
+    def __init__(self, client):
+        self.client = client
+
+    def _get_client(self, archive):
+        return (self.client, None)
+
+class TestS3Archiver(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.pipeline = SimpleNamespace(
+            id="pipeline",
+            work_dir=os.path.join(self.dir.name, "run"),
+            tasks=[SimpleNamespace(id="build"), SimpleNamespace(id="test")]
+        )
+        for task in self.pipeline.tasks:
+            output_dir = os.path.join(self.pipeline.work_dir, task.id, "output")
+            os.makedirs(os.path.join(output_dir, "reports"))
+            self.write(os.path.join(output_dir, ".stdout"), f"{task.id} stdout")
+            self.write(os.path.join(output_dir, "reports", "report.txt"), "report")
+
+        self.archive = SimpleNamespace(
+            id="results",
+            bucket="bucket",
+            endpoint="http://localhost:9000",
+            region="us-east-1",
+            credentials=SimpleNamespace(access_key="key", access_secret="secret")
+        )
+        self.client = FakeS3Client()
+        self.archiver = LocalS3Archiver(self.client)
+        self.logger = logging.getLogger("test")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, path, contents):
+        with open(path, "w") as file:
+            file.write(contents)
+
+    def key(self, task_id, filename):
+        work_dir = self.pipeline.work_dir.strip("/")
+        return f"{work_dir}/{task_id}/output/{filename}"
+
+    def testUploadsWithChecksums(self):
+        self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+
+        self.assertEqual(self.client.uploads, 4)
+        stdout = self.client.objects[("bucket", self.key("build", ".stdout"))]
+        self.assertEqual(stdout["Body"], b"build stdout")
+        self.assertEqual(
+            stdout["Metadata"]["sha256"],
+            checksum(os.path.join(self.pipeline.work_dir, "build", "output", ".stdout"))
+        )
+        self.assertIn(("bucket", self.key("test", "reports.tar.gz")), self.client.objects)
+
+    def testSkipsUnchangedObjects(self):
+        self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+        self.write(os.path.join(self.pipeline.work_dir, "test", "output", "reports", "report.txt"), "changed")
+        self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+
+        # Only the changed directory is uploaded again
+        self.assertEqual(self.client.uploads, 5)
+
+    def testRequiresCredentials(self):
+        self.archive.credentials = None
+        with self.assertRaises(ArchiveError):
+            self.archiver.archive(self.archive, self.pipeline, {}, self.logger)
+
+
+if __name__ == "__main__":
+    unittest.main()
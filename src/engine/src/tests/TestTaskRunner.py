@@ -0,0 +1,56 @@
+import unittest
+
+from threading import Event, Lock
+
+from core.workers import TaskRunner
+
+
+class TestTaskRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = TaskRunner(max_workers=8, max_queued=2)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def testSubmit(self):
+        future = self.runner.submit("run", lambda x: x * 2, 21)
+        self.assertEqual(future.result(timeout=5), 42)
+
+    def testException(self):
+        def fail(): raise ValueError("failed")
+        future = self.runner.submit("run", fail)
+        self.assertEqual(type(future.exception(timeout=5)), ValueError)
+
+    def testPerKeyLimit(self):
+        lock = Lock()
+        counts = {"current": 0, "max": 0}
+        def task():
+            with lock:
+                counts["current"] += 1
+                counts["max"] = max(counts["max"], counts["current"])
+            Event().wait(0.01)
+            with lock:
+                counts["current"] -= 1
+
+        futures = [self.runner.submit("run", task, limit=2) for _ in range(10)]
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertEqual(counts["max"], 2)
+        self.assertEqual(self.runner.metrics()["deferred"], 0)
+
+    def testSaturation(self):
+        runner = TaskRunner(max_workers=1, max_queued=1)
+        release = Event()
+        futures = [runner.submit("run", release.wait) for _ in range(3)]
+        self.assertTrue(runner.saturated())
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertFalse(runner.saturated())
+        self.assertEqual(runner.metrics()["active"], 0)
+        runner.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import os, json, shutil, tempfile, unittest
+
+from core.templating import TemplateCache, TemplateMapper
+from owe_python_sdk.schema import Uses, Pipeline, TemplateTask
+from tests.fixtures.git import init_repo, commit
+
+
+class CountingTemplateMapper(TemplateMapper):
+    """Counts the templates read from the git cache"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+        get_by_uses = self.template_repo.get_by_uses
+        def counting_get_by_uses(*args, **kwargs):
+            self.reads += 1
+            return get_by_uses(*args, **kwargs)
+        self.template_repo.get_by_uses = counting_get_by_uses
+
+class TestTemplateCache(unittest.TestCase):
+    def testInvalidatedBySha(self):
+        cache = TemplateCache(max_size=2)
+        cache.set("template", "sha1", {"v": 1})
+
+        self.assertEqual(cache.get("template", "sha1"), {"v": 1})
+        self.assertEqual(cache.get("template", "sha2"), None)
+        self.assertEqual(cache.metrics(), {"size": 1, "hits": 1, "misses": 1})
+
+    def testLeastRecentlyUsedEvicted(self):
+        cache = TemplateCache(max_size=2)
+        cache.set("a", "sha", {})
+        cache.set("b", "sha", {})
+        cache.get("a", "sha")
+        cache.set("c", "sha", {})
+
+        self.assertEqual(cache.get("b", "sha"), None)
+        self.assertEqual(cache.get("a", "sha"), {})
+        self.assertEqual(cache.get("c", "sha"), {})
+
+class TestTemplateMapper(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.tmp_dir, "source")
+        self.url = init_repo(self.source_dir)
+        self.uses = Uses(source={"url": self.url}, name="etl")
+        self.pipeline_uses = Uses(source={"url": self.url}, name="etl-pipeline")
+        self.commit_template(["requests"])
+
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.cache = TemplateCache()
+        self.pipeline_cache = TemplateCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def commit_template(self, packages):
+        return commit(self.source_dir, {
+            "owe-config.json": json.dumps({
+                "etl": {"path": "templates/etl.json"},
+                "etl-pipeline": {"path": "templates/etl-pipeline.json"}
+            }),
+            "templates/etl-pipeline.json": json.dumps({
+                "env": {"PACKAGES": {"value": ",".join(packages)}},
+                "tasks": [
+                    {"id": "extract", "type": "template", "uses": self.uses.dict()},
+                    {"id": "load", "type": "template", "uses": self.uses.dict()}
+                ]
+            }),
+            "templates/etl.json": json.dumps({
+                "type": "function",
+                "runtime": "python:3.9",
+                "installer": "pip",
+                "code": "cHJpbnQoMSk=",
+                "packages": packages
+            })
+        })
+
+    def mapper(self):
+        return CountingTemplateMapper(
+            cache_dir=self.cache_dir,
+            cache=self.cache,
+            pipeline_cache=self.pipeline_cache
+        )
+
+    def task(self, task_id):
+        return TemplateTask(id=task_id, type="template", uses=self.uses)
+
+    def pipeline(self, **kwargs):
+        return Pipeline(
+            id="etl",
+            uses=self.pipeline_uses,
+            tasks=[self.task("load").dict()],
+            uuid="5b8a7e52-7a3c-4a64-a1a4-0e6e1b1a5c3e",
+            **kwargs
+        )
+
+    def testResolvedOncePerRun(self):
+        mapper = self.mapper()
+        tasks = [mapper.map(self.task(f"task{i}"), self.uses) for i in range(5)]
+
+        self.assertEqual(mapper.reads, 1)
+        self.assertEqual([task.type for task in tasks], ["function"] * 5)
+        # The tasks do not share the template's values
+        tasks[0].packages.append("numpy")
+        self.assertEqual(tasks[1].packages, ["requests"])
+
+    def testCachedAcrossRuns(self):
+        self.mapper().map(self.task("task"), self.uses)
+        mapper = self.mapper()
+        mapper.map(self.task("task"), self.uses)
+
+        self.assertEqual(mapper.reads, 0)
+
+    def testInvalidatedByNewCommit(self):
+        self.mapper().map(self.task("task"), self.uses)
+        self.commit_template(["numpy"])
+
+        # A mapper whose git cache fetches on every use sees the new commit
+        mapper = self.mapper()
+        mapper.template_repo.git_cache_repo.ttl = 0
+        task = mapper.map(self.task("task"), self.uses)
+
+        self.assertEqual(mapper.reads, 1)
+        self.assertEqual(task.packages, ["numpy"])
+
+    def testResolvePipeline(self):
+        pipeline = self.pipeline()
+        resolved = self.mapper().resolve_pipeline(pipeline)
+
+        self.assertEqual(resolved.env["PACKAGES"].value, "requests")
+        # The tasks the pipeline defines are kept
+        self.assertEqual([task.id for task in resolved.tasks], ["load", "extract"])
+        self.assertEqual(pipeline.env, {})
+
+    def testResolvedPipelineCached(self):
+        self.mapper().resolve_pipeline(self.pipeline())
+        mapper = self.mapper()
+        first = mapper.resolve_pipeline(self.pipeline())
+        second = mapper.resolve_pipeline(self.pipeline())
+
+        self.assertEqual(mapper.reads, 0)
+        self.assertEqual(self.pipeline_cache.metrics()["hits"], 2)
+        # Each run gets its own copy
+        self.assertIsNot(first.tasks[0], second.tasks[0])
+
+    def testResolvedPipelineInvalidated(self):
+        self.mapper().resolve_pipeline(self.pipeline())
+
+        # The pipeline's own definition changed
+        resolved = self.mapper().resolve_pipeline(self.pipeline(cron="0 * * * *"))
+        self.assertEqual(resolved.cron, "0 * * * *")
+
+        # The template changed
+        self.commit_template(["numpy"])
+        mapper = self.mapper()
+        mapper.template_repo.git_cache_repo.ttl = 0
+        resolved = mapper.resolve_pipeline(self.pipeline())
+        self.assertEqual(resolved.env["PACKAGES"].value, "numpy")
+        self.assertEqual(self.pipeline_cache.metrics()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
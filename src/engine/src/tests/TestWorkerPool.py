@@ -0,0 +1,106 @@
+import time, unittest
+
+from threading import Lock, Thread
+
+from core.workers import Worker, WorkerPool
+from core.workflows import WorkflowExecutor
+from errors import NoAvailableWorkers
+
+
+class FakeWorker(Worker):
+    instances = 0
+
+    def __init__(self, _id=None):
+        Worker.__init__(self, _id)
+        FakeWorker.instances += 1
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        FakeWorker.instances = 0
+
+    def testLazyCreation(self):
+        pool = WorkerPool(FakeWorker, max_workers=2)
+        self.assertEqual(pool.count(), 0)
+
+        worker = pool.check_out()
+        self.assertEqual(FakeWorker.instances, 1)
+
+        # Checked in workers are reused
+        pool.check_in(worker)
+        self.assertIs(pool.check_out(), worker)
+        pool.check_out()
+        self.assertEqual(FakeWorker.instances, 2)
+
+        with self.assertRaises(NoAvailableWorkers):
+            pool.check_out()
+
+    def testPrewarm(self):
+        pool = WorkerPool(FakeWorker, starting_worker_count=1, min_workers=3, max_workers=5)
+        self.assertEqual(pool.idle_count(), 3)
+
+    def testShrink(self):
+        pool = WorkerPool(FakeWorker, min_workers=1, max_workers=10, idle_timeout=0.05)
+        workers = [pool.check_out() for _ in range(4)]
+        for worker in workers:
+            pool.check_in(worker)
+
+        self.assertEqual(pool.shrink(), 0)
+        time.sleep(0.1)
+
+        # The most recently used worker is reused first and never discarded
+        worker = pool.check_out()
+        self.assertIs(worker, workers[-1])
+        pool.check_in(worker)
+        self.assertEqual(pool.idle_count(), 1)
+
+    def testShrinkKeepsMinWorkers(self):
+        pool = WorkerPool(FakeWorker, min_workers=2, max_workers=10, idle_timeout=0)
+        self.assertEqual(pool.shrink(), 0)
+        self.assertEqual(pool.count(), 2)
+
+    def testConcurrentCheckOutCheckIn(self):
+        pool = WorkerPool(FakeWorker, max_workers=50)
+        errors = []
+        checked_out = set()
+        lock = Lock()
+
+        def run():
+            for _ in range(500):
+                try:
+                    worker = pool.check_out()
+                except NoAvailableWorkers:
+                    continue
+
+                with lock:
+                    # A worker is never checked out twice at the same time
+                    if worker in checked_out: errors.append(worker)
+                    checked_out.add(worker)
+                with lock:
+                    checked_out.remove(worker)
+                pool.check_in(worker)
+
+        threads = [Thread(target=run) for _ in range(64)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(FakeWorker.instances, 50)
+        self.assertEqual(pool.get_all_running(), [])
+        self.assertEqual(pool.count(), pool.idle_count())
+
+    def testStartingWorkers(self):
+        pool = WorkerPool(WorkflowExecutor, starting_worker_count=5, max_workers=5)
+
+        self.assertEqual(pool.count(), 5)
+        self.assertEqual(pool.idle_count(), 5)
+
+        # Each workflow executor has its own run state
+        executors = [pool.check_out() for _ in range(5)]
+        self.assertEqual(len({id(executor.state) for executor in executors}), 5)
+
+        # The starting worker count is capped by the max workers
+        pool = WorkerPool(FakeWorker, starting_worker_count=10, max_workers=3)
+        self.assertEqual(pool.count(), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+from core.workflows import WorkflowExecutor
+from errors.tasks import CycleDetectedError
+from tests.fixtures.dags import diamond, cyclic, layered, fan_out
+
+
+class CountingDict(dict):
+    """Counts the writes to the dict"""
+    def __init__(self, *args):
+        dict.__init__(self, *args)
+        self.writes = 0
+
+    def __setitem__(self, key, value):
+        self.writes += 1
+        dict.__setitem__(self, key, value)
+
+def schedule(executor, tasks):
+    """Runs the scheduler to completion without executing any tasks. Returns
+    the order in which the tasks became ready"""
+    executor._set_tasks(tasks)
+    return run_scheduler(executor)
+
+def run_scheduler(executor):
+    order = []
+    ready = executor._drain_queue()
+    while len(ready) > 0:
+        task = ready.pop()
+        order.append(task.id)
+        executor._resolve_dependents(task)
+        ready.extend(executor._drain_queue())
+
+    return order
+
+def schedule_by_rescan(tasks):
+    """The previous scheduling strategy. The whole queue is rescanned and every
+    dependency looked up linearly each time a task finishes. Used as a reference
+    for the tasks that are scheduled"""
+    queue = [task for task in tasks]
+    finished = []
+    order = []
+
+    def is_ready(task):
+        for dep in task.depends_on:
+            dep_task = next(filter(lambda t: t.id == dep.id, tasks), None)
+            if dep_task.id not in finished:
+                return False
+        return True
+
+    ready = [task for task in queue if is_ready(task)]
+    for task in ready: queue.remove(task)
+    while len(ready) > 0:
+        task = ready.pop()
+        order.append(task.id)
+        finished.append(task.id)
+        newly_ready = [t for t in queue if is_ready(t)]
+        for t in newly_ready: queue.remove(t)
+        ready.extend(newly_ready)
+
+    return order
+
+
+class TestWorkflowExecutorScheduler(unittest.TestCase):
+    def setUp(self):
+        self.executor = WorkflowExecutor()
+
+    def assertTopologicalOrder(self, tasks, order):
+        self.assertEqual(len(order), len(tasks))
+        positions = {task_id: i for i, task_id in enumerate(order)}
+        for task in tasks:
+            for dep in task.depends_on:
+                self.assertLess(positions[dep.id], positions[task.id])
+
+    def testInitialTasksQueued(self):
+        self.executor._set_tasks(diamond)
+        self.assertEqual([t.id for t in self.executor._drain_queue()], ["A"])
+
+    def testDependentsReadyAfterAllParentsFinish(self):
+        self.executor._set_tasks(diamond)
+        self.executor._drain_queue()
+        by_id = {task.id: task for task in diamond}
+
+        self.executor._resolve_dependents(by_id["A"])
+        self.assertEqual(sorted([t.id for t in self.executor._drain_queue()]), ["B", "C"])
+
+        self.executor._resolve_dependents(by_id["B"])
+        self.assertEqual(self.executor._drain_queue(), [])
+
+        self.executor._resolve_dependents(by_id["C"])
+        self.assertEqual([t.id for t in self.executor._drain_queue()], ["D"])
+
+    def testCycleDetected(self):
+        with self.assertRaises(CycleDetectedError):
+            self.executor._set_tasks(cyclic)
+
+    def testScheduleOrder(self):
+        for tasks in [diamond, layered(layers=5, width=20), fan_out(width=50)]:
+            self.assertTopologicalOrder(tasks, schedule(WorkflowExecutor(), tasks))
+
+    def testLargeDagsScheduledInLinearWork(self):
+        for tasks in [layered(layers=8, width=50), fan_out(width=1000)]:
+            executor = WorkflowExecutor()
+            executor._set_tasks(tasks)
+            indegrees = CountingDict(executor.state.indegrees)
+            executor.state.indegrees = indegrees
+
+            order = run_scheduler(executor)
+
+            self.assertTopologicalOrder(tasks, order)
+            self.assertEqual(sorted(order), sorted(schedule_by_rescan(tasks)))
+            # Each dependency is resolved exactly once rather than every time
+            # a task finishes
+            edges = sum([len({dep.id for dep in task.depends_on}) for task in tasks])
+            self.assertEqual(indegrees.writes, edges)
+            self.assertEqual(set(indegrees.values()) - {0}, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import time
+
+from collections import deque
+from threading import Lock
+from types import SimpleNamespace
+
+
+class FakeBroker:
+    """An in-memory stand-in for the message broker. Supports fanout exchanges,
+    prefetch, acks, rejects and dead-lettering. Like RabbitMQ, a per-consumer
+    prefetch (global_qos=False) only applies to the consumers started after it
+    was set, while a per-channel prefetch (global_qos=True) applies at once. Message TTLs do not
+    elapse on their own; call 'expire' to dead-letter the messages of a queue
+    as if their TTL had elapsed"""
+    def __init__(self):
+        self.exchanges = {}
+        self.queues = {}
+        self.bindings = {}
+        self.lock = Lock()
+
+    def publish(self, exchange, body, properties=None):
+        with self.lock:
+            for queue in self.bindings.get(exchange, []):
+                self.queues[queue]["messages"].append((body, properties))
+
+    def expire(self, queue):
+        with self.lock:
+            messages = self.queues[queue]["messages"]
+            self.queues[queue]["messages"] = deque()
+        for (body, properties) in messages:
+            self.dead_letter(queue, body, properties)
+
+    def dead_letter(self, queue, body, properties):
+        exchange = (self.queues[queue]["arguments"] or {}).get("x-dead-letter-exchange", None)
+        if exchange != None:
+            self.publish(exchange, body, properties)
+
+    def messages(self, queue):
+        return [body for (body, _) in self.queues[queue]["messages"]]
+
+class FakeChannel:
+    def __init__(self, connection):
+        self.connection = connection
+        self.broker = connection.broker
+        self.is_open = True
+        # The prefetch of the channel and of the consumers started next
+        self.prefetch_count = 0
+        self.consumer_prefetch_count = 0
+        # The queue, callback and prefetch of each consumer
+        self.consumers = []
+        self.unacked = {}
+        self.delivered = 0
+
+    def exchange_declare(self, exchange, exchange_type=None):
+        self.broker.exchanges[exchange] = exchange_type
+        self.broker.bindings.setdefault(exchange, [])
+
+    def queue_declare(self, queue, exclusive=False, arguments=None):
+        self.broker.queues.setdefault(
+            queue,
+            {"messages": deque(), "arguments": arguments, "exclusive": exclusive}
+        )
+        return SimpleNamespace(method=SimpleNamespace(queue=queue))
+
+    def queue_bind(self, exchange, queue):
+        self.broker.bindings[exchange].append(queue)
+
+    def basic_qos(self, prefetch_count=0, global_qos=False):
+        if global_qos:
+            self.prefetch_count = prefetch_count
+            return
+        self.consumer_prefetch_count = prefetch_count
+
+    def basic_consume(self, queue, on_message_callback, auto_ack=False):
+        self.consumers.append((queue, on_message_callback, self.consumer_prefetch_count))
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.broker.publish(exchange, body, properties)
+
+    def basic_ack(self, delivery_tag):
+        self.unacked.pop(delivery_tag)
+
+    def basic_reject(self, delivery_tag, requeue=True):
+        (queue, body, properties, _) = self.unacked.pop(delivery_tag)
+        if requeue:
+            self.broker.queues[queue]["messages"].appendleft((body, properties))
+            return
+        self.broker.dead_letter(queue, body, properties)
+
+    def close(self):
+        self.is_open = False
+
+    def deliver(self):
+        # Returns True if a message was delivered
+        for (consumer, (queue, callback, prefetch_count)) in enumerate(self.consumers):
+            if self.prefetch_count > 0 and len(self.unacked) >= self.prefetch_count:
+                return False
+            unacked = [tag for tag in self.unacked if self.unacked[tag][3] == consumer]
+            if prefetch_count > 0 and len(unacked) >= prefetch_count:
+                continue
+            with self.broker.lock:
+                messages = self.broker.queues[queue]["messages"]
+                if len(messages) == 0:
+                    continue
+                (body, properties) = messages.popleft()
+            self.connection.delivery_tag += 1
+            tag = self.connection.delivery_tag
+            self.unacked[tag] = (queue, body, properties, consumer)
+            self.delivered += 1
+            callback(self, SimpleNamespace(delivery_tag=tag), properties, body)
+            return True
+
+        return False
+
+class FakeConnection:
+    """Runs the callbacks scheduled from other threads and delivers messages to
+    the consumers of its channels when processing data events, like the
+    blocking connection's I/O loop"""
+    def __init__(self, broker):
+        self.broker = broker
+        self.channels = []
+        self.callbacks = deque()
+        self.delivery_tag = 0
+
+    def channel(self):
+        channel = FakeChannel(self)
+        self.channels.append(channel)
+        return channel
+
+    def add_callback_threadsafe(self, callback):
+        self.callbacks.append(callback)
+
+    def call_later(self, delay, callback):
+        pass
+
+    def process_data_events(self, time_limit=0):
+        while len(self.callbacks) > 0:
+            self.callbacks.popleft()()
+
+        delivered = True
+        while delivered:
+            delivered = False
+            for channel in self.channels:
+                delivered = channel.deliver() or delivered
+
+        time.sleep(0.001)
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+
+def task(task_id, depends_on=[]):
+    return SimpleNamespace(
+        id=task_id,
+        depends_on=[
+            SimpleNamespace(id=dep_id, can_fail=False, can_skip=False)
+            for dep_id in depends_on
+        ]
+    )
+
+# A -> B, A -> C, B -> D, C -> D
+diamond = [
+    task("A"),
+    task("B", ["A"]),
+    task("C", ["A"]),
+    task("D", ["B", "C"])
+]
+
+# A -> B -> C -> B
+cyclic = [
+    task("A"),
+    task("B", ["A", "C"]),
+    task("C", ["B"])
+]
+
+def layered(layers=10, width=100, fan_in=3):
+    """Generates a synthetic DAG in which every task in a layer depends on
+    `fan_in` tasks from the previous layer"""
+    tasks = [task(f"l0-t{i}") for i in range(width)]
+    for layer in range(1, layers):
+        for i in range(width):
+            tasks.append(task(
+                f"l{layer}-t{i}",
+                [f"l{layer-1}-t{(i + j) % width}" for j in range(fan_in)]
+            ))
+
+    return tasks
+
+def fan_out(width=1000):
+    """Generates a synthetic DAG with a single root task, `width` children, and
+    a single task that depends on all of the children"""
+    children = [task(f"child-{i}", ["root"]) for i in range(width)]
+    return [
+        task("root"),
+        *children,
+        task("sink", [child.id for child in children])
+    ]
@@ -0,0 +1,72 @@
+import os
+
+from threading import Lock
+from types import SimpleNamespace
+
+
+class FakeMetadata:
+    """The AVUs of a data object. Only one value is kept per attribute"""
+    def __init__(self):
+        self.avus = {}
+
+    def get_one(self, key):
+        if key not in self.avus:
+            raise KeyError(key)
+
+        return SimpleNamespace(name=key, value=self.avus[key])
+
+    def set(self, key, value):
+        self.avus[key] = value
+
+class FakeCollections:
+    def __init__(self, session):
+        self.session = session
+
+    def create(self, path, recurse=False):
+        parent = os.path.dirname(path)
+        if not recurse and parent not in self.session.collections_created | {"/"}:
+            raise Exception(f"Collection '{parent}' does not exist")
+
+        with self.session.lock:
+            self.session.collections_created.add(path)
+
+class FakeDataObjects:
+    def __init__(self, session):
+        self.session = session
+
+    def get(self, path):
+        if path not in self.session.objects:
+            raise Exception(f"Data object '{path}' does not exist")
+
+        return self.session.objects[path]
+
+    def put(self, local_path, path, num_threads=0):
+        if os.path.dirname(path) not in self.session.collections_created:
+            raise Exception(f"Collection '{os.path.dirname(path)}' does not exist")
+
+        with open(local_path, "rb") as file:
+            body = file.read()
+
+        with self.session.lock:
+            self.session.puts.append((path, num_threads))
+            # Overwriting a data object keeps its metadata
+            data_object = self.session.objects.get(path, None)
+            if data_object == None:
+                data_object = SimpleNamespace(path=path, metadata=FakeMetadata())
+                self.session.objects[path] = data_object
+            data_object.body = body
+
+class FakeIRODSSession:
+    """An in-memory stand-in for a python-irodsclient iRODSSession. Stores the
+    collections created and the contents and metadata of the data objects put"""
+    def __init__(self):
+        self.collections_created = set()
+        self.objects = {}
+        self.puts = []
+        self.cleaned_up = False
+        self.lock = Lock()
+        self.collections = FakeCollections(self)
+        self.data_objects = FakeDataObjects(self)
+
+    def cleanup(self):
+        self.cleaned_up = True
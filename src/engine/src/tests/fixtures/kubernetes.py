@@ -0,0 +1,117 @@
+from queue import Queue, Empty
+from types import SimpleNamespace
+
+
+def job(name, active=1, succeeded=None, failed=None, resource_version="1"):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, resource_version=resource_version),
+        status=SimpleNamespace(active=active, succeeded=succeeded, failed=failed)
+    )
+
+def pod(name, phase="Running", created=0):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, creation_timestamp=created),
+        status=SimpleNamespace(phase=phase)
+    )
+
+class FakeBatchV1Api:
+    """Stand-in for the Kubernetes BatchV1Api. Job updates are pushed to every
+    open watch stream"""
+    def __init__(self):
+        self.jobs = {}
+        self.streams = []
+        self.calls = {"read": 0, "list": 0}
+
+    def update(self, job):
+        self.jobs[job.metadata.name] = job
+        for stream in self.streams:
+            stream.put({"type": "MODIFIED", "object": job})
+
+    def delete(self, name):
+        job = self.jobs.pop(name)
+        for stream in self.streams:
+            stream.put({"type": "DELETED", "object": job})
+
+    def read_namespaced_job(self, name, namespace):
+        self.calls["read"] += 1
+        return self.jobs[name]
+
+    def list_namespaced_job(self, namespace, **kwargs):
+        self.calls["list"] += 1
+        return SimpleNamespace(
+            items=list(self.jobs.values()),
+            metadata=SimpleNamespace(resource_version="1")
+        )
+
+class FakeWatch:
+    api = None
+
+    def __init__(self):
+        self._stopped = False
+
+    def stream(self, fn, **kwargs):
+        queue = Queue()
+        self.api.streams.append(queue)
+        while not self._stopped:
+            try:
+                yield queue.get(timeout=0.05)
+            except Empty:
+                continue
+
+    def stop(self):
+        self._stopped = True
+
+class FakeLogResponse:
+    """Stand-in for the urllib3 response of a followed pod log"""
+    def __init__(self, chunks, block=None):
+        self.chunks = chunks
+        self.block = block
+        self.closed = False
+        self.released = False
+
+    def stream(self, chunk_size):
+        for chunk in self.chunks:
+            yield chunk
+        # Follows the logs until closed
+        if self.block != None:
+            self.block.wait()
+            if self.closed:
+                raise Exception("Connection closed")
+
+    def close(self):
+        self.closed = True
+        if self.block != None:
+            self.block.set()
+
+    def release_conn(self):
+        self.released = True
+
+class FakeCoreV1Api:
+    """Stand-in for the Kubernetes CoreV1Api. Reading the log of a pod fails
+    'pending' times as if its container was still being created. A job has a
+    single running pod unless 'pods' are given. 'response' is the log of every
+    pod or a dict of the logs by pod name"""
+    def __init__(self, response, pending=0, pods=None):
+        self.response = response
+        self.pending = pending
+        self.pods = pods
+        self.calls = {"read_log": 0}
+        self.logs_read = []
+
+    def list_namespaced_pod(self, namespace, label_selector=None):
+        job_name = label_selector.split("=")[1]
+        return SimpleNamespace(items=self.pods or [pod(f"{job_name}-pod")])
+
+    def read_namespaced_pod_log(self, name, namespace, **kwargs):
+        from kubernetes.client.exceptions import ApiException
+
+        self.calls["read_log"] += 1
+        self.logs_read.append(name)
+        if self.pending > 0:
+            self.pending -= 1
+            raise ApiException(status=400, reason="ContainerCreating")
+
+        if type(self.response) == dict:
+            return self.response[name]
+
+        return self.response
@@ -0,0 +1,27 @@
+from threading import Lock
+
+
+class FakeS3Client:
+    """An in-memory stand-in for an S3-compatible object store client. Stores
+    the contents and user metadata of the objects uploaded by bucket and key"""
+    def __init__(self):
+        self.objects = {}
+        self.uploads = 0
+        self.lock = Lock()
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise Exception("404 Not Found")
+
+        return {"Metadata": dict(self.objects[(Bucket, Key)]["Metadata"])}
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None):
+        with open(Filename, "rb") as file:
+            body = file.read()
+
+        with self.lock:
+            self.uploads += 1
+            self.objects[(Bucket, Key)] = {
+                "Body": body,
+                "Metadata": (ExtraArgs or {}).get("Metadata", {})
+            }
@@ -0,0 +1,41 @@
+import time
+
+from threading import Lock
+
+
+class FakeFilesService:
+    """Stand-in for the Tapis files service. Stores the contents of the files
+    inserted by system and path. Inserting a path in 'fail' fails once"""
+    def __init__(self, delay=0, fail=[]):
+        self.files = {}
+        self.dirs = set()
+        self.delay = delay
+        self.fail = set(fail)
+        self.inserts = 0
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self.lock = Lock()
+
+    def mkdir(self, systemId, path, **kwargs):
+        self.dirs.add((systemId, path))
+
+    def insert(self, systemId, path, file, **kwargs):
+        with self.lock:
+            self.inserts += 1
+            self.concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self.concurrent)
+
+        try:
+            time.sleep(self.delay)
+            if path in self.fail:
+                self.fail.discard(path)
+                raise Exception(f"Failed to insert '{path}'")
+            self.files[(systemId, path)] = file.read()
+        finally:
+            with self.lock:
+                self.concurrent -= 1
+
+    def getContents(self, systemId, path, **kwargs):
+        if (systemId, path) not in self.files:
+            raise Exception(f"'{path}' not found")
+        return self.files[(systemId, path)]
@@ -1,7 +1,22 @@
 cd $(dirname $0)
 cd ../
 # TODO return with non-zero exit code if a test fails
-python3 -m unittest -v tests.TestServer
+python3 -m unittest -v tests.testserver
 python3 -m unittest -v tests.TestConditionalExpressionEvaluator
 python3 -m unittest -v tests.TestIOCContainerFactory
-python3 -m unittest -v tests.TestTaskRepository
\ No newline at end of file
+python3 -m unittest -v tests.TestTaskRepository
+python3 -m unittest -v tests.TestWorkflowExecutorScheduler
+python3 -m unittest -v tests.TestTaskRunner
+python3 -m unittest -v tests.TestJobWatcher
+python3 -m unittest -v tests.TestPollingStrategy
+python3 -m unittest -v tests.TestReactiveState
+python3 -m unittest -v tests.TestWorkerPool
+python3 -m unittest -v tests.TestIntake
+python3 -m unittest -v tests.TestNotificationQueue
+python3 -m unittest -v tests.TestEventExchange
+python3 -m unittest -v tests.TestPodLogStreamer
+python3 -m unittest -v tests.TestArchiveUploader
+python3 -m unittest -v tests.TestS3Archiver
+python3 -m unittest -v tests.TestIRODSArchiver
+python3 -m unittest -v tests.TestGitCacheRepository
+python3 -m unittest -v tests.TestTemplateMapper
@@ -1,13 +1,218 @@
 import unittest
 
+from threading import Thread
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pika import BasicProperties
+
 from core.Server import Server
+from core.workers import Worker
+from conf.constants import (
+    DUPLICATE_SUBMISSION_POLICY_ALLOW,
+    DUPLICATE_SUBMISSION_POLICY_DENY,
+    DUPLICATE_SUBMISSION_POLICY_DEFER,
+    DUPLICATE_SUBMISSION_POLICY_TERMINATE,
+)
+
+
+class FakeWorkflowExecutor(Worker):
+    def __init__(self, _id=None):
+        Worker.__init__(self, _id)
+        self.key = None
+        self.terminated = False
+
+    def terminate(self):
+        self.terminated = True
 
+    def reset(self, terminated=False):
+        self.can_start = False
+
+def request(key, policy=DUPLICATE_SUBMISSION_POLICY_ALLOW):
+    return SimpleNamespace(
+        meta=SimpleNamespace(idempotency_key=key),
+        pipeline=SimpleNamespace(
+            id="pipeline",
+            execution_profile=SimpleNamespace(duplicate_submission_policy=policy)
+        )
+    )
+
+class FakeIntake:
+    def __init__(self):
+        self.resubmitted = []
+
+    def resubmit(self, body, properties=None):
+        self.resubmitted.append(body)
 
 class TestServer(unittest.TestCase):
-    def testServerInit(self):
+    def setUp(self):
         self.server = Server()
+        self.server.intake = FakeIntake()
+
+    def testServerInit(self):
         self.assertEqual(type(self.server), Server)
-        pass
+
+    def testRegisterDeregister(self):
+        worker = self.server._register_worker(request("key"), FakeWorkflowExecutor())
+        self.assertTrue(worker.can_start)
+        self.assertEqual(self.server._get_active_workers("key"), [worker])
+
+        self.server._deregister_worker(worker)
+        self.assertEqual(self.server._get_active_workers("key"), [])
+        self.assertEqual(self.server.active_workers, {})
+
+        # Deregistering twice is a no-op
+        self.server._deregister_worker(worker)
+
+    def testDeny(self):
+        self.server._register_worker(request("key"), FakeWorkflowExecutor())
+        worker = self.server._register_worker(
+            request("key", DUPLICATE_SUBMISSION_POLICY_DENY),
+            FakeWorkflowExecutor()
+        )
+        self.assertFalse(worker.can_start)
+        self.assertEqual(len(self.server._get_active_workers("key")), 1)
+
+    def testTerminate(self):
+        active_worker = self.server._register_worker(request("key"), FakeWorkflowExecutor())
+        worker = self.server._register_worker(
+            request("key", DUPLICATE_SUBMISSION_POLICY_TERMINATE),
+            FakeWorkflowExecutor()
+        )
+        self.assertTrue(active_worker.terminated)
+        self.assertEqual(self.server._get_active_workers("key"), [worker])
+
+    def testDefer(self):
+        active_worker = self.server._register_worker(request("key"), FakeWorkflowExecutor())
+        deferred_workers = [
+            self.server._register_worker(
+                request("key", DUPLICATE_SUBMISSION_POLICY_DEFER),
+                FakeWorkflowExecutor(),
+                message=(body, None)
+            )
+            for body in [b"1", b"2"]
+        ]
+        self.assertFalse(any([worker.can_start for worker in deferred_workers]))
+        for worker in deferred_workers:
+            self.server._deregister_worker(worker)
+        self.assertEqual(self.server.intake.resubmitted, [])
+
+        # The deferred submissions are resubmitted one at a time in order as
+        # the active run for the key finishes
+        self.server._deregister_worker(active_worker)
+        self.assertEqual(self.server.intake.resubmitted, [b"1"])
+
+        worker = self.server._register_worker(
+            request("key", DUPLICATE_SUBMISSION_POLICY_DEFER),
+            FakeWorkflowExecutor(),
+            message=(b"1", None)
+        )
+        self.assertTrue(worker.can_start)
+        self.server._deregister_worker(worker)
+        self.assertEqual(self.server.intake.resubmitted, [b"1", b"2"])
+        self.assertEqual(self.server.deferred_submissions, {})
+
+    @patch("core.Server.COALESCE_DEFERRED_SUBMISSIONS", True)
+    def testDeferCoalesced(self):
+        active_worker = self.server._register_worker(request("key"), FakeWorkflowExecutor())
+        for body in [b"1", b"2", b"3"]:
+            self.server._register_worker(
+                request("key", DUPLICATE_SUBMISSION_POLICY_DEFER),
+                FakeWorkflowExecutor(),
+                message=(body, None)
+            )
+
+        # Only the latest deferred submission is run
+        self.server._deregister_worker(active_worker)
+        self.assertEqual(self.server.intake.resubmitted, [b"3"])
+        self.assertEqual(self.server.deferred_submissions, {})
+
+    def testTerminatedRunDoesNotResubmit(self):
+        active_worker = self.server._register_worker(request("key"), FakeWorkflowExecutor())
+        self.server._register_worker(
+            request("key", DUPLICATE_SUBMISSION_POLICY_DEFER),
+            FakeWorkflowExecutor(),
+            message=(b"1", None)
+        )
+        self.server._deregister_worker(active_worker, terminated=True)
+        self.assertEqual(self.server.intake.resubmitted, [])
+
+    def testDuplicateDeliveryDropped(self):
+        properties = BasicProperties(message_id="run")
+        worker = self.server._register_worker(
+            request("key"),
+            FakeWorkflowExecutor(),
+            message=(b"1", properties)
+        )
+        self.assertTrue(worker.can_start)
+        self.server._deregister_worker(worker)
+
+        # A copy of a started submission is never started, whatever the policy
+        duplicate = self.server._register_worker(
+            request("key"),
+            FakeWorkflowExecutor(),
+            message=(b"1", properties)
+        )
+        self.assertFalse(duplicate.can_start)
+        self.assertEqual(self.server.active_workers, {})
+
+    def testDeferredSubmissionStartedOnce(self):
+        active_worker = self.server._register_worker(request("key"), FakeWorkflowExecutor())
+        properties = BasicProperties(message_id="run")
+        self.server._register_worker(
+            request("key", DUPLICATE_SUBMISSION_POLICY_DEFER),
+            FakeWorkflowExecutor(),
+            message=(b"1", properties)
+        )
+        self.server._deregister_worker(active_worker)
+
+        # The resubmitted deferred submission was never started
+        worker = self.server._register_worker(
+            request("key", DUPLICATE_SUBMISSION_POLICY_DEFER),
+            FakeWorkflowExecutor(),
+            message=(b"1", properties)
+        )
+        self.assertTrue(worker.can_start)
+
+    @patch("core.Server.STARTED_SUBMISSIONS_SIZE", 2)
+    def testStartedSubmissionsBounded(self):
+        for message_id in ["1", "2", "3"]:
+            worker = self.server._register_worker(
+                request(message_id),
+                FakeWorkflowExecutor(),
+                message=(b"", BasicProperties(message_id=message_id))
+            )
+            self.server._deregister_worker(worker)
+
+        self.assertEqual(list(self.server.started_submissions), ["2", "3"])
+
+    def testConcurrentDeny(self):
+        # Only one of many concurrent submissions with the same key is started
+        workers = [FakeWorkflowExecutor() for _ in range(200)]
+        def register(worker):
+            self.server._register_worker(
+                request("key", DUPLICATE_SUBMISSION_POLICY_DENY),
+                worker
+            )
+
+        threads = [Thread(target=register, args=(worker,)) for worker in workers]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        self.assertEqual(len([worker for worker in workers if worker.can_start]), 1)
+        self.assertEqual(len(self.server._get_active_workers("key")), 1)
+
+    def testConcurrentRegistry(self):
+        def run(i):
+            for j in range(200):
+                worker = self.server._register_worker(request(f"key{j % 10}"), FakeWorkflowExecutor())
+                self.server._deregister_worker(worker)
+
+        threads = [Thread(target=run, args=(i,)) for i in range(16)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        self.assertEqual(self.server.active_workers, {})
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -37,6 +37,15 @@ def get_value_from_args(args, key):
 def get_value_from_task_output(key):
     pass
 
+def job_failed(job):
+    return type(job.status.failed) == int and job.status.failed > 0
+
+def job_succeeded(job):
+    return type(job.status.succeeded) == int and job.status.succeeded > 0
+
+def job_in_terminal_state(job):
+    return (job_failed(job) or job_succeeded(job)) and job.status.active == None
+
 def gen_resource_name(prefix=""):
     system_prefix = "wf"
     name = str(uuid4())